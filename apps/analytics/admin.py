@@ -1,5 +1,6 @@
 from django.contrib import admin
 
-from .models import SystemMetric
+from .models import SystemMetric, TrendBucket
 
 admin.site.register(SystemMetric)
+admin.site.register(TrendBucket)
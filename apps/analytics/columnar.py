@@ -0,0 +1,320 @@
+"""In-memory columnar herd model for cohort analytics.
+
+Each ranch's animals are held as NumPy column arrays: categorical attributes
+as small integer codes, plus per-animal event summaries (breeding outcomes,
+vaccinations, treatments, mortality). A cohort grid such as source x breed x
+birth year is then a single vectorised group-by (``np.bincount`` over a
+combined group key) instead of one ORM query per cell.
+
+Frames refresh incrementally: only animals whose row or events changed
+since the last ``updated_at`` watermark are reloaded, and animals that left
+the ranch (deleted, or moved to another ranch) are dropped through the
+ranch's sync tombstones. Deleted event rows are picked up by a periodic full
+reload.
+"""
+
+import threading
+import time
+from datetime import timedelta
+
+import numpy as np
+from django.db.models import Count, Max, Q, Sum
+from django.utils import timezone
+
+from apps.animals.models import Animal
+from apps.breeding.models import BreedingEvent
+from apps.core.models import SyncTombstone
+from apps.health.models import Mortality, Treatment, Vaccination
+
+FULL_RELOAD_SECONDS = 15 * 60
+# Rows committed slightly after a later timestamp must not slip past the
+# watermark; reprocessing an animal is idempotent.
+WATERMARK_OVERLAP = timedelta(seconds=5)
+
+CATEGORY_COLUMNS = ["source", "breed", "sex", "species", "status"]
+DIMENSIONS = CATEGORY_COLUMNS + ["birth_year", "vaccination_status"]
+VACCINATION_STATUSES = ["unvaccinated", "current", "overdue"]
+
+_COUNT_COLUMNS = {
+    "breeding_events": np.int32,
+    "conceived": np.int32,
+    "stillbirths": np.int32,
+    "vaccinations": np.int32,
+    "treatments": np.int32,
+    "dead": np.int8,
+}
+_FLOAT_COLUMNS = ["treatment_cost", "mortality_loss"]
+
+# metric -> (numerator column or None for a head count, denominator or None)
+METRICS = {
+    "animals": (None, None),
+    "breeding_events": ("breeding_events", None),
+    "conception_rate": ("conceived", "breeding_events"),
+    "stillbirth_rate": ("stillbirths", "breeding_events"),
+    "vaccinated_pct": ("is_vaccinated", "animals"),
+    "overdue_pct": ("is_overdue", "animals"),
+    "treatments": ("treatments", None),
+    "treatment_cost": ("treatment_cost", None),
+    "mortality_rate": ("dead", "animals"),
+    "mortality_loss": ("mortality_loss", None),
+}
+DEFAULT_METRICS = ["animals", "conception_rate", "stillbirth_rate", "mortality_rate"]
+COUNT_METRICS = {"animals", "breeding_events", "treatments"}
+
+
+class Categories:
+    """Append-only value <-> code mapping shared by every frame."""
+
+    def __init__(self):
+        self.values = []
+        self.codes = {}
+
+    def encode(self, value):
+        value = value or ""
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+
+_categories = {column: Categories() for column in CATEGORY_COLUMNS}
+
+
+def _load(animal_filter):
+    """Load animal rows plus event summaries for ``animal_filter``."""
+    animals = Animal.objects.filter(animal_filter).order_by()
+    rows = list(animals.values_list("tag_number", *CATEGORY_COLUMNS, "date_of_birth"))
+    selected = animals.values("tag_number")
+    tags = [row[0] for row in rows]
+    index = {tag: i for i, tag in enumerate(tags)}
+    size = len(tags)
+
+    columns = {
+        column: np.fromiter(
+            (_categories[column].encode(row[i + 1]) for row in rows), dtype=np.int32, count=size
+        )
+        for i, column in enumerate(CATEGORY_COLUMNS)
+    }
+    columns["birth_year"] = np.fromiter(
+        (row[-1].year if row[-1] else -1 for row in rows), dtype=np.int16, count=size
+    )
+    for column, dtype in _COUNT_COLUMNS.items():
+        columns[column] = np.zeros(size, dtype=dtype)
+    for column in _FLOAT_COLUMNS:
+        columns[column] = np.zeros(size, dtype=np.float64)
+    columns["next_due"] = np.full(size, np.datetime64("NaT"), dtype="datetime64[D]")
+
+    def scatter(queryset, key, **columns_by_field):
+        for row in queryset:
+            i = index.get(row[key])
+            if i is not None:
+                for column, field in columns_by_field.items():
+                    columns[column][i] = row[field] if row[field] is not None else 0
+
+    scatter(
+        BreedingEvent.objects.filter(female_tag__in=selected).order_by().values("female_tag")
+        .annotate(
+            total=Count("id"),
+            yes=Count("id", filter=Q(pregnancy_confirmed="yes")),
+            stillborn=Count("id", filter=Q(outcome="stillbirth")),
+        ),
+        "female_tag",
+        breeding_events="total",
+        conceived="yes",
+        stillbirths="stillborn",
+    )
+    for row in (
+        Vaccination.objects.filter(animal_tag__in=selected).order_by().values("animal_tag")
+        .annotate(total=Count("id"), due=Max("next_due_date"))
+    ):
+        i = index.get(row["animal_tag"])
+        if i is None:
+            continue
+        columns["vaccinations"][i] = row["total"]
+        if row["due"]:
+            columns["next_due"][i] = np.datetime64(row["due"], "D")
+    scatter(
+        Treatment.objects.filter(animal_tag__in=selected).order_by().values("animal_tag")
+        .annotate(total=Count("id"), cost=Sum("cost")),
+        "animal_tag",
+        treatments="total",
+        treatment_cost="cost",
+    )
+    for tag, value in Mortality.objects.filter(animal_tag__in=selected).values_list(
+        "animal_tag", "estimated_value"
+    ):
+        i = index.get(tag)
+        if i is not None:
+            columns["dead"][i] = 1
+            columns["mortality_loss"][i] += float(value or 0)
+    return tags, columns
+
+
+class HerdFrame:
+    def __init__(self, ranch_id):
+        self.ranch_id = ranch_id
+        self.lock = threading.Lock()
+        self.tags = []
+        self.index = {}
+        self.columns = {}
+        self.watermark = None
+        self.loaded_at = 0.0
+
+    def __len__(self):
+        return len(self.tags)
+
+    def refresh(self, force=False):
+        with self.lock:
+            started = timezone.now()
+            stale = time.monotonic() - self.loaded_at > FULL_RELOAD_SECONDS
+            if force or self.watermark is None or stale:
+                self.tags, self.columns = _load(Q(ranch_id=self.ranch_id))
+                self.index = {tag: i for i, tag in enumerate(self.tags)}
+                self.loaded_at = time.monotonic()
+            else:
+                since = self.watermark - WATERMARK_OVERLAP
+                changed = self._changed_tags(since)
+                removed = self._removed_tags(since)
+                if changed or removed:
+                    tags, columns = _load(Q(ranch_id=self.ranch_id, tag_number__in=changed | removed))
+                    self._merge(tags, columns, dropped=removed.difference(tags))
+            self.watermark = started
+        return self
+
+    def _changed_tags(self, since):
+        in_ranch = {"ranch_id": self.ranch_id}
+        changed = set(
+            Animal.objects.filter(updated_at__gt=since, **in_ranch).values_list("tag_number", flat=True)
+        )
+        for model, tag_field in [
+            (BreedingEvent, "female_tag"),
+            (Vaccination, "animal_tag"),
+            (Treatment, "animal_tag"),
+            (Mortality, "animal_tag"),
+        ]:
+            changed.update(
+                model.objects.filter(updated_at__gt=since, **in_ranch)
+                .values_list(tag_field, flat=True)
+            )
+        return changed
+
+    def _removed_tags(self, since):
+        # Animals deleted or moved to another ranch; one that has since come
+        # back is reloaded like any other changed animal.
+        return set(
+            SyncTombstone.objects.filter(
+                ranch_id=self.ranch_id, table_name=Animal._meta.db_table, removed_at__gt=since
+            ).values_list("row_id", flat=True)
+        )
+
+    def _merge(self, tags, columns, dropped=()):
+        # Build new arrays and swap them in, so readers holding the previous
+        # columns never see a half-applied update.
+        existing = [i for i, tag in enumerate(tags) if tag in self.index]
+        positions = [self.index[tags[i]] for i in existing]
+        added = [i for i, tag in enumerate(tags) if tag not in self.index]
+        keep = [i for i, tag in enumerate(self.tags) if tag not in dropped]
+        merged = {}
+        for name, values in columns.items():
+            column = self.columns[name].copy()
+            column[positions] = values[existing]
+            column = column[keep]
+            merged[name] = np.concatenate([column, values[added]]) if added else column
+        new_tags = [self.tags[i] for i in keep] + [tags[i] for i in added]
+        self.index = {tag: i for i, tag in enumerate(new_tags)}
+        self.tags, self.columns = new_tags, merged
+
+
+_frames = {}
+_frames_lock = threading.Lock()
+
+
+def get_frame(ranch_id):
+    with _frames_lock:
+        frame = _frames.get(ranch_id)
+        if frame is None:
+            frame = _frames[ranch_id] = HerdFrame(ranch_id)
+    return frame.refresh()
+
+
+def clear_frames():
+    with _frames_lock:
+        _frames.clear()
+
+
+def _derived(columns, today):
+    next_due = columns["next_due"]
+    overdue = ~np.isnat(next_due) & (next_due < np.datetime64(today, "D"))
+    vaccinated = columns["vaccinations"] > 0
+    return {
+        "is_vaccinated": vaccinated,
+        "is_overdue": overdue,
+        # unvaccinated=0, current=1, overdue=2 (VACCINATION_STATUSES order)
+        "vaccination_status": np.where(vaccinated, np.where(overdue, 2, 1), 0),
+    }
+
+
+def cohort_grid(frames, dimensions, metrics=None, today=None):
+    """Group the animals in ``frames`` by ``dimensions`` and compute ``metrics``.
+
+    Returns one dict per non-empty cohort, sorted by dimension values.
+    """
+    metrics = metrics or DEFAULT_METRICS
+    today = today or timezone.localdate()
+    parts = [columns for columns in (frame.columns for frame in frames) if columns]
+    parts = [columns for columns in parts if len(columns["source"])]
+    if not parts:
+        return []
+    columns = {name: np.concatenate([part[name] for part in parts]) for name in parts[0]}
+    columns.update(_derived(columns, today))
+
+    # Dense codes per dimension, then one combined key for a single bincount.
+    keys, labels = [], []
+    for dimension in dimensions:
+        uniques, codes = np.unique(columns[dimension], return_inverse=True)
+        keys.append(codes)
+        labels.append(uniques)
+    shape = tuple(len(uniques) for uniques in labels) or (1,)
+    group = (
+        np.ravel_multi_index(keys, shape) if keys else np.zeros(len(columns["source"]), dtype=np.intp)
+    )
+    size = int(np.prod(shape))
+    animals = np.bincount(group, minlength=size)
+
+    sums = {"animals": animals}
+    for metric in metrics:
+        for column in METRICS[metric]:
+            if column and column not in sums:
+                sums[column] = np.bincount(group, weights=columns[column], minlength=size)
+
+    results = {}
+    for metric in metrics:
+        numerator, denominator = METRICS[metric]
+        values = sums[numerator or "animals"].astype(np.float64)
+        if denominator:
+            total = sums[denominator]
+            values = np.divide(values * 100, total, out=np.zeros(size), where=total > 0)
+        results[metric] = np.round(values, 2)
+
+    rows = []
+    for flat in np.flatnonzero(animals):
+        position = np.unravel_index(flat, shape)
+        row = {}
+        for dimension, uniques, i in zip(dimensions, labels, position):
+            row[dimension] = _label(dimension, uniques[i])
+        for metric in metrics:
+            value = results[metric][flat]
+            row[metric] = int(value) if metric in COUNT_METRICS else float(value)
+        rows.append(row)
+    rows.sort(key=lambda row: [(row[d] is None, row[d]) for d in dimensions])
+    return rows
+
+
+def _label(dimension, code):
+    code = int(code)
+    if dimension in _categories:
+        return _categories[dimension].values[code]
+    if dimension == "vaccination_status":
+        return VACCINATION_STATUSES[code]
+    return code if code >= 0 else None
@@ -0,0 +1,196 @@
+"""Health-factor vs conception correlation over every breeding event.
+
+One query builds a per-event feature matrix (one boolean column per factor,
+evaluated as of the service date); NumPy then computes, for all factors at
+once, the conception rate with and without the factor, the difference with
+a 95% confidence interval, and a two-proportion z-test p-value. Factors are
+returned ranked by the size of their effect.
+"""
+
+import math
+
+import numpy as np
+from django.db.models import Count, Exists, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+from apps.breeding.models import BreedingEvent
+from apps.core.tenancy import scope_to_ranches
+from apps.health.models import Treatment, Vaccination
+
+RECENT_ILLNESS_DAYS = 60
+YOUNG_DAM_MONTHS = 24
+REPEAT_TREATMENTS = 2
+Z_95 = 1.959964
+SIGNIFICANCE = 0.05
+HIGH_IMPACT_DELTA = 20.0
+
+FACTORS = {
+    "vaccinated": "Complete Vaccination",
+    "vaccination_overdue": "Vaccination Overdue at Service",
+    "treated": "Treatment History",
+    "recent_illness": f"Illness in {RECENT_ILLNESS_DAYS} Days Before Service",
+    "repeat_treatments": f"{REPEAT_TREATMENTS}+ Treatments",
+    "imported": "Imported",
+    "young_dam": f"Dam Under {YOUNG_DAM_MONTHS} Months",
+    "artificial_insemination": "Artificial Insemination",
+}
+
+_erfc = np.vectorize(math.erfc, otypes=[np.float64])
+
+
+def _event_rows(ranch_ids=None):
+    female = OuterRef("female_tag")
+    vaccinations = Vaccination.objects.filter(animal_tag=female).order_by()
+    treatments = Treatment.objects.filter(animal_tag=female).order_by()
+    return (
+        scope_to_ranches(BreedingEvent.objects.order_by(), ranch_ids)
+        .annotate(
+            vaccinated=Exists(vaccinations),
+            due=Subquery(
+                vaccinations.filter(date_administered__lte=OuterRef("service_date"))
+                .order_by("-date_administered")
+                .values("next_due_date")[:1]
+            ),
+            treatment_count=Coalesce(
+                Subquery(
+                    treatments.values("animal_tag")
+                    .annotate(total=Count("id"))
+                    .values("total"),
+                    output_field=IntegerField(),
+                ),
+                Value(0),
+            ),
+            last_treated=Subquery(
+                treatments.filter(treatment_date__lte=OuterRef("service_date"))
+                .order_by("-treatment_date")
+                .values("treatment_date")[:1]
+            ),
+        )
+        .values_list(
+            "pregnancy_confirmed",
+            "service_date",
+            "method",
+            "female_tag__source",
+            "female_tag__date_of_birth",
+            "vaccinated",
+            "due",
+            "treatment_count",
+            "last_treated",
+        )
+    )
+
+
+def _days(values):
+    return np.array(
+        [np.datetime64(value, "D") if value else np.datetime64("NaT") for value in values],
+        dtype="datetime64[D]",
+    )
+
+
+def _elapsed(later, earlier):
+    days = later - earlier
+    return np.where(np.isnat(days), np.nan, days.astype(np.float64))
+
+
+def build_feature_matrix(ranch_ids=None):
+    """Return ``(conceived, features)`` for every breeding event in ``ranch_ids``.
+
+    ``conceived`` is a boolean vector; ``features`` a boolean matrix with one
+    column per entry in ``FACTORS``.
+    """
+    rows = list(_event_rows(ranch_ids))
+    if not rows:
+        return np.zeros(0, dtype=bool), np.zeros((0, len(FACTORS)), dtype=bool)
+    confirmed, service, method, source, born, vaccinated, due, treatments, last_treated = zip(*rows)
+
+    service = _days(service)
+    due = _days(due)
+    last_treated = _days(last_treated)
+    born = _days(born)
+    age_days = _elapsed(service, born)
+    since_treated = _elapsed(service, last_treated)
+    treatments = np.array(treatments, dtype=np.int32)
+
+    columns = {
+        "vaccinated": np.array(vaccinated, dtype=bool),
+        "vaccination_overdue": ~np.isnat(due) & (due < service),
+        "treated": treatments > 0,
+        # NaN (no treatment / unknown birth date) compares False.
+        "recent_illness": since_treated <= RECENT_ILLNESS_DAYS,
+        "repeat_treatments": treatments >= REPEAT_TREATMENTS,
+        "imported": np.array(source) == "imported",
+        "young_dam": age_days < YOUNG_DAM_MONTHS * 30.44,
+        "artificial_insemination": np.array(method) == "artificial_insemination",
+    }
+    features = np.column_stack([columns[factor] for factor in FACTORS])
+    return np.array(confirmed) == "yes", features
+
+
+def rank_factors(conceived, features):
+    """Compare conception with and without each factor, largest effect first."""
+    conceived = conceived.astype(np.float64)
+    with_total = features.sum(axis=0).astype(np.float64)
+    with_yes = conceived @ features
+    without_total = len(conceived) - with_total
+    without_yes = conceived.sum() - with_yes
+
+    def rate(yes, total):
+        return np.divide(yes, total, out=np.zeros_like(yes), where=total > 0)
+
+    p_with = rate(with_yes, with_total)
+    p_without = rate(without_yes, without_total)
+    delta = p_with - p_without
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        se = np.sqrt(
+            p_with * (1 - p_with) / with_total + p_without * (1 - p_without) / without_total
+        )
+        pooled = conceived.mean() if len(conceived) else 0.0
+        se_pooled = np.sqrt(pooled * (1 - pooled) * (1 / with_total + 1 / without_total))
+        z = np.where(se_pooled > 0, delta / se_pooled, 0.0)
+    comparable = (with_total > 0) & (without_total > 0)
+    se = np.where(comparable, se, 0.0)
+    p_value = np.where(comparable, _erfc(np.abs(z) / math.sqrt(2)), 1.0)
+
+    factors = []
+    for i, factor in enumerate(FACTORS):
+        impact_pct = round(float(delta[i]) * 100, 2)
+        significant = bool(p_value[i] < SIGNIFICANCE)
+        if not significant:
+            impact = "low"
+        elif abs(impact_pct) >= HIGH_IMPACT_DELTA:
+            impact = "high"
+        else:
+            impact = "medium"
+        factors.append(
+            {
+                "factor": factor,
+                "label": FACTORS[factor],
+                "with": {
+                    "total_events": int(with_total[i]),
+                    "conception_rate": round(float(p_with[i]) * 100, 2),
+                },
+                "without": {
+                    "total_events": int(without_total[i]),
+                    "conception_rate": round(float(p_without[i]) * 100, 2),
+                },
+                "delta": impact_pct,
+                "ci_low": round(float(delta[i] - Z_95 * se[i]) * 100, 2),
+                "ci_high": round(float(delta[i] + Z_95 * se[i]) * 100, 2),
+                "p_value": round(float(p_value[i]), 4),
+                "significant": significant,
+                "impact": impact,
+            }
+        )
+    # Factors nobody (or everybody) has cannot be compared; list them last.
+    factors.sort(
+        key=lambda item: (
+            not (item["with"]["total_events"] and item["without"]["total_events"]),
+            -abs(item["delta"]),
+        )
+    )
+    return factors
+
+
+def health_factors(ranch_ids=None):
+    return rank_factors(*build_feature_matrix(ranch_ids))
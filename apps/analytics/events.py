@@ -0,0 +1,106 @@
+"""In-process pub/sub for live dashboard updates.
+
+Model signals publish small events (new mortality, vaccination, herd count,
+KPI deltas) into a bounded ring buffer, each tagged with the ranch it belongs
+to. Subscribers read everything after the last id they saw, limited to their
+``ranch_ids`` (``None`` sees every ranch): SSE streams wait on an asyncio
+event, long-poll requests on a condition variable. Nothing runs while no
+event arrives, so idle dashboards cost nothing.
+"""
+
+import asyncio
+import itertools
+import threading
+import time
+from collections import deque
+
+MAX_BUFFERED_EVENTS = 1000
+
+
+class EventBroker:
+    def __init__(self, maxlen=MAX_BUFFERED_EVENTS):
+        self._events = deque(maxlen=maxlen)
+        self._ids = itertools.count(1)
+        self._condition = threading.Condition()
+        self._async_waiters = set()  # (loop, asyncio.Event)
+
+    @property
+    def last_id(self):
+        with self._condition:
+            return self._events[-1]["id"] if self._events else 0
+
+    def publish(self, event_type, data, ranch=None):
+        with self._condition:
+            event = {
+                "id": next(self._ids),
+                "type": event_type,
+                "time": time.time(),
+                "ranch": ranch,
+                "data": data,
+            }
+            self._events.append(event)
+            self._condition.notify_all()
+            waiters = list(self._async_waiters)
+        for loop, wakeup in waiters:
+            try:
+                loop.call_soon_threadsafe(wakeup.set)
+            except RuntimeError:  # loop closed
+                with self._condition:
+                    self._async_waiters.discard((loop, wakeup))
+        return event
+
+    def _after(self, last_id, ranch_ids):
+        # Caller holds the lock. Returns the visible events and the newest id
+        # seen, so subscribers skip past other ranches' events too.
+        events = [event for event in self._events if event["id"] > last_id]
+        newest = events[-1]["id"] if events else last_id
+        if ranch_ids is not None:
+            events = [event for event in events if event["ranch"] in ranch_ids]
+        return events, newest
+
+    def events_since(self, last_id, ranch_ids=None):
+        with self._condition:
+            return self._after(last_id, ranch_ids)[0]
+
+    def wait(self, last_id, timeout, ranch_ids=None):
+        """Block until visible events newer than ``last_id`` exist (long-poll path).
+
+        Returns ``(events, newest_id)``.
+        """
+        deadline = time.monotonic() + timeout
+        with self._condition:
+            while True:
+                events, last_id = self._after(last_id, ranch_ids)
+                remaining = deadline - time.monotonic()
+                if events or remaining <= 0:
+                    return events, last_id
+                self._condition.wait(remaining)
+
+    async def stream(self, last_id, heartbeat, ranch_ids=None):
+        """Yield event batches (or ``[]`` heartbeats) forever (SSE path)."""
+        wakeup = asyncio.Event()
+        waiter = (asyncio.get_running_loop(), wakeup)
+        with self._condition:
+            self._async_waiters.add(waiter)
+        try:
+            while True:
+                wakeup.clear()
+                with self._condition:
+                    events, last_id = self._after(last_id, ranch_ids)
+                if events:
+                    yield events
+                    continue
+                try:
+                    await asyncio.wait_for(wakeup.wait(), heartbeat)
+                except asyncio.TimeoutError:
+                    yield []
+        finally:
+            with self._condition:
+                self._async_waiters.discard(waiter)
+
+    def clear(self):
+        with self._condition:
+            self._events.clear()
+
+
+broker = EventBroker()
@@ -0,0 +1,18 @@
+from datetime import timedelta
+
+from apps.core.jobs import job
+from apps.core.routers import read_from_replica
+
+from .portfolio import build_ranch_dashboards
+from .services import refresh_dashboard_cache
+
+
+@job("analytics.refresh_dashboard", schedule=timedelta(minutes=5), max_attempts=3)
+def refresh_dashboard():
+    with read_from_replica():
+        refresh_dashboard_cache()
+
+
+@job("analytics.refresh_ranch_dashboards", schedule=timedelta(minutes=15), max_attempts=3)
+def refresh_ranch_dashboards():
+    build_ranch_dashboards()
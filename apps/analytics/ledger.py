@@ -0,0 +1,130 @@
+"""Per-animal lifetime cost and value rollups (``AnimalLedger``).
+
+Every write to an animal's vaccinations, treatments, mortality record or
+breeding events recomputes that one animal's ledger row with a single
+``UPDATE`` of correlated subqueries over the per-animal indexes, so ranch,
+cohort and animal P&L are plain reads of ``animal_ledgers``.
+"""
+
+from decimal import Decimal
+
+from django.apps import apps as django_apps
+from django.db.models import (
+    Count,
+    DecimalField,
+    ExpressionWrapper,
+    IntegerField,
+    OuterRef,
+    Q,
+    Subquery,
+    Sum,
+    Value,
+)
+from django.db.models.functions import Coalesce, Now
+
+from .models import AnimalLedger
+
+ASSUMED_CALF_VALUE = Decimal("320.00")
+COST_FIELDS = ["purchase_cost", "vaccination_cost", "treatment_cost", "mortality_loss"]
+SUMMED_FIELDS = COST_FIELDS + ["live_births", "realised_value"]
+GROUPS = {"ranch": "ranch_id", "source": "source", "animal": "animal_id"}
+
+_money = DecimalField(max_digits=12, decimal_places=2)
+
+
+def _total(model, tag_field, aggregate, output_field=_money):
+    rows = (
+        model.objects.filter(**{tag_field: OuterRef("animal_id")})
+        .order_by()
+        .values(tag_field)
+        .annotate(total=aggregate)
+        .values("total")
+    )
+    zero = Decimal(0) if output_field is _money else 0
+    return Coalesce(
+        Subquery(rows, output_field=output_field), Value(zero), output_field=output_field
+    )
+
+
+def _rollups(get_model):
+    animal = get_model("animals", "Animal").objects.filter(pk=OuterRef("animal_id"))
+    live_births = _total(
+        get_model("breeding", "BreedingEvent"),
+        "female_tag",
+        Count("id", filter=Q(outcome="live_birth")),
+        IntegerField(),
+    )
+    return {
+        "ranch": Subquery(animal.values("ranch_id")[:1]),
+        "source": Subquery(animal.values("source")[:1]),
+        "purchase_cost": Coalesce(
+            Subquery(animal.values("purchase_price")[:1], output_field=_money),
+            Value(Decimal(0)),
+            output_field=_money,
+        ),
+        "vaccination_cost": _total(get_model("health", "Vaccination"), "animal_tag", Sum("cost")),
+        "treatment_cost": _total(get_model("health", "Treatment"), "animal_tag", Sum("cost")),
+        "mortality_loss": _total(
+            get_model("health", "Mortality"), "animal_tag", Sum("estimated_value")
+        ),
+        "live_births": live_births,
+        "realised_value": ExpressionWrapper(
+            live_births * Value(ASSUMED_CALF_VALUE), output_field=_money
+        ),
+        "updated_at": Now(),
+    }
+
+
+def refresh_ledger(*tags, get_model=django_apps.get_model):
+    """Recompute the ledger rows for ``tags`` (rows must already exist)."""
+    tags = [tag for tag in tags if tag]
+    if tags:
+        AnimalLedger = get_model("analytics", "AnimalLedger")
+        AnimalLedger.objects.filter(animal_id__in=tags).update(**_rollups(get_model))
+
+
+def rebuild_ledger(get_model=django_apps.get_model):
+    """Create missing ledger rows and recompute every row; returns the row count.
+
+    ``get_model`` lets migrations pass their historical app registry.
+    """
+    Animal = get_model("animals", "Animal")
+    AnimalLedger = get_model("analytics", "AnimalLedger")
+    AnimalLedger.objects.bulk_create(
+        [
+            AnimalLedger(animal_id=tag, ranch_id=ranch_id, source=source)
+            for tag, ranch_id, source in Animal.objects.exclude(
+                tag_number__in=AnimalLedger.objects.values("animal_id")
+            ).values_list("tag_number", "ranch_id", "source")
+        ],
+        batch_size=1000,
+        ignore_conflicts=True,
+    )
+    return AnimalLedger.objects.update(**_rollups(get_model))
+
+
+def profit_and_loss(group="ranch", **filters):
+    """Summed costs, value and net per ``group`` (``ranch``, ``source`` or ``animal``)."""
+    key = GROUPS[group]
+    rows = (
+        AnimalLedger.objects.filter(**filters)
+        .values(key)
+        .annotate(animals=Count("animal_id"), **{f"sum_{field}": Sum(field) for field in SUMMED_FIELDS})
+        .order_by(key)
+    )
+    results = []
+    for row in rows:
+        totals = {field: row[f"sum_{field}"] or 0 for field in SUMMED_FIELDS}
+        total_costs = sum(totals[field] for field in COST_FIELDS)
+        results.append(
+            {
+                group: row[key],
+                "animals": row["animals"],
+                "live_births": totals["live_births"],
+                **{field: float(totals[field]) for field in COST_FIELDS},
+                "total_costs": float(total_costs),
+                "realised_value": float(totals["realised_value"]),
+                "net": float(totals["realised_value"] - total_costs),
+            }
+        )
+    return results
@@ -0,0 +1,32 @@
+"""Per-subscriber view of the live dashboard events.
+
+The broker already drops other ranches' events. ``kpis`` events are
+published per ranch, so a subscriber that sees a single ranch gets them as
+they are; one that sees several ranches (or all of them) gets a single
+merged ``kpis`` event per batch instead, recomputed over its whole scope.
+"""
+
+from .services import build_kpis
+
+
+def scope_events(events, ranch_ids):
+    """``events`` as the subscriber limited to ``ranch_ids`` should see them."""
+    kpi_events = [event for event in events if event["type"] == "kpis"]
+    if not kpi_events or (ranch_ids is not None and len(ranch_ids) == 1):
+        return events
+    deltas = {}
+    # Every KPI adds up across ranches, so the merged deltas are sums.
+    for event in kpi_events:
+        for key, value in event["data"]["deltas"].items():
+            deltas[key] = deltas.get(key, 0) + value
+    last = kpi_events[-1]
+    merged = dict(
+        last,
+        ranch=None,
+        data={"ranch": None, "values": build_kpis(ranch_ids=ranch_ids), "deltas": deltas},
+    )
+    return [
+        merged if event is last else event
+        for event in events
+        if event["type"] != "kpis" or event is last
+    ]
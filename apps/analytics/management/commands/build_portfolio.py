@@ -0,0 +1,43 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.analytics.portfolio import build_ranch_dashboards, default_workers, get_portfolio
+
+
+class Command(BaseCommand):
+    help = "Precompute every ranch dashboard in a process pool and print the portfolio totals"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=default_workers())
+        parser.add_argument(
+            "--scaling",
+            help="Comma-separated worker counts to time, e.g. 1,2,4,8 (rebuilds once per count).",
+        )
+
+    def handle(self, *args, **options):
+        if options["scaling"]:
+            try:
+                counts = [int(value) for value in options["scaling"].split(",")]
+            except ValueError:
+                raise CommandError("--scaling must be a list of worker counts.")
+        else:
+            counts = [options["workers"]]
+
+        baseline = None
+        for workers in counts:
+            started = time.monotonic()
+            built = build_ranch_dashboards(workers=workers)
+            elapsed = time.monotonic() - started
+            baseline = baseline or elapsed
+            self.stdout.write(
+                f"{workers:>3} worker(s): {len(built)} ranch(es) in {elapsed:.2f}s"
+                f" (x{baseline / elapsed:.2f})"
+            )
+
+        totals = get_portfolio()["kpis"]
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Portfolio: {totals['ranches']} ranch(es), {totals['total_animals']} animal(s)."
+            )
+        )
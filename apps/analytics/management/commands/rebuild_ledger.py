@@ -0,0 +1,18 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from apps.analytics.ledger import rebuild_ledger
+
+
+class Command(BaseCommand):
+    help = "Recompute every animal's cost/value ledger row (after bulk imports or restores)"
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        with transaction.atomic():
+            rows = rebuild_ledger()
+        self.stdout.write(
+            self.style.SUCCESS(f"Rebuilt {rows} ledger row(s) in {time.monotonic() - started:.2f}s.")
+        )
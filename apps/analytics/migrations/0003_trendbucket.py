@@ -0,0 +1,32 @@
+# Generated by Django 4.2.9 on 2026-10-19 15:25
+
+from django.db import migrations, models
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TrendBucket',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('month', models.DateField()),
+                ('cohort', models.CharField(max_length=20)),
+                ('metrics', models.JSONField(default=dict)),
+                ('computed_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'trend_buckets',
+                'ordering': ['month', 'cohort'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='trendbucket',
+            constraint=models.UniqueConstraint(fields=('month', 'cohort'), name='trend_buckets_month_cohort'),
+        ),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 4.2.9 on 2026-10-19 16:02
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def backfill_ledger(apps, schema_editor):
+    from apps.analytics.ledger import rebuild_ledger
+
+    rebuild_ledger(get_model=apps.get_model)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('animals', '0005_animal_animals_status_c54016_idx'),
+        ('breeding', '0003_breedingevent_breeding_ev_pregnan_d0f777_idx'),
+        ('core', '0002_job'),
+        ('health', '0002_vaccination_vaccination_vaccine_87a695_idx'),
+        ('analytics', '0003_trendbucket'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AnimalLedger',
+            fields=[
+                ('animal', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='ledger', serialize=False, to='animals.animal')),
+                ('source', models.CharField(max_length=20)),
+                ('purchase_cost', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('vaccination_cost', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('treatment_cost', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('mortality_loss', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('live_births', models.IntegerField(default=0)),
+                ('realised_value', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('ranch', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='animal_ledgers', to='core.ranch')),
+            ],
+            options={
+                'db_table': 'animal_ledgers',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='animalledger',
+            index=models.Index(fields=['ranch', 'source'], name='animal_ledg_ranch_i_a6a719_idx'),
+        ),
+        migrations.RunPython(backfill_ledger, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 4.2.9 on 2026-10-19 23:05
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def drop_buckets(apps, schema_editor):
+    # Buckets are a cache without a ranch dimension; they are recomputed on
+    # the next trend request.
+    apps.get_model('analytics', 'TrendBucket').objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_ranchsnapshot'),
+        ('analytics', '0004_animalledger'),
+    ]
+
+    operations = [
+        migrations.RunPython(drop_buckets, migrations.RunPython.noop),
+        migrations.RemoveConstraint(
+            model_name='trendbucket',
+            name='trend_buckets_month_cohort',
+        ),
+        migrations.AlterModelOptions(
+            name='trendbucket',
+            options={'ordering': ['month', 'ranch', 'cohort']},
+        ),
+        migrations.AddField(
+            model_name='trendbucket',
+            name='ranch',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='trend_buckets', to='core.ranch'),
+        ),
+        migrations.AlterField(
+            model_name='trendbucket',
+            name='ranch',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='trend_buckets', to='core.ranch'),
+        ),
+        migrations.AddConstraint(
+            model_name='trendbucket',
+            constraint=models.UniqueConstraint(fields=('month', 'cohort', 'ranch'), name='trend_buckets_month_cohort_ranch'),
+        ),
+    ]
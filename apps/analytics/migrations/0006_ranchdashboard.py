@@ -0,0 +1,28 @@
+# Generated by Django 4.2.9 on 2026-10-19 18:40
+
+import django.core.serializers.json
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_ranchsnapshot'),
+        ('analytics', '0005_trendbucket_ranch'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RanchDashboard',
+            fields=[
+                ('ranch', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='dashboard', serialize=False, to='core.ranch')),
+                ('data', models.JSONField(encoder=django.core.serializers.json.DjangoJSONEncoder)),
+                ('build_seconds', models.FloatField(default=0)),
+                ('computed_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'ranch_dashboards',
+            },
+        ),
+    ]
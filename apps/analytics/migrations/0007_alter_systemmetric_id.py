@@ -0,0 +1,19 @@
+# Generated by Django 4.2.9 on 2026-10-19 21:15
+
+import apps.core.ids
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0006_ranchdashboard'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='systemmetric',
+            name='id',
+            field=models.UUIDField(default=apps.core.ids.uuid7, editable=False, primary_key=True, serialize=False),
+        ),
+    ]
@@ -1,9 +1,11 @@
 import uuid
+from django.core.serializers.json import DjangoJSONEncoder
 from django.db import models
+from apps.core.ids import uuid7
 from apps.core.models import Ranch
 
 class SystemMetric(models.Model):
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
     ranch = models.ForeignKey(Ranch, on_delete=models.CASCADE, related_name='metrics')
     metric_type = models.CharField(max_length=100)
     metric_value = models.DecimalField(max_digits=10, decimal_places=2)
@@ -17,3 +19,52 @@ class SystemMetric(models.Model):
         indexes = [
             models.Index(fields=['ranch', 'metric_type', '-calculation_date']),
         ]
+
+
+class TrendBucket(models.Model):
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    month = models.DateField()  # first day of the month
+    ranch = models.ForeignKey(Ranch, on_delete=models.CASCADE, related_name='trend_buckets')
+    cohort = models.CharField(max_length=20)  # Animal.source
+    metrics = models.JSONField(default=dict)
+    computed_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        db_table = 'trend_buckets'
+        ordering = ['month', 'ranch', 'cohort']
+        constraints = [
+            models.UniqueConstraint(fields=['month', 'cohort', 'ranch'], name='trend_buckets_month_cohort_ranch'),
+        ]
+
+
+class AnimalLedger(models.Model):
+    # Lifetime cost/value rollup per animal, kept current by signals
+    # (see ``ledger``); ranch and source are copied for indexed P&L reads.
+    animal = models.OneToOneField('animals.Animal', on_delete=models.CASCADE, to_field='tag_number', primary_key=True, related_name='ledger')
+    ranch = models.ForeignKey(Ranch, on_delete=models.CASCADE, related_name='animal_ledgers')
+    source = models.CharField(max_length=20)  # Animal.source
+    purchase_cost = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    vaccination_cost = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    treatment_cost = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    mortality_loss = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    live_births = models.IntegerField(default=0)
+    realised_value = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        db_table = 'animal_ledgers'
+        indexes = [
+            models.Index(fields=['ranch', 'source']),
+        ]
+
+
+class RanchDashboard(models.Model):
+    # Precomputed ``build_dashboard_data`` sections for one ranch; merged into
+    # the portfolio view (see ``portfolio``).
+    ranch = models.OneToOneField(Ranch, on_delete=models.CASCADE, primary_key=True, related_name='dashboard')
+    data = models.JSONField(encoder=DjangoJSONEncoder)
+    build_seconds = models.FloatField(default=0)
+    computed_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        db_table = 'ranch_dashboards'
@@ -0,0 +1,161 @@
+"""Per-ranch dashboards built in parallel and merged into a portfolio view.
+
+``build_ranch_dashboards`` runs ``build_dashboard_data`` for each ranch in a
+process pool; every worker opens its own database connection. Payloads are
+stored in ``RanchDashboard`` and ``portfolio_rollup`` merges any set of them
+into portfolio totals, with rates re-weighted by their underlying counts
+rather than averaged per ranch.
+"""
+
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+from django.db import connections
+
+from apps.core.models import Ranch
+from apps.core.routers import read_from_replica
+
+from .models import RanchDashboard
+from .services import build_dashboard_data
+
+SUMMED_KPIS = [
+    "total_animals",
+    "active_animals",
+    "overdue_vaccinations",
+    "recent_mortality_30_days",
+    "last_count_difference",
+]
+SUMMED_COSTS = [
+    "vaccine_cost",
+    "treatment_cost",
+    "mortality_loss",
+    "purchase_cost",
+    "total_costs",
+    "estimated_revenue",
+]
+SOURCE_COUNTS = ["total_events", "conceived", "stillbirths", "animals", "deaths"]
+# Only the sections the rollup reads are built and stored.
+PORTFOLIO_SECTIONS = ["kpis", "breeding_analyzer", "financial_performance"]
+
+
+def default_workers():
+    return getattr(settings, "PORTFOLIO_WORKERS", None) or os.cpu_count() or 1
+
+
+def _ranch_dashboard(ranch_id):
+    started = time.monotonic()
+    with read_from_replica():
+        data = build_dashboard_data({ranch_id}, PORTFOLIO_SECTIONS)
+    return ranch_id, data, time.monotonic() - started
+
+
+def build_ranch_dashboards(ranch_ids=None, workers=None):
+    """Build and store the dashboard of every ranch in ``ranch_ids``.
+
+    Returns ``{ranch_id: RanchDashboard}``. ``workers=1`` builds in-process.
+    """
+    ranches = Ranch.objects.order_by("pk")
+    if ranch_ids is not None:
+        ranches = ranches.filter(pk__in=ranch_ids)
+    ranch_ids = list(ranches.values_list("pk", flat=True))
+    workers = min(workers or default_workers(), len(ranch_ids))
+
+    if workers <= 1:
+        results = [_ranch_dashboard(ranch_id) for ranch_id in ranch_ids]
+    else:
+        # Forked workers must not inherit (and later close) our sockets; each
+        # opens its own connection on first query.
+        connections.close_all()
+        with ProcessPoolExecutor(
+            max_workers=workers, mp_context=multiprocessing.get_context("fork")
+        ) as pool:
+            results = list(pool.map(_ranch_dashboard, ranch_ids))
+
+    stored = {}
+    for ranch_id, data, seconds in results:
+        stored[ranch_id], _ = RanchDashboard.objects.update_or_create(
+            ranch_id=ranch_id, defaults={"data": data, "build_seconds": seconds}
+        )
+    return stored
+
+
+def _pct(numerator, denominator):
+    if not denominator:
+        return 0.0
+    return round((numerator / denominator) * 100, 2)
+
+
+def _source_rollup(rows):
+    totals = {field: sum(row[field] for row in rows) for field in SOURCE_COUNTS}
+    return {
+        "source": rows[0]["source"],
+        "label": rows[0]["label"],
+        **totals,
+        "conception_rate": _pct(totals["conceived"], totals["total_events"]),
+        "stillbirth_rate": _pct(totals["stillbirths"], totals["total_events"]),
+        "calf_survival_rate": round(100 - _pct(totals["deaths"], totals["animals"]), 2),
+    }
+
+
+def portfolio_rollup(dashboards):
+    """Merge ``RanchDashboard`` rows into one portfolio payload."""
+    dashboards = list(dashboards)
+    payloads = [dashboard.data for dashboard in dashboards]
+    kpis = {key: sum(data["kpis"][key] for data in payloads) for key in SUMMED_KPIS}
+    comparison = []
+    if payloads:
+        for i in range(len(payloads[0]["breeding_analyzer"]["comparison"])):
+            comparison.append(
+                _source_rollup([data["breeding_analyzer"]["comparison"][i] for data in payloads])
+            )
+
+    financial = {
+        key: round(sum(data["financial_performance"][key] for data in payloads), 2)
+        for key in SUMMED_COSTS
+    }
+    total_costs = financial["total_costs"]
+    financial["roi_percent"] = (
+        _pct(financial["estimated_revenue"] - total_costs, total_costs) if total_costs else 0.0
+    )
+
+    ranches = []
+    for dashboard in dashboards:
+        data = dashboard.data
+        ranches.append(
+            {
+                "ranch": dashboard.ranch_id,
+                "name": dashboard.ranch.name,
+                "total_animals": data["kpis"]["total_animals"],
+                "active_animals": data["kpis"]["active_animals"],
+                "conception_rate": {
+                    row["source"]: row["conception_rate"]
+                    for row in data["breeding_analyzer"]["comparison"]
+                },
+                "total_costs": data["financial_performance"]["total_costs"],
+                "roi_percent": data["financial_performance"]["roi_percent"],
+                "computed_at": dashboard.computed_at,
+            }
+        )
+    return {
+        "kpis": {**kpis, "ranches": len(dashboards)},
+        "breeding_comparison": comparison,
+        "financial_performance": financial,
+        "ranches": ranches,
+    }
+
+
+def get_portfolio(ranch_ids=None):
+    """Portfolio over ``ranch_ids`` from stored dashboards, building missing ones."""
+    dashboards = RanchDashboard.objects.select_related("ranch").order_by("ranch__name")
+    ranches = Ranch.objects.all()
+    if ranch_ids is not None:
+        dashboards = dashboards.filter(ranch_id__in=ranch_ids)
+        ranches = ranches.filter(pk__in=ranch_ids)
+    missing = list(ranches.filter(dashboard__isnull=True).values_list("pk", flat=True))
+    if missing:
+        # First request for a new ranch; the scheduled job keeps the rest warm.
+        build_ranch_dashboards(missing, workers=1)
+    return portfolio_rollup(dashboards)
@@ -1,13 +1,22 @@
 from datetime import timedelta
 
-from django.db.models import Count, Q, Sum
+from django.core.cache import cache
+from django.db.models import Count, OuterRef, Q, Subquery, Sum
 from django.utils import timezone
 
 from apps.animals.models import Animal
 from apps.breeding.models import BreedingEvent
-from apps.health.models import Mortality, Treatment, Vaccination
+from apps.core.tenancy import scope_to_ranches
+from apps.health.models import Mortality, Vaccination
 from apps.operations.models import HerdCount
 
+from .correlation import health_factors
+from .models import AnimalLedger
+
+
+DASHBOARD_CACHE_KEY = "analytics:dashboard"
+DASHBOARD_CACHE_TIMEOUT = 5 * 60
+
 
 def _pct(numerator, denominator):
     if not denominator:
@@ -19,186 +28,336 @@ def _money(value):
     return float(value or 0)
 
 
-def _by_source_metrics(source):
+def _objects(model, ranch_ids):
+    return scope_to_ranches(model.objects.all(), ranch_ids)
+
+
+def _by_source_metrics(source, ranch_ids=None):
     label_map = {"born": "Local", "imported": "Imported"}
-    breeding_qs = BreedingEvent.objects.filter(female_tag__source=source)
+    breeding_qs = _objects(BreedingEvent, ranch_ids).filter(female_tag__source=source)
     total_events = breeding_qs.count()
     conceived = breeding_qs.filter(pregnancy_confirmed="yes").count()
     stillbirths = breeding_qs.filter(outcome="stillbirth").count()
 
-    animals_in_source = Animal.objects.filter(source=source).count()
-    source_deaths = Mortality.objects.filter(animal_tag__source=source).count()
+    animals_in_source = _objects(Animal, ranch_ids).filter(source=source).count()
+    source_deaths = _objects(Mortality, ranch_ids).filter(animal_tag__source=source).count()
 
     return {
         "source": source,
         "label": label_map.get(source, source.capitalize()),
         "total_events": total_events,
         "conceived": conceived,
+        "stillbirths": stillbirths,
+        "animals": animals_in_source,
+        "deaths": source_deaths,
         "conception_rate": _pct(conceived, total_events),
         "stillbirth_rate": _pct(stillbirths, total_events),
         "calf_survival_rate": round(100 - _pct(source_deaths, animals_in_source), 2),
     }
 
 
-def build_dashboard_data():
-    today = timezone.now().date()
+def build_kpis(today=None, ranch_ids=None):
+    today = today or timezone.now().date()
+    # Each ranch's latest herd count, summed: additive across ranches, so the
+    # portfolio rollup and merged live deltas can add ranches' values up.
+    latest_count = (
+        HerdCount.objects.filter(ranch=OuterRef("ranch"))
+        .order_by("-count_date", "-created_at")
+        .values("pk")[:1]
+    )
+    latest_difference = (
+        _objects(HerdCount, ranch_ids)
+        .filter(pk=Subquery(latest_count))
+        .aggregate(total=Sum("difference"))["total"]
+    )
+    animals = _objects(Animal, ranch_ids)
+    return {
+        "total_animals": animals.count(),
+        "active_animals": animals.filter(status="active").count(),
+        "overdue_vaccinations": _objects(Vaccination, ranch_ids)
+        .filter(next_due_date__lt=today)
+        .count(),
+        "recent_mortality_30_days": _objects(Mortality, ranch_ids).filter(
+            death_date__gte=today - timedelta(days=30)
+        ).count(),
+        "last_count_difference": latest_difference or 0,
+    }
+
+
+SECTIONS = {}
+# Queries each section may issue with a cold cache, including the sections it
+# reads (``chart_data`` reads ``breeding_analyzer`` and ``health_correlation``).
+QUERY_BUDGETS = {}
+UPCOMING_DUE_DAYS = 7
 
-    total_animals = Animal.objects.count()
-    active_animals = Animal.objects.filter(status="active").count()
-    overdue_vaccinations = Vaccination.objects.filter(next_due_date__lt=today).count()
-    recent_mortality_30_days = Mortality.objects.filter(
-        death_date__gte=today - timedelta(days=30)
-    ).count()
 
-    animals_by_species = list(
-        Animal.objects.values("species").annotate(total=Count("tag_number")).order_by("species")
+def section(name, queries):
+    """Register a dashboard section builder ``func(builder) -> dict``."""
+
+    def register(func):
+        SECTIONS[name] = func
+        QUERY_BUDGETS[name] = queries
+        return func
+
+    return register
+
+
+def parse_sections(value):
+    """``"kpis,alerts"`` -> ``["kpis", "alerts"]``; empty means every section."""
+    names = [name.strip() for name in (value or "").split(",") if name.strip()]
+    unknown = sorted(set(names) - set(SECTIONS))
+    if unknown:
+        raise ValueError(f"Unknown section(s): {', '.join(unknown)}.")
+    return names or list(SECTIONS)
+
+
+def dashboard_cache_key(section_name, ranch_ids=None):
+    scope = "all" if ranch_ids is None else ",".join(sorted(str(pk) for pk in ranch_ids))
+    return f"{DASHBOARD_CACHE_KEY}:{section_name}:{scope}"
+
+
+class DashboardBuilder:
+    """Builds dashboard sections for one ranch scope on first use.
+
+    Each section is computed at most once per builder; with ``read_cache`` /
+    ``write_cache`` it is also shared through its own cache key, so a section
+    that reads another (``chart_data``) reuses the cached copy.
+    """
+
+    def __init__(self, ranch_ids=None, read_cache=True, write_cache=True):
+        self.ranch_ids = ranch_ids
+        self.today = timezone.now().date()
+        self.read_cache = read_cache
+        self.write_cache = write_cache
+        self._built = {}
+
+    def section(self, name):
+        if name not in self._built:
+            key = dashboard_cache_key(name, self.ranch_ids)
+            data = cache.get(key) if self.read_cache else None
+            if data is None:
+                data = SECTIONS[name](self)
+                if self.write_cache:
+                    cache.set(key, data, DASHBOARD_CACHE_TIMEOUT)
+            self._built[name] = data
+        return self._built[name]
+
+    def build(self, sections=None):
+        return {name: self.section(name) for name in sections or SECTIONS}
+
+    def objects(self, model):
+        return _objects(model, self.ranch_ids)
+
+
+@section("kpis", queries=5)
+def _kpis(builder):
+    return build_kpis(builder.today, builder.ranch_ids)
+
+
+@section("alerts", queries=7)
+def _alerts(builder):
+    kpis = builder.section("kpis")
+    due_soon = builder.objects(Vaccination).filter(
+        next_due_date__gte=builder.today,
+        next_due_date__lte=builder.today + timedelta(days=UPCOMING_DUE_DAYS),
+    )
+    overdue_tags = list(
+        builder.objects(Vaccination)
+        .filter(next_due_date__lt=builder.today)
+        .order_by("next_due_date")
+        .values_list("animal_tag_id", flat=True)[:10]
     )
+    alerts = []
+    if kpis["overdue_vaccinations"]:
+        alerts.append(
+            {
+                "type": "overdue_vaccinations",
+                "severity": "high",
+                "count": kpis["overdue_vaccinations"],
+                "message": f"{kpis['overdue_vaccinations']} vaccination(s) are overdue.",
+                "animals": list(dict.fromkeys(overdue_tags)),
+            }
+        )
+    due_soon_count = due_soon.count()
+    if due_soon_count:
+        alerts.append(
+            {
+                "type": "vaccinations_due",
+                "severity": "medium",
+                "count": due_soon_count,
+                "message": f"{due_soon_count} vaccination(s) due within {UPCOMING_DUE_DAYS} days.",
+            }
+        )
+    if kpis["recent_mortality_30_days"]:
+        alerts.append(
+            {
+                "type": "recent_mortality",
+                "severity": "high",
+                "count": kpis["recent_mortality_30_days"],
+                "message": f"{kpis['recent_mortality_30_days']} death(s) in the last 30 days.",
+            }
+        )
+    if kpis["last_count_difference"]:
+        alerts.append(
+            {
+                "type": "herd_count_mismatch",
+                "severity": "medium",
+                "count": kpis["last_count_difference"],
+                "message": f"Latest herd count is off by {kpis['last_count_difference']}.",
+            }
+        )
+    return alerts
+
+
+@section("breeding_analyzer", queries=12)
+def _breeding_analyzer(builder):
+    animals = builder.objects(Animal)
+    imported = _by_source_metrics("imported", builder.ranch_ids)
+    local = _by_source_metrics("born", builder.ranch_ids)
 
-    imported = _by_source_metrics("imported")
-    local = _by_source_metrics("born")
-
-    complete_group = BreedingEvent.objects.filter(
-        female_tag__vaccinations__isnull=False
-    ).distinct()
-    incomplete_group = BreedingEvent.objects.filter(
-        female_tag__vaccinations__isnull=True
-    ).distinct()
-
-    complete_total = complete_group.count()
-    complete_yes = complete_group.filter(pregnancy_confirmed="yes").count()
-    incomplete_total = incomplete_group.count()
-    incomplete_yes = incomplete_group.filter(pregnancy_confirmed="yes").count()
-
-    animals_with_treatment = BreedingEvent.objects.filter(
-        female_tag__treatments__isnull=False
-    ).distinct()
-    animals_without_treatment = BreedingEvent.objects.filter(
-        female_tag__treatments__isnull=True
-    ).distinct()
-
-    with_treatment_total = animals_with_treatment.count()
-    with_treatment_yes = animals_with_treatment.filter(pregnancy_confirmed="yes").count()
-    without_treatment_total = animals_without_treatment.count()
-    without_treatment_yes = animals_without_treatment.filter(pregnancy_confirmed="yes").count()
-
-    imported_female_count = Animal.objects.filter(source="imported", sex="female").count()
-    imported_overdue = Animal.objects.filter(
-        source="imported", sex="female", vaccinations__next_due_date__lt=today
+    imported_female_count = animals.filter(source="imported", sex="female").count()
+    imported_overdue = animals.filter(
+        source="imported", sex="female", vaccinations__next_due_date__lt=builder.today
     ).distinct().count()
 
     gap = round(local["conception_rate"] - imported["conception_rate"], 2)
     estimated_recoverable_pregnancies = round((gap / 100) * imported["total_events"], 1)
+    return {
+        "comparison": [imported, local],
+        "root_cause": {
+            "message": f"{imported_overdue}/{imported_female_count or 1} imported females have overdue vaccination schedules.",
+            "correlation_impact": gap,
+        },
+        "recommendation": {
+            "action": "Complete imported cohort vaccination and repeat pregnancy checks after 45 days.",
+            "estimated_recoverable_pregnancies": estimated_recoverable_pregnancies,
+        },
+    }
 
-    vaccine_cost = _money(Vaccination.objects.aggregate(total=Sum("cost"))["total"])
-    treatment_cost = _money(Treatment.objects.aggregate(total=Sum("cost"))["total"])
-    mortality_loss = _money(Mortality.objects.aggregate(total=Sum("estimated_value"))["total"])
 
-    live_birth_events = BreedingEvent.objects.filter(outcome="live_birth").count()
-    assumed_calf_value = 320.0
-    estimated_revenue = round(live_birth_events * assumed_calf_value, 2)
-    total_costs = round(vaccine_cost + treatment_cost + mortality_loss, 2)
-    roi_percent = _pct(estimated_revenue - total_costs, total_costs) if total_costs else 0.0
+@section("health_correlation", queries=1)
+def _health_correlation(builder):
+    factors = health_factors(builder.ranch_ids)
+    by_factor = {item["factor"]: item for item in factors}
+    vaccinated = by_factor["vaccinated"]
+    treated = by_factor["treated"]
+    return {
+        "vaccination_vs_conception": {
+            "complete": vaccinated["with"],
+            "incomplete": vaccinated["without"],
+        },
+        "treatment_history_vs_conception": {
+            "with_treatment": treated["with"],
+            "without_treatment": treated["without"],
+        },
+        "factors": factors,
+    }
+
 
+@section("herd_overview", queries=2)
+def _herd_overview(builder):
+    animals_by_species = list(
+        builder.objects(Animal).values("species").annotate(total=Count("tag_number")).order_by("species")
+    )
     latest_herd_count = (
-        HerdCount.objects.order_by("-count_date").values(
+        builder.objects(HerdCount).order_by("-count_date").values(
             "count_date", "expected_count", "actual_count", "difference"
         ).first()
     )
+    return {
+        "animals_by_species": animals_by_species,
+        "latest_count": latest_herd_count,
+    }
 
-    recent_breeding = list(
-        BreedingEvent.objects.select_related("female_tag", "male_tag")
-        .order_by("-service_date")
-        .values("female_tag_id", "male_tag_id", "service_date", "pregnancy_confirmed")[:10]
-    )
-    recent_vaccinations = list(
-        Vaccination.objects.select_related("animal_tag")
-        .order_by("-date_administered")
-        .values("animal_tag_id", "vaccine_type", "date_administered", "next_due_date")[:10]
-    )
-    recent_mortality = list(
-        Mortality.objects.select_related("animal_tag")
-        .order_by("-death_date")
-        .values("animal_tag_id", "death_date", "cause", "estimated_value")[:10]
+
+@section("financial_performance", queries=1)
+def _financial_performance(builder):
+    ledger = builder.objects(AnimalLedger).aggregate(
+        vaccine_cost=Sum("vaccination_cost"),
+        treatment_cost=Sum("treatment_cost"),
+        mortality_loss=Sum("mortality_loss"),
+        purchase_cost=Sum("purchase_cost"),
+        realised_value=Sum("realised_value"),
     )
+    vaccine_cost = _money(ledger["vaccine_cost"])
+    treatment_cost = _money(ledger["treatment_cost"])
+    mortality_loss = _money(ledger["mortality_loss"])
 
+    estimated_revenue = round(_money(ledger["realised_value"]), 2)
+    total_costs = round(vaccine_cost + treatment_cost + mortality_loss, 2)
+    roi_percent = _pct(estimated_revenue - total_costs, total_costs) if total_costs else 0.0
     return {
-        "kpis": {
-            "total_animals": total_animals,
-            "active_animals": active_animals,
-            "overdue_vaccinations": overdue_vaccinations,
-            "recent_mortality_30_days": recent_mortality_30_days,
-            "last_count_difference": latest_herd_count["difference"] if latest_herd_count else 0,
-        },
-        "breeding_analyzer": {
-            "comparison": [imported, local],
-            "root_cause": {
-                "message": f"{imported_overdue}/{imported_female_count or 1} imported females have overdue vaccination schedules.",
-                "correlation_impact": gap,
-            },
-            "recommendation": {
-                "action": "Complete imported cohort vaccination and repeat pregnancy checks after 45 days.",
-                "estimated_recoverable_pregnancies": estimated_recoverable_pregnancies,
-            },
+        "vaccine_cost": round(vaccine_cost, 2),
+        "treatment_cost": round(treatment_cost, 2),
+        "mortality_loss": round(mortality_loss, 2),
+        "purchase_cost": round(_money(ledger["purchase_cost"]), 2),
+        "total_costs": total_costs,
+        "estimated_revenue": estimated_revenue,
+        "roi_percent": roi_percent,
+    }
+
+
+@section("chart_data", queries=13)
+def _chart_data(builder):
+    imported, local = builder.section("breeding_analyzer")["comparison"]
+    health = builder.section("health_correlation")
+    vaccinated = health["vaccination_vs_conception"]
+    treated = health["treatment_history_vs_conception"]
+    return {
+        "breeding_comparison": {
+            "labels": ["Imported", "Local"],
+            "conception_rate": [imported["conception_rate"], local["conception_rate"]],
+            "stillbirth_rate": [imported["stillbirth_rate"], local["stillbirth_rate"]],
+            "calf_survival_rate": [imported["calf_survival_rate"], local["calf_survival_rate"]],
         },
         "health_correlation": {
-            "vaccination_vs_conception": {
-                "complete": {
-                    "total_events": complete_total,
-                    "conception_rate": _pct(complete_yes, complete_total),
-                },
-                "incomplete": {
-                    "total_events": incomplete_total,
-                    "conception_rate": _pct(incomplete_yes, incomplete_total),
-                },
-            },
-            "treatment_history_vs_conception": {
-                "with_treatment": {
-                    "total_events": with_treatment_total,
-                    "conception_rate": _pct(with_treatment_yes, with_treatment_total),
-                },
-                "without_treatment": {
-                    "total_events": without_treatment_total,
-                    "conception_rate": _pct(without_treatment_yes, without_treatment_total),
-                },
-            },
-        },
-        "herd_overview": {
-            "animals_by_species": animals_by_species,
-            "latest_count": latest_herd_count,
-        },
-        "financial_performance": {
-            "vaccine_cost": round(vaccine_cost, 2),
-            "treatment_cost": round(treatment_cost, 2),
-            "mortality_loss": round(mortality_loss, 2),
-            "total_costs": total_costs,
-            "estimated_revenue": estimated_revenue,
-            "roi_percent": roi_percent,
-        },
-        "chart_data": {
-            "breeding_comparison": {
-                "labels": ["Imported", "Local"],
-                "conception_rate": [imported["conception_rate"], local["conception_rate"]],
-                "stillbirth_rate": [imported["stillbirth_rate"], local["stillbirth_rate"]],
-                "calf_survival_rate": [imported["calf_survival_rate"], local["calf_survival_rate"]],
-            },
-            "health_correlation": {
-                "labels": [
-                    "Complete Vaccination",
-                    "Incomplete Vaccination",
-                    "With Treatment History",
-                    "No Treatment History",
-                ],
-                "conception_rate": [
-                    _pct(complete_yes, complete_total),
-                    _pct(incomplete_yes, incomplete_total),
-                    _pct(with_treatment_yes, with_treatment_total),
-                    _pct(without_treatment_yes, without_treatment_total),
-                ],
-            },
-        },
-        "recent": {
-            "breeding": recent_breeding,
-            "vaccinations": recent_vaccinations,
-            "mortality": recent_mortality,
+            "labels": [
+                "Complete Vaccination",
+                "Incomplete Vaccination",
+                "With Treatment History",
+                "No Treatment History",
+            ],
+            "conception_rate": [
+                vaccinated["complete"]["conception_rate"],
+                vaccinated["incomplete"]["conception_rate"],
+                treated["with_treatment"]["conception_rate"],
+                treated["without_treatment"]["conception_rate"],
+            ],
         },
     }
+
+
+@section("recent", queries=3)
+def _recent(builder):
+    return {
+        "breeding": list(
+            builder.objects(BreedingEvent)
+            .order_by("-service_date")
+            .values("female_tag_id", "male_tag_id", "service_date", "pregnancy_confirmed")[:10]
+        ),
+        "vaccinations": list(
+            builder.objects(Vaccination)
+            .order_by("-date_administered")
+            .values("animal_tag_id", "vaccine_type", "date_administered", "next_due_date")[:10]
+        ),
+        "mortality": list(
+            builder.objects(Mortality)
+            .order_by("-death_date")
+            .values("animal_tag_id", "death_date", "cause", "estimated_value")[:10]
+        ),
+    }
+
+
+def build_dashboard_data(ranch_ids=None, sections=None):
+    """Uncached dashboard payload for ``ranch_ids`` (``None`` for every ranch)."""
+    return DashboardBuilder(ranch_ids, read_cache=False, write_cache=False).build(sections)
+
+
+def refresh_dashboard_cache(ranch_ids=None, sections=None):
+    return DashboardBuilder(ranch_ids, read_cache=False).build(sections)
+
+
+def get_dashboard_data(ranch_ids=None, sections=None):
+    # The all-ranch sections are kept warm by the analytics.refresh_dashboard
+    # job; other scopes are computed per section on first request and cached.
+    return DashboardBuilder(ranch_ids).build(sections)
@@ -0,0 +1,256 @@
+import logging
+import threading
+from contextlib import contextmanager
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from apps.animals.models import Animal
+from apps.breeding.models import BreedingEvent
+from apps.health.models import Mortality, Treatment, Vaccination
+from apps.operations.models import HerdCount
+
+from .events import broker
+from .ledger import refresh_ledger
+from .models import AnimalLedger
+from .services import build_kpis
+from .trends import invalidate_month, invalidate_ranches
+
+logger = logging.getLogger(__name__)
+
+# Last published KPIs per ranch, for the deltas.
+_last_kpis = {}
+_batch = threading.local()
+_flushes = threading.local()
+
+
+def publish_kpis(ranch_ids):
+    # KPIs are published per ranch so subscribers never see other ranches'
+    # figures; ``apps.analytics.live`` merges them for multi-ranch users.
+    for ranch_id in sorted(ranch_ids, key=str):
+        try:
+            kpis = build_kpis(ranch_ids={ranch_id})
+        except Exception:
+            logger.exception("Could not recompute dashboard KPIs for ranch %s.", ranch_id)
+            continue
+        previous = _last_kpis.get(ranch_id)
+        if kpis == previous:
+            continue
+        previous = previous or {}
+        deltas = {key: value - previous[key] for key, value in kpis.items() if key in previous}
+        _last_kpis[ranch_id] = kpis
+        broker.publish("kpis", {"ranch": ranch_id, "values": kpis, "deltas": deltas}, ranch=ranch_id)
+
+
+def _flush_counts():
+    # Per thread: how often each ranch's KPIs were flushed after a commit.
+    return _flushes.__dict__.setdefault("counts", {})
+
+
+def schedule_kpis(ranch_id):
+    """Recompute ``ranch_id``'s KPIs once the current transaction commits.
+
+    Bursts of writes in one transaction share one recomputation per ranch
+    instead of one per row: every write registers a callback, and the first
+    to run after the commit covers the others. A rolled-back transaction
+    drops its callbacks and leaves nothing behind.
+    """
+    counts = _flush_counts()
+    seen = counts.get(ranch_id, 0)
+
+    def flush():
+        if counts.get(ranch_id, 0) != seen:
+            return
+        counts[ranch_id] = seen + 1
+        batch = getattr(_batch, "ranch_ids", None)
+        if batch is not None:
+            batch.add(ranch_id)
+        else:
+            publish_kpis({ranch_id})
+
+    transaction.on_commit(flush)
+
+
+@contextmanager
+def batched_kpis():
+    """Publish KPIs once when the block ends rather than after every commit.
+
+    For loops that commit many small transactions, such as a device sync.
+    """
+    if getattr(_batch, "ranch_ids", None) is not None:
+        yield
+        return
+    _batch.ranch_ids = set()
+    try:
+        yield
+    finally:
+        publish_kpis(_batch.__dict__.pop("ranch_ids"))
+
+
+def _publish_on_commit(event_type, data, ranch_id):
+    transaction.on_commit(lambda: broker.publish(event_type, data, ranch=ranch_id))
+    schedule_kpis(ranch_id)
+
+
+@receiver(post_save, sender=Mortality)
+def mortality_recorded(sender, instance, created, **kwargs):
+    if created:
+        _publish_on_commit(
+            "mortality",
+            {
+                "animal_tag": instance.animal_tag_id,
+                "death_date": instance.death_date,
+                "cause": instance.cause,
+                "estimated_value": instance.estimated_value,
+            },
+            instance.ranch_id,
+        )
+
+
+@receiver(post_save, sender=Vaccination)
+def vaccination_recorded(sender, instance, created, **kwargs):
+    if created:
+        _publish_on_commit(
+            "vaccination",
+            {
+                "animal_tag": instance.animal_tag_id,
+                "vaccine_type": instance.vaccine_type,
+                "date_administered": instance.date_administered,
+                "next_due_date": instance.next_due_date,
+            },
+            instance.ranch_id,
+        )
+
+
+@receiver(post_save, sender=HerdCount)
+def herd_count_recorded(sender, instance, created, **kwargs):
+    if created:
+        _publish_on_commit(
+            "herd_count",
+            {
+                "ranch": instance.ranch_id,
+                "count_date": instance.count_date,
+                "species": instance.species,
+                "expected_count": instance.expected_count,
+                "actual_count": instance.actual_count,
+                "difference": instance.difference,
+            },
+            instance.ranch_id,
+        )
+
+
+@receiver(post_save, sender=BreedingEvent)
+def breeding_recorded(sender, instance, created, **kwargs):
+    if created:
+        _publish_on_commit(
+            "breeding",
+            {
+                "female_tag": instance.female_tag_id,
+                "service_date": instance.service_date,
+                "pregnancy_confirmed": instance.pregnancy_confirmed,
+            },
+            instance.ranch_id,
+        )
+
+
+@receiver(post_save, sender=Animal)
+@receiver(post_delete, sender=Animal)
+def herd_changed(sender, instance, **kwargs):
+    schedule_kpis(instance.ranch_id)
+
+
+# Trend buckets for completed months are stored once per ranch; any write
+# that lands in such a month (offline devices sync late) has to drop that
+# ranch's buckets, and an animal changing ranch drops both ranches' buckets.
+TREND_DATE_FIELDS = {
+    BreedingEvent: "service_date",
+    Mortality: "death_date",
+    Vaccination: "date_administered",
+}
+
+
+def _trend_month_changed(sender, instance, **kwargs):
+    date_field = TREND_DATE_FIELDS[sender]
+    invalidate_month(getattr(instance, date_field), instance.ranch_id)
+    previous = getattr(instance, "_trend_previous_date", None)
+    if previous and previous != getattr(instance, date_field):
+        invalidate_month(previous, instance.ranch_id)
+
+
+def _remember_trend_date(sender, instance, raw=False, **kwargs):
+    if instance._state.adding or raw:
+        return
+    instance._trend_previous_date = (
+        sender.objects.filter(pk=instance.pk)
+        .values_list(TREND_DATE_FIELDS[sender], flat=True)
+        .first()
+    )
+
+
+for _model in TREND_DATE_FIELDS:
+    pre_save.connect(_remember_trend_date, sender=_model, dispatch_uid=f"trend-pre-{_model.__name__}")
+    post_save.connect(_trend_month_changed, sender=_model, dispatch_uid=f"trend-save-{_model.__name__}")
+    post_delete.connect(
+        _trend_month_changed, sender=_model, dispatch_uid=f"trend-delete-{_model.__name__}"
+    )
+
+
+@receiver(pre_save, sender=Animal)
+def remember_trend_ranch(sender, instance, raw=False, **kwargs):
+    loaded = getattr(instance, "_loaded_ranch_id", None)
+    if not raw and not instance._state.adding and loaded not in (None, instance.ranch_id):
+        instance._trend_previous_ranch = loaded
+
+
+@receiver(post_save, sender=Animal)
+def trend_ranch_changed(sender, instance, **kwargs):
+    previous = instance.__dict__.pop("_trend_previous_ranch", None)
+    if previous is not None:
+        invalidate_ranches(previous, instance.ranch_id)
+
+
+# Ledger rows are recomputed for the animal each cost/value record belongs
+# to, and for its previous animal when a record is re-tagged.
+LEDGER_TAG_FIELDS = {
+    BreedingEvent: "female_tag_id",
+    Mortality: "animal_tag_id",
+    Treatment: "animal_tag_id",
+    Vaccination: "animal_tag_id",
+}
+
+
+def _remember_ledger_tag(sender, instance, raw=False, **kwargs):
+    if instance._state.adding or raw:
+        return
+    instance._ledger_previous_tag = (
+        sender.objects.filter(pk=instance.pk)
+        .values_list(LEDGER_TAG_FIELDS[sender], flat=True)
+        .first()
+    )
+
+
+def _ledger_record_changed(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    tag = getattr(instance, LEDGER_TAG_FIELDS[sender])
+    previous = getattr(instance, "_ledger_previous_tag", None)
+    refresh_ledger(tag, previous if previous != tag else None)
+
+
+@receiver(post_save, sender=Animal)
+def animal_ledger_changed(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    AnimalLedger.objects.get_or_create(
+        animal_id=instance.pk, defaults={"ranch_id": instance.ranch_id, "source": instance.source}
+    )
+    refresh_ledger(instance.pk)
+
+
+for _model in LEDGER_TAG_FIELDS:
+    pre_save.connect(_remember_ledger_tag, sender=_model, dispatch_uid=f"ledger-pre-{_model.__name__}")
+    post_save.connect(_ledger_record_changed, sender=_model, dispatch_uid=f"ledger-save-{_model.__name__}")
+    post_delete.connect(
+        _ledger_record_changed, sender=_model, dispatch_uid=f"ledger-delete-{_model.__name__}"
+    )
@@ -1,3 +1,640 @@
-from django.test import TestCase
+import json
+from datetime import date
+from decimal import Decimal
+from unittest import mock
+from wsgiref.util import setup_testing_defaults
 
-# Create your tests here.
+from asgiref.sync import sync_to_async
+from django.core.handlers.wsgi import WSGIHandler
+from django.db import connection, transaction
+from django.test import AsyncClient, TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from apps.animals.models import Animal
+from apps.breeding.models import BreedingEvent
+from apps.core.models import Ranch, User
+from apps.health.models import Mortality, Treatment, Vaccination
+from apps.operations.models import HerdCount
+from kris import async_views
+
+from . import columnar, correlation, signals
+from .events import broker
+from .ledger import rebuild_ledger
+from .models import AnimalLedger, RanchDashboard, TrendBucket
+from .portfolio import build_ranch_dashboards
+from .services import QUERY_BUDGETS, SECTIONS, DashboardBuilder, build_dashboard_data, build_kpis
+from .trends import add_months, build_trends, month_start
+
+
+class DashboardEventTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="manager", password="pass12345")
+        cls.ranch = Ranch.objects.create(name="Kisombwa Ranch", owner=cls.user)
+        cls.animal = Animal.objects.create(
+            tag_number="COW001", ranch=cls.ranch, species="cattle", sex="female", source="born"
+        )
+        other_owner = User.objects.create_user(username="neighbour", password="pass12345")
+        cls.other_ranch = Ranch.objects.create(name="Other Ranch", owner=other_owner)
+        cls.other_animal = Animal.objects.create(
+            tag_number="COW900", ranch=cls.other_ranch, species="cattle", sex="female", source="born"
+        )
+
+    def setUp(self):
+        broker.clear()
+        signals._last_kpis.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def _record_mortality(self, animal=None):
+        with self.captureOnCommitCallbacks(execute=True):
+            Mortality.objects.create(
+                animal_tag=animal or self.animal, death_date=date.today(), cause="Bloat"
+            )
+
+    def test_mortality_publishes_event_and_kpi_delta_after_commit(self):
+        since = broker.last_id
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            Mortality.objects.create(animal_tag=self.animal, death_date=date.today())
+        self.assertEqual(broker.events_since(since), [])
+        for callback in callbacks:
+            callback()
+
+        events = {event["type"]: event for event in broker.events_since(since)}
+        self.assertEqual(set(events), {"mortality", "kpis"})
+        self.assertEqual(events["mortality"]["data"]["animal_tag"], "COW001")
+        self.assertEqual(events["kpis"]["data"]["values"]["recent_mortality_30_days"], 1)
+
+        self._record_mortality()
+        later = [e for e in broker.events_since(events["kpis"]["id"]) if e["type"] == "kpis"]
+        self.assertEqual(len(later), 1)
+        self.assertEqual(later[0]["data"]["deltas"]["recent_mortality_30_days"], 1)
+
+    def test_writes_in_one_transaction_share_one_kpi_recomputation(self):
+        since = broker.last_id
+        with mock.patch.object(
+            signals, "build_kpis", wraps=signals.build_kpis
+        ) as build_kpis, self.captureOnCommitCallbacks(execute=True):
+            for tag in ("COW002", "COW003", "COW004"):
+                Animal.objects.create(
+                    tag_number=tag, ranch=self.ranch, species="cattle", sex="female", source="born"
+                )
+        build_kpis.assert_called_once_with(ranch_ids={self.ranch.pk})
+        [kpis] = [event for event in broker.events_since(since) if event["type"] == "kpis"]
+        self.assertEqual(kpis["data"]["values"]["total_animals"], 4)
+
+    def test_rolled_back_writes_do_not_hold_back_later_kpis(self):
+        since = broker.last_id
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            with self.assertRaises(ZeroDivisionError), transaction.atomic():
+                Mortality.objects.create(animal_tag=self.animal, death_date=date.today())
+                1 / 0
+        self.assertEqual(callbacks, [])
+
+        self._record_mortality()
+        [kpis] = [event for event in broker.events_since(since) if event["type"] == "kpis"]
+        self.assertEqual(kpis["data"]["values"]["recent_mortality_30_days"], 1)
+
+    def test_batched_kpis_recompute_once_after_many_commits(self):
+        with mock.patch.object(signals, "build_kpis", wraps=signals.build_kpis) as build_kpis:
+            with signals.batched_kpis():
+                self._record_mortality()
+                self._record_mortality()
+                build_kpis.assert_not_called()
+        build_kpis.assert_called_once_with(ranch_ids={self.ranch.pk})
+
+    def test_long_poll_returns_missed_events(self):
+        since = broker.last_id
+        self._record_mortality()
+        response = self.client.get(f"/api/analytics/events/?since={since}&timeout=0")
+        self.assertEqual(response.status_code, 200)
+        body = response.json()
+        self.assertIn("mortality", [event["type"] for event in body["events"]])
+        self.assertEqual(body["last_id"], broker.last_id)
+
+        response = self.client.get(f"/api/analytics/events/?since={body['last_id']}&timeout=0")
+        self.assertEqual(response.json()["events"], [])
+
+    def test_other_ranches_events_are_not_delivered(self):
+        since = broker.last_id
+        self._record_mortality(self.other_animal)
+        response = self.client.get(f"/api/analytics/events/?since={since}&timeout=0")
+        body = response.json()
+        self.assertEqual(body["events"], [])
+        self.assertEqual(body["last_id"], broker.last_id)
+
+        self._record_mortality()
+        events = self.client.get(f"/api/analytics/events/?since={since}&timeout=0").json()["events"]
+        kpis = [event for event in events if event["type"] == "kpis"]
+        self.assertEqual([event["ranch"] for event in events], [str(self.ranch.pk)] * 2)
+        self.assertEqual(kpis[0]["data"]["values"]["recent_mortality_30_days"], 1)
+        self.assertEqual(kpis[0]["data"]["values"]["total_animals"], 1)
+
+    def test_multi_ranch_subscribers_get_one_merged_kpi_event(self):
+        admin = User.objects.create_superuser(username="admin", password="pass12345")
+        self.client.force_authenticate(admin)
+        since = broker.last_id
+        self._record_mortality()
+        self._record_mortality(self.other_animal)
+        events = self.client.get(f"/api/analytics/events/?since={since}&timeout=0").json()["events"]
+        self.assertEqual(sorted(event["type"] for event in events), ["kpis", "mortality", "mortality"])
+        [kpis] = [event["data"] for event in events if event["type"] == "kpis"]
+        self.assertIsNone(kpis["ranch"])
+        self.assertEqual(kpis["values"]["recent_mortality_30_days"], 2)
+        self.assertEqual(kpis["values"]["total_animals"], 2)
+
+    def test_dashboard_page_requires_login_and_is_scoped(self):
+        response = self.client.get("/dashboard/")
+        self.assertEqual(response.status_code, 302)
+        self.assertTrue(response["Location"].startswith("/admin/login/"))
+
+        self.client.force_login(self.user)
+        page = b"".join(self.client.get("/dashboard/").streaming_content).decode()
+        scope = page.split('id="kpi-scope" type="application/json">', 1)[1].split("</script>", 1)[0]
+        self.assertEqual(json.loads(scope), [str(self.ranch.pk)])
+
+    def test_event_stream_ends_after_one_batch_under_wsgi(self):
+        self.client.force_login(self.user)
+        since = broker.last_id
+        event = broker.publish("mortality", {"animal_tag": "COW001"}, ranch=self.ranch.pk)
+        environ = {
+            "REQUEST_METHOD": "GET",
+            "PATH_INFO": "/api/analytics/events/stream/",
+            "HTTP_HOST": "testserver",
+            "HTTP_COOKIE": f"sessionid={self.client.cookies['sessionid'].value}",
+            "HTTP_LAST_EVENT_ID": str(since),
+        }
+        setup_testing_defaults(environ)
+        statuses = []
+        body = WSGIHandler()(environ, lambda status, headers: statuses.append(status))
+        try:
+            page = b"".join(body).decode()
+        finally:
+            body.close()
+
+        self.assertEqual(statuses, ["200 OK"])
+        self.assertIn(f"id: {event['id']}\nevent: mortality\n", page)
+
+        environ["HTTP_LAST_EVENT_ID"] = str(event["id"])
+        with mock.patch.object(async_views, "EVENT_STREAM_HEARTBEAT", 0.01):
+            body = WSGIHandler()(environ, lambda status, headers: None)
+            self.assertEqual(b"".join(body).decode(), f"retry: 1000\n: connected {event['id']}\n\n")
+            body.close()
+
+    async def test_event_stream_replays_from_last_event_id(self):
+        client = AsyncClient()
+        response = await client.get("/api/analytics/events/stream/")
+        self.assertEqual(response.status_code, 401)
+
+        since = broker.last_id
+        broker.publish("mortality", {"animal_tag": "COW900"}, ranch=self.other_ranch.pk)
+        event = broker.publish(
+            "mortality", {"animal_tag": "COW001", "death_date": date(2024, 3, 1)}, ranch=self.ranch.pk
+        )
+        await sync_to_async(client.force_login)(self.user)
+        response = await client.get(
+            "/api/analytics/events/stream/", headers={"last-event-id": str(since)}
+        )
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        chunks = []
+        async for chunk in response.streaming_content:
+            chunks.append(chunk.decode())
+            if len(chunks) == 2:
+                break
+        await response.streaming_content.aclose()
+
+        self.assertIn(f"id: {event['id']}\nevent: mortality\n", chunks[1])
+        self.assertNotIn("COW900", chunks[1])
+        data = chunks[1].split("data: ", 1)[1].split("\n", 1)[0]
+        self.assertEqual(json.loads(data), {"animal_tag": "COW001", "death_date": "2024-03-01"})
+
+
+class TrendTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="manager", password="pass12345")
+        ranch = Ranch.objects.create(name="Kisombwa Ranch", owner=cls.user)
+        cls.this_month = month_start(date.today())
+        cls.last_month = add_months(cls.this_month, -1)
+        cls.imported = Animal.objects.create(
+            tag_number="IMP001", ranch=ranch, species="cattle", sex="female", source="imported"
+        )
+        cls.local = Animal.objects.create(
+            tag_number="LOC001", ranch=ranch, species="cattle", sex="female", source="born"
+        )
+        for animal, confirmed, outcome in [
+            (cls.imported, "yes", "stillbirth"),
+            (cls.imported, "no", ""),
+            (cls.local, "yes", "live_birth"),
+        ]:
+            BreedingEvent.objects.create(
+                female_tag=animal,
+                service_date=cls.last_month,
+                method="natural",
+                pregnancy_confirmed=confirmed,
+                outcome=outcome,
+            )
+        Vaccination.objects.create(
+            animal_tag=cls.imported, vaccine_type="FMD", date_administered=cls.this_month
+        )
+
+    def test_monthly_series_per_cohort(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        response = client.get("/api/analytics/trends/?months=3&cohort=imported,born")
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data["months"][-2:], [f"{self.last_month:%Y-%m}", f"{self.this_month:%Y-%m}"])
+        imported = data["cohorts"]["imported"]
+        self.assertEqual(imported["breeding_events"], [0, 2, 0])
+        self.assertEqual(imported["conception_rate"], [0.0, 50.0, 0.0])
+        self.assertEqual(imported["stillbirth_rate"], [0.0, 50.0, 0.0])
+        self.assertEqual(imported["vaccinations"], [0, 0, 1])
+        self.assertEqual(data["cohorts"]["born"]["conception_rate"], [0.0, 100.0, 0.0])
+        self.assertNotIn("purchased", data["cohorts"])
+        self.assertEqual(client.get("/api/analytics/trends/?cohort=calves").status_code, 400)
+
+    def test_completed_months_are_stored_and_only_current_month_recomputed(self):
+        build_trends(months=6)
+        self.assertFalse(TrendBucket.objects.filter(month=self.this_month).exists())
+        self.assertEqual(TrendBucket.objects.filter(month=self.last_month).count(), 3)
+
+        # Ranch ids, bucket lookup plus the three grouped queries for the current month.
+        with self.assertNumQueries(5):
+            again = build_trends(months=6)
+        self.assertEqual(again["cohorts"]["imported"]["breeding_events"][-2], 2)
+
+    def test_late_synced_record_drops_its_months_buckets(self):
+        build_trends(months=2)
+        Mortality.objects.create(animal_tag=self.local, death_date=self.last_month)
+        self.assertFalse(TrendBucket.objects.filter(month=self.last_month).exists())
+        self.assertEqual(build_trends(months=2)["cohorts"]["born"]["mortality"], [1, 0])
+
+    def test_trends_are_scoped_to_the_users_ranches(self):
+        other_owner = User.objects.create_user(username="neighbour", password="pass12345")
+        other_ranch = Ranch.objects.create(name="Other Ranch", owner=other_owner)
+        other = Animal.objects.create(
+            tag_number="OTH001", ranch=other_ranch, species="cattle", sex="female", source="imported"
+        )
+        BreedingEvent.objects.create(
+            female_tag=other, service_date=self.last_month, method="natural", pregnancy_confirmed="yes"
+        )
+        client = APIClient()
+        client.force_authenticate(self.user)
+        imported = client.get("/api/analytics/trends/?months=2").json()["cohorts"]["imported"]
+        self.assertEqual(imported["breeding_events"], [2, 0])
+        self.assertEqual(TrendBucket.objects.filter(ranch=other_ranch).count(), 0)
+
+        everywhere = build_trends(months=2)["cohorts"]["imported"]
+        self.assertEqual(everywhere["breeding_events"], [3, 0])
+        self.assertEqual(everywhere["conception_rate"], [66.67, 0.0])
+
+        # Moving the animal re-homes its events, so both ranches' buckets go.
+        other.ranch = self.imported.ranch
+        other.save()
+        self.assertFalse(TrendBucket.objects.exists())
+        imported = client.get("/api/analytics/trends/?months=2").json()["cohorts"]["imported"]
+        self.assertEqual(imported["breeding_events"], [3, 0])
+
+
+class CohortEngineTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="manager", password="pass12345")
+        cls.ranch = Ranch.objects.create(name="Kisombwa Ranch", owner=cls.user)
+        for tag, source, breed, born in [
+            ("IMP1", "imported", "Boran", date(2020, 3, 1)),
+            ("IMP2", "imported", "Boran", date(2021, 3, 1)),
+            ("LOC1", "born", "Ankole", date(2020, 5, 1)),
+        ]:
+            Animal.objects.create(
+                tag_number=tag, ranch=cls.ranch, species="cattle", sex="female",
+                source=source, breed=breed, date_of_birth=born,
+            )
+        for tag, confirmed in [("IMP1", "yes"), ("IMP1", "no"), ("IMP2", "no"), ("LOC1", "yes")]:
+            BreedingEvent.objects.create(
+                female_tag_id=tag, service_date=date(2024, 1, 1), method="natural",
+                pregnancy_confirmed=confirmed,
+            )
+        Vaccination.objects.create(
+            animal_tag_id="LOC1", vaccine_type="FMD", date_administered=date(2024, 1, 1),
+            next_due_date=date(2099, 1, 1),
+        )
+
+    def setUp(self):
+        columnar.clear_frames()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_cohort_grid_matches_orm_counts(self):
+        response = self.client.get(
+            "/api/analytics/cohorts/?by=source,vaccination_status"
+            "&metrics=animals,breeding_events,conception_rate"
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.json()["rows"],
+            [
+                {"source": "born", "vaccination_status": "current", "animals": 1,
+                 "breeding_events": 1, "conception_rate": 100.0},
+                {"source": "imported", "vaccination_status": "unvaccinated", "animals": 2,
+                 "breeding_events": 3, "conception_rate": 33.33},
+            ],
+        )
+        by_year = self.client.get("/api/analytics/cohorts/?by=birth_year").json()["rows"]
+        self.assertEqual([(row["birth_year"], row["animals"]) for row in by_year], [(2020, 2), (2021, 1)])
+        self.assertEqual(self.client.get("/api/analytics/cohorts/?by=colour").status_code, 400)
+
+    def test_incremental_refresh_picks_up_new_rows_and_events(self):
+        frame = columnar.get_frame(self.ranch.pk)
+        Animal.objects.create(
+            tag_number="PUR1", ranch=self.ranch, species="cattle", sex="female",
+            source="purchased", breed="Boran",
+        )
+        Mortality.objects.create(animal_tag_id="IMP2", death_date=date(2024, 6, 1))
+        with mock.patch.object(columnar, "_load", wraps=columnar._load) as load:
+            frame = columnar.get_frame(self.ranch.pk)
+        load.assert_called_once()
+        self.assertEqual(len(frame), 4)
+
+        rows = columnar.cohort_grid([frame], ["source"], ["animals", "mortality_rate"])
+        self.assertEqual(
+            {row["source"]: (row["animals"], row["mortality_rate"]) for row in rows},
+            {"born": (1, 0.0), "imported": (2, 50.0), "purchased": (1, 0.0)},
+        )
+
+
+    def test_animals_leaving_the_ranch_drop_out_of_its_frame(self):
+        other = Ranch.objects.create(name="Kapiri Ranch", owner=self.user)
+        frame = columnar.get_frame(self.ranch.pk)
+        columnar.get_frame(other.pk)
+        moved = Animal.objects.get(pk="IMP2")
+        moved.ranch = other
+        moved.save()
+        Animal.objects.filter(pk="LOC1").delete()
+
+        frame = columnar.get_frame(self.ranch.pk)
+        self.assertEqual(frame.tags, ["IMP1"])
+        self.assertEqual(columnar.get_frame(other.pk).tags, ["IMP2"])
+        rows = columnar.cohort_grid([frame], ["source"], ["animals", "breeding_events"])
+        self.assertEqual(rows, [{"source": "imported", "animals": 1, "breeding_events": 2}])
+
+class HealthFactorTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        user = User.objects.create_user(username="manager", password="pass12345")
+        ranch = Ranch.objects.create(name="Kisombwa Ranch", owner=user)
+        for tag, source in [("VAC1", "born"), ("VAC2", "born"), ("IMP1", "imported"), ("IMP2", "imported")]:
+            Animal.objects.create(
+                tag_number=tag, ranch=ranch, species="cattle", sex="female", source=source,
+                date_of_birth=date(2020, 1, 1),
+            )
+        for tag in ["VAC1", "VAC2"]:
+            Vaccination.objects.create(
+                animal_tag_id=tag, vaccine_type="FMD", date_administered=date(2024, 1, 1),
+                next_due_date=date(2025, 1, 1),
+            )
+        Vaccination.objects.create(
+            animal_tag_id="IMP2", vaccine_type="FMD", date_administered=date(2023, 1, 1),
+            next_due_date=date(2023, 6, 1),
+        )
+        Treatment.objects.create(animal_tag_id="IMP1", treatment_date=date(2024, 2, 1))
+        for tag, confirmed in [
+            ("VAC1", "yes"), ("VAC1", "yes"), ("VAC2", "yes"), ("VAC2", "no"),
+            ("IMP1", "no"), ("IMP1", "no"), ("IMP2", "no"), ("IMP2", "yes"),
+        ]:
+            BreedingEvent.objects.create(
+                female_tag_id=tag, service_date=date(2024, 3, 1), method="natural",
+                pregnancy_confirmed=confirmed,
+            )
+
+    def test_feature_matrix_is_one_query(self):
+        with self.assertNumQueries(1):
+            conceived, features = correlation.build_feature_matrix()
+        self.assertEqual(features.shape, (8, len(correlation.FACTORS)))
+        self.assertEqual(int(conceived.sum()), 4)
+
+    def test_factors_are_ranked_with_rates_and_intervals(self):
+        factors = {item["factor"]: item for item in correlation.health_factors()}
+        vaccinated = factors["vaccinated"]
+        self.assertEqual(vaccinated["with"], {"total_events": 6, "conception_rate": 66.67})
+        self.assertEqual(vaccinated["without"], {"total_events": 2, "conception_rate": 0.0})
+        self.assertEqual(vaccinated["delta"], 66.67)
+        self.assertLess(vaccinated["ci_low"], vaccinated["delta"])
+        self.assertGreater(vaccinated["ci_high"], vaccinated["delta"])
+        self.assertEqual(factors["vaccination_overdue"]["with"]["total_events"], 2)
+        self.assertEqual(factors["recent_illness"]["with"], {"total_events": 2, "conception_rate": 0.0})
+        self.assertEqual(factors["young_dam"]["with"]["total_events"], 0)
+
+        ranked = correlation.health_factors()
+        self.assertIn(ranked[-1]["factor"], {"young_dam", "repeat_treatments", "artificial_insemination"})
+        deltas = [abs(item["delta"]) for item in ranked if item["with"]["total_events"]]
+        self.assertEqual(deltas, sorted(deltas, reverse=True))
+
+        health = build_dashboard_data()["health_correlation"]
+        self.assertEqual(health["vaccination_vs_conception"]["complete"], vaccinated["with"])
+        self.assertEqual(health["factors"], ranked)
+
+
+class LedgerTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="manager", password="pass12345")
+        cls.ranch = Ranch.objects.create(name="Kisombwa Ranch", owner=cls.user)
+        cls.imported = Animal.objects.create(
+            tag_number="IMP1", ranch=cls.ranch, species="cattle", sex="female",
+            source="imported", purchase_price=Decimal("900.00"),
+        )
+        cls.local = Animal.objects.create(
+            tag_number="LOC1", ranch=cls.ranch, species="cattle", sex="female", source="born"
+        )
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_ledger_follows_cost_and_value_writes(self):
+        vaccination = Vaccination.objects.create(
+            animal_tag=self.imported, vaccine_type="FMD", date_administered=date(2024, 1, 1),
+            cost=Decimal("15.50"),
+        )
+        Treatment.objects.create(
+            animal_tag=self.imported, treatment_date=date(2024, 2, 1), cost=Decimal("40.00")
+        )
+        BreedingEvent.objects.create(
+            female_tag=self.local, service_date=date(2023, 1, 1), method="natural",
+            outcome="live_birth",
+        )
+        ledger = AnimalLedger.objects.get(pk="IMP1")
+        self.assertEqual(
+            (ledger.purchase_cost, ledger.vaccination_cost, ledger.treatment_cost, ledger.source),
+            (Decimal("900.00"), Decimal("15.50"), Decimal("40.00"), "imported"),
+        )
+        self.assertEqual(AnimalLedger.objects.get(pk="LOC1").realised_value, Decimal("320.00"))
+
+        vaccination.animal_tag = self.local
+        vaccination.save()
+        self.assertEqual(AnimalLedger.objects.get(pk="IMP1").vaccination_cost, 0)
+        self.assertEqual(AnimalLedger.objects.get(pk="LOC1").vaccination_cost, Decimal("15.50"))
+        vaccination.delete()
+        self.assertEqual(AnimalLedger.objects.get(pk="LOC1").vaccination_cost, 0)
+
+        Mortality.objects.create(
+            animal_tag=self.imported, death_date=date(2024, 6, 1), estimated_value=Decimal("500.00")
+        )
+        self.assertEqual(AnimalLedger.objects.get(pk="IMP1").mortality_loss, Decimal("500.00"))
+
+        self.imported.delete()
+        self.assertFalse(AnimalLedger.objects.filter(pk="IMP1").exists())
+
+    def test_profit_and_loss_by_cohort_and_rebuild(self):
+        Treatment.objects.create(
+            animal_tag=self.imported, treatment_date=date(2024, 2, 1), cost=Decimal("40.00")
+        )
+        AnimalLedger.objects.all().delete()
+        self.assertEqual(rebuild_ledger(), 2)
+
+        response = self.client.get("/api/analytics/pnl/?by=source")
+        self.assertEqual(response.status_code, 200)
+        rows = {row["source"]: row for row in response.json()["rows"]}
+        self.assertEqual(rows["imported"]["total_costs"], 940.0)
+        self.assertEqual(rows["imported"]["net"], -940.0)
+        self.assertEqual(rows["born"]["animals"], 1)
+
+        response = self.client.get("/api/analytics/pnl/?by=animal&animal=IMP1")
+        self.assertEqual([row["animal"] for row in response.json()["rows"]], ["IMP1"])
+        self.assertEqual(self.client.get("/api/analytics/pnl/?by=breed").status_code, 400)
+        self.assertEqual(self.client.get("/api/analytics/pnl/?ranch=nope").status_code, 400)
+        self.assertEqual(
+            build_dashboard_data()["financial_performance"]["treatment_cost"], 40.0
+        )
+
+    def test_dashboard_is_scoped_to_the_users_ranches(self):
+        neighbour = User.objects.create_user(username="neighbour", password="pass12345")
+        other = Ranch.objects.create(name="Kapiri Ranch", owner=neighbour)
+        Animal.objects.create(
+            tag_number="KAP1", ranch=other, species="cattle", sex="female", source="born"
+        )
+        Treatment.objects.create(
+            animal_tag_id="KAP1", treatment_date=date(2024, 2, 1), cost=Decimal("75.00")
+        )
+
+        data = self.client.get("/api/analytics/dashboard/").json()
+        self.assertEqual(data["kpis"]["total_animals"], 2)
+        self.assertEqual(data["financial_performance"]["treatment_cost"], 0)
+        self.assertEqual(build_dashboard_data()["kpis"]["total_animals"], 3)
+        response = self.client.get(f"/api/analytics/dashboard/?ranch={other.pk}")
+        self.assertEqual(response.status_code, 404)
+
+
+class PortfolioTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="owner", password="pass12345")
+        neighbour = User.objects.create_user(username="neighbour", password="pass12345")
+        cls.ranches = [
+            Ranch.objects.create(name="Kisombwa Ranch", owner=cls.user),
+            Ranch.objects.create(name="Kapiri Ranch", owner=cls.user),
+        ]
+        Ranch.objects.create(name="Mumbwa Ranch", owner=neighbour)
+        for ranch, outcomes in zip(cls.ranches, [["yes", "yes", "no"], ["no"]]):
+            for i, confirmed in enumerate(outcomes):
+                cow = Animal.objects.create(
+                    tag_number=f"{ranch.name[:3].upper()}{i}", ranch=ranch, species="cattle",
+                    sex="female", source="imported",
+                )
+                BreedingEvent.objects.create(
+                    female_tag=cow, service_date=date(2024, 1, 1), method="natural",
+                    pregnancy_confirmed=confirmed,
+                )
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_rollup_weights_rates_by_events(self):
+        stored = build_ranch_dashboards([ranch.pk for ranch in self.ranches], workers=1)
+        self.assertEqual(set(stored), {ranch.pk for ranch in self.ranches})
+
+        data = self.client.get("/api/analytics/portfolio/").json()
+        self.assertEqual(data["kpis"]["ranches"], 2)
+        self.assertEqual(data["kpis"]["total_animals"], 4)
+        imported = data["breeding_comparison"][0]
+        self.assertEqual((imported["source"], imported["total_events"]), ("imported", 4))
+        # 2 of 4 events conceived, not the 33.33% mean of 66.67% and 0%.
+        self.assertEqual(imported["conception_rate"], 50.0)
+        self.assertEqual(
+            imported["conception_rate"],
+            build_dashboard_data({r.pk for r in self.ranches})["breeding_analyzer"]["comparison"][0][
+                "conception_rate"
+            ],
+        )
+        self.assertEqual([row["name"] for row in data["ranches"]], ["Kapiri Ranch", "Kisombwa Ranch"])
+
+    def test_count_difference_adds_up_across_ranches(self):
+        for ranch, counts in zip(self.ranches, [[(1, 10, 12), (2, 10, 9)], [(1, 5, 3)]]):
+            for day, expected, actual in counts:
+                HerdCount.objects.create(
+                    ranch=ranch, count_date=date(2024, 3, day), species="cattle",
+                    expected_count=expected, actual_count=actual,
+                )
+        per_ranch = [build_kpis(ranch_ids={ranch.pk})["last_count_difference"] for ranch in self.ranches]
+        self.assertEqual(per_ranch, [-1, -2])
+        scoped = build_kpis(ranch_ids={ranch.pk for ranch in self.ranches})["last_count_difference"]
+        self.assertEqual(scoped, -3)
+
+        build_ranch_dashboards([ranch.pk for ranch in self.ranches], workers=1)
+        data = self.client.get("/api/analytics/portfolio/").json()
+        self.assertEqual(data["kpis"]["last_count_difference"], scoped)
+
+    def test_missing_dashboards_are_built_on_request(self):
+        self.assertFalse(RanchDashboard.objects.exists())
+        data = self.client.get("/api/analytics/portfolio/").json()
+        self.assertEqual(data["kpis"]["ranches"], 2)
+        self.assertEqual(RanchDashboard.objects.count(), 2)
+
+
+class DashboardSectionTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="manager", password="pass12345")
+        ranch = Ranch.objects.create(name="Kisombwa Ranch", owner=cls.user)
+        cow = Animal.objects.create(
+            tag_number="COW001", ranch=ranch, species="cattle", sex="female", source="imported"
+        )
+        Vaccination.objects.create(
+            animal_tag=cow, vaccine_type="FMD", date_administered=date(2024, 1, 1),
+            next_due_date=date(2024, 7, 1),
+        )
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_each_section_stays_within_its_query_budget(self):
+        for name in SECTIONS:
+            builder = DashboardBuilder(read_cache=False, write_cache=False)
+            with self.subTest(name), CaptureQueriesContext(connection) as queries:
+                builder.section(name)
+            self.assertLessEqual(len(queries), QUERY_BUDGETS[name], name)
+
+    def test_only_requested_sections_are_computed(self):
+        with mock.patch.dict(SECTIONS, {"recent": mock.Mock(side_effect=AssertionError)}):
+            response = self.client.get("/api/analytics/dashboard/?sections=kpis,alerts")
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(list(data), ["kpis", "alerts"])
+        self.assertEqual(data["alerts"][0]["type"], "overdue_vaccinations")
+        self.assertEqual(data["alerts"][0]["animals"], ["COW001"])
+        response = self.client.get("/api/analytics/dashboard/?sections=kpis,weather")
+        self.assertEqual(response.status_code, 400)
+
+    def test_html_dashboard_streams_every_fragment(self):
+        self.client.force_login(self.user)
+        response = self.client.get("/dashboard/")
+        self.assertTrue(response.streaming)
+        page = b"".join(response.streaming_content).decode()
+        self.assertIn("vaccination(s) are overdue", page)
+        self.assertIn('id="chart-data"', page)
+        self.assertTrue(page.rstrip().endswith("</html>"))
@@ -0,0 +1,190 @@
+"""Month-by-month breeding and health trends per animal cohort.
+
+Each series comes from one grouped query per source table, truncated to the
+month in the database. Completed months are stored as ``TrendBucket`` rows,
+one per ranch and cohort, and never recomputed; only the current month is
+counted live. A trend over several ranches sums their buckets. Late-synced
+records for a past month drop that month's buckets for their ranch (see
+``signals``).
+"""
+
+from datetime import date
+
+from django.db import transaction
+from django.db.models import Count, Q
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+
+from apps.animals.models import Animal
+from apps.breeding.models import BreedingEvent
+from apps.core.models import Ranch
+from apps.health.models import Mortality, Vaccination
+
+from .models import TrendBucket
+
+COHORTS = [source for source, _ in Animal.SOURCE_CHOICES]
+COUNTS = ["breeding_events", "conceived", "stillbirths", "mortality", "vaccinations"]
+MAX_MONTHS = 120
+
+
+def month_start(value):
+    return date(value.year, value.month, 1)
+
+
+def add_months(month, count):
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def month_range(first, last):
+    months = []
+    while first <= last:
+        months.append(first)
+        first = add_months(first, 1)
+    return months
+
+
+def _grouped(queryset, date_field, source_field, **counts):
+    return (
+        queryset.annotate(month=TruncMonth(date_field))
+        .values("ranch_id", source_field, "month")
+        .annotate(**counts)
+        .order_by()
+    )
+
+
+def compute_buckets(first, last, ranch_ids):
+    """Count every ranch and cohort for months ``first``..``last`` in three queries.
+
+    Keys are ``(month, ranch_id, cohort)``.
+    """
+    end = add_months(last, 1)
+    buckets = {
+        (month, ranch_id, cohort): dict.fromkeys(COUNTS, 0)
+        for month in month_range(first, last)
+        for ranch_id in ranch_ids
+        for cohort in COHORTS
+    }
+
+    def merge(rows, source_field, fields):
+        for row in rows:
+            bucket = buckets.get((month_start(row["month"]), row["ranch_id"], row[source_field]))
+            if bucket is not None:
+                for field in fields:
+                    bucket[field] += row[field]
+
+    def scoped(model):
+        return model.objects.filter(ranch_id__in=ranch_ids)
+
+    merge(
+        _grouped(
+            scoped(BreedingEvent).filter(service_date__gte=first, service_date__lt=end),
+            "service_date",
+            "female_tag__source",
+            breeding_events=Count("id"),
+            conceived=Count("id", filter=Q(pregnancy_confirmed="yes")),
+            stillbirths=Count("id", filter=Q(outcome="stillbirth")),
+        ),
+        "female_tag__source",
+        ["breeding_events", "conceived", "stillbirths"],
+    )
+    merge(
+        _grouped(
+            scoped(Mortality).filter(death_date__gte=first, death_date__lt=end),
+            "death_date",
+            "animal_tag__source",
+            mortality=Count("id"),
+        ),
+        "animal_tag__source",
+        ["mortality"],
+    )
+    merge(
+        _grouped(
+            scoped(Vaccination).filter(date_administered__gte=first, date_administered__lt=end),
+            "date_administered",
+            "animal_tag__source",
+            vaccinations=Count("id"),
+        ),
+        "animal_tag__source",
+        ["vaccinations"],
+    )
+    return buckets
+
+
+def get_buckets(first, last, today=None, ranch_ids=None):
+    """Buckets keyed ``(month, ranch_id, cohort)`` for ranches ``ranch_ids``.
+
+    ``None`` means every ranch.
+    """
+    current = month_start(today or timezone.localdate())
+    ranches = Ranch.objects.order_by()
+    if ranch_ids is not None:
+        ranches = ranches.filter(id__in=ranch_ids)
+    ranch_ids = list(ranches.values_list("id", flat=True))
+    buckets = {
+        (bucket.month, bucket.ranch_id, bucket.cohort): bucket.metrics
+        for bucket in TrendBucket.objects.filter(
+            month__gte=first, month__lte=min(last, current), ranch_id__in=ranch_ids
+        )
+    }
+    completed = [month for month in month_range(first, last) if month < current]
+    missing = [
+        month
+        for month in completed
+        if any((month, ranch_id, COHORTS[0]) not in buckets for ranch_id in ranch_ids)
+    ]
+    if missing:
+        computed = compute_buckets(missing[0], missing[-1], ranch_ids)
+        with transaction.atomic():
+            TrendBucket.objects.bulk_create(
+                [
+                    TrendBucket(month=month, ranch_id=ranch_id, cohort=cohort, metrics=metrics)
+                    for (month, ranch_id, cohort), metrics in computed.items()
+                    if (month, ranch_id, cohort) not in buckets
+                ],
+                ignore_conflicts=True,
+            )
+        buckets.update(computed)
+    if first <= current <= last:
+        buckets.update(compute_buckets(current, current, ranch_ids))
+    return buckets
+
+
+def _rate(numerator, denominator):
+    return round(numerator / denominator * 100, 2) if denominator else 0.0
+
+
+def build_trends(months=12, cohorts=None, today=None, ranch_ids=None):
+    last = month_start(today or timezone.localdate())
+    first = add_months(last, -(max(1, min(months, MAX_MONTHS)) - 1))
+    totals = {
+        (month, cohort): dict.fromkeys(COUNTS, 0)
+        for month in month_range(first, last)
+        for cohort in COHORTS
+    }
+    for (month, _, cohort), metrics in get_buckets(first, last, today, ranch_ids).items():
+        total = totals[(month, cohort)]
+        for field in COUNTS:
+            total[field] += metrics[field]
+    labels = month_range(first, last)
+
+    series = {}
+    for cohort in cohorts or COHORTS:
+        rows = [totals[(month, cohort)] for month in labels]
+        series[cohort] = {
+            **{field: [row[field] for row in rows] for field in COUNTS},
+            "conception_rate": [_rate(row["conceived"], row["breeding_events"]) for row in rows],
+            "stillbirth_rate": [_rate(row["stillbirths"], row["breeding_events"]) for row in rows],
+        }
+    return {"months": [month.strftime("%Y-%m") for month in labels], "cohorts": series}
+
+
+def invalidate_month(value, ranch_id):
+    """Forget ``ranch_id``'s stored buckets for ``value``'s month after a late write."""
+    if value and month_start(value) < month_start(timezone.localdate()):
+        TrendBucket.objects.filter(month=month_start(value), ranch_id=ranch_id).delete()
+
+
+def invalidate_ranches(*ranch_ids):
+    """Forget every stored bucket of ``ranch_ids`` (an animal changed ranch)."""
+    TrendBucket.objects.filter(ranch_id__in=ranch_ids).delete()
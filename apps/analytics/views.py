@@ -1,8 +1,38 @@
-from django.shortcuts import render
+from django.contrib.auth.decorators import login_required
+from django.http import StreamingHttpResponse
+from django.template.loader import render_to_string
 
-from .services import build_dashboard_data
+from apps.core.routers import read_from_replica
+from apps.core.tenancy import user_ranch_ids
 
+from .services import DashboardBuilder
 
+# Page fragments in document order with the sections each one renders; the
+# chart data is last because only the closing script reads it.
+DASHBOARD_PARTS = [
+    ("head", []),
+    ("kpis", ["kpis", "alerts"]),
+    ("breeding_analyzer", ["breeding_analyzer"]),
+    ("herd_overview", ["herd_overview"]),
+    ("financial_performance", ["financial_performance"]),
+    ("recent", ["recent"]),
+    ("charts", ["chart_data"]),
+]
+
+
+@login_required
 def dashboard_view(request):
-    context = build_dashboard_data()
-    return render(request, "analytics/dashboard.html", context)
+    """Stream the dashboard page, sending each fragment once its sections are built."""
+    ranch_ids = user_ranch_ids(request.user)
+    builder = DashboardBuilder(ranch_ids)
+
+    def render_parts():
+        # The page's live KPI stream only applies events of this same scope.
+        context = {"kpi_scope": sorted(ranch_ids) if ranch_ids is not None else None}
+        for part, sections in DASHBOARD_PARTS:
+            with read_from_replica():
+                for name in sections:
+                    context[name] = builder.section(name)
+            yield render_to_string(f"analytics/dashboard/{part}.html", context, request)
+
+    return StreamingHttpResponse(render_parts(), content_type="text/html; charset=utf-8")
@@ -0,0 +1,73 @@
+import hashlib
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps
+
+# Longest-edge bounds; the original upload is never served in lists.
+PHOTO_VARIANTS = {
+    "thumbnail": (160, 160),
+    "medium": (800, 800),
+}
+JPEG_QUALITY = 82
+
+
+def render_variant(data, size):
+    with Image.open(BytesIO(data)) as image:
+        image = ImageOps.exif_transpose(image)
+        image.thumbnail(size, Image.LANCZOS)
+        if image.mode not in ("RGB", "L"):
+            image = image.convert("RGB")
+        output = BytesIO()
+        image.save(output, "JPEG", quality=JPEG_QUALITY, optimize=True, progressive=True)
+    return output.getvalue()
+
+
+def variant_name(data, variant, size):
+    # Content-addressed: a new upload or a new size always gets a new URL, so
+    # variants can be cached forever.
+    digest = hashlib.sha256(data + f"{variant}:{size[0]}x{size[1]}".encode()).hexdigest()[:32]
+    return f"animals/variants/{digest[:2]}/{digest}-{variant}.jpg"
+
+
+def build_variants(photo_name, storage):
+    with storage.open(photo_name, "rb") as source:
+        data = source.read()
+
+    variants = {"source": photo_name}
+    for variant, size in PHOTO_VARIANTS.items():
+        name = variant_name(data, variant, size)
+        if not storage.exists(name):
+            name = storage.save(name, ContentFile(render_variant(data, size)))
+        variants[variant] = name
+    return variants
+
+
+def variants_are_current(animal):
+    return bool(animal.photo) and animal.photo_variants.get("source") == animal.photo.name
+
+
+def ensure_photo_variants(animal, force=False):
+    if not animal.photo:
+        return {}
+    if force or not variants_are_current(animal):
+        variants = build_variants(animal.photo.name, animal.photo.storage)
+        # Plain UPDATE: no signals, updated_at stays the user's last edit, and
+        # it is a no-op if the photo was replaced while we were rendering.
+        type(animal).objects.filter(pk=animal.pk, photo=animal.photo.name).update(
+            photo_variants=variants
+        )
+        animal.photo_variants = variants
+    return animal.photo_variants
+
+
+def variant_urls(variants, storage, request=None):
+    urls = {}
+    for variant in PHOTO_VARIANTS:
+        name = variants.get(variant)
+        if not name:
+            urls[variant] = None
+            continue
+        url = storage.url(name)
+        urls[variant] = request.build_absolute_uri(url) if request is not None else url
+    return urls
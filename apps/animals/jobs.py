@@ -0,0 +1,11 @@
+from apps.core.jobs import job
+
+from .images import ensure_photo_variants
+from .models import Animal
+
+
+@job("animals.generate_photo_variants", max_attempts=3)
+def generate_photo_variants(tag_number):
+    animal = Animal.objects.filter(pk=tag_number).first()
+    if animal is not None:
+        ensure_photo_variants(animal)
@@ -0,0 +1,61 @@
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from apps.animals.images import build_variants
+from apps.animals.models import Animal
+
+
+def _render(tag_number, photo_name):
+    # Runs in a pool worker: storage and Pillow only, no database access.
+    return tag_number, photo_name, build_variants(photo_name, default_storage)
+
+
+class Command(BaseCommand):
+    help = "Generate thumbnail/medium variants for animal photos in a process pool"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--processes", type=int, default=multiprocessing.cpu_count())
+        parser.add_argument(
+            "--force", action="store_true", help="Rebuild variants even when they are current."
+        )
+
+    def handle(self, *args, **options):
+        animals = Animal.objects.exclude(photo="").exclude(photo__isnull=True)
+        pending = [
+            (tag, photo)
+            for tag, photo, variants in animals.values_list("tag_number", "photo", "photo_variants")
+            if options["force"] or (variants or {}).get("source") != photo
+        ]
+        if not pending:
+            self.stdout.write("All photo variants are current.")
+            return
+
+        started = time.monotonic()
+        done = failed = 0
+        connections.close_all()
+        with ProcessPoolExecutor(
+            max_workers=max(options["processes"], 1),
+            mp_context=multiprocessing.get_context("fork"),
+        ) as pool:
+            futures = {pool.submit(_render, tag, photo): tag for tag, photo in pending}
+            for future in as_completed(futures):
+                try:
+                    tag, photo, variants = future.result()
+                except Exception as exc:
+                    failed += 1
+                    self.stderr.write(f"{futures[future]}: {exc}")
+                    continue
+                Animal.objects.filter(pk=tag, photo=photo).update(photo_variants=variants)
+                done += 1
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Generated variants for {done} animal(s), {failed} failed, "
+                f"in {time.monotonic() - started:.2f}s."
+            )
+        )
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.9 on 2026-10-19 15:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('animals', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='animal',
+            name='photo_variants',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
@@ -0,0 +1,30 @@
+from django.db import migrations
+
+SEARCH_COLUMNS = ('tag_number', 'rfid_code', 'qr_code', 'breed', 'notes')
+
+
+def create_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    columns = ', '.join(SEARCH_COLUMNS)
+    values = ', '.join("COALESCE(%s, '')" % column for column in SEARCH_COLUMNS)
+    schema_editor.execute(
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS animal_search USING fts5({columns}, tokenize='trigram')"
+    )
+    schema_editor.execute(f"INSERT INTO animal_search ({columns}) SELECT {values} FROM animals")
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        schema_editor.execute('DROP TABLE IF EXISTS animal_search')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('animals', '0003_animal_photo_variants'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
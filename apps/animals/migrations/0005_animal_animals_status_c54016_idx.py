@@ -0,0 +1,17 @@
+# Generated by Django 4.2.9 on 2026-10-19 15:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('animals', '0004_animal_search_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='animal',
+            index=models.Index(fields=['status', '-created_at'], name='animals_status_c54016_idx'),
+        ),
+    ]
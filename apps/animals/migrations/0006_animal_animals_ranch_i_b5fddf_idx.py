@@ -0,0 +1,18 @@
+# Generated by Django 4.2.9 on 2026-10-19 17:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_ranchsnapshot'),
+        ('animals', '0005_animal_animals_status_c54016_idx'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='animal',
+            index=models.Index(fields=['ranch', '-created_at'], name='animals_ranch_i_b5fddf_idx'),
+        ),
+    ]
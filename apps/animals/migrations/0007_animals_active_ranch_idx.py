@@ -0,0 +1,17 @@
+# Generated by Django 4.2.9 on 2026-10-19 20:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('animals', '0006_animal_animals_ranch_i_b5fddf_idx'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='animal',
+            index=models.Index(condition=models.Q(('status', 'active')), fields=['ranch', '-created_at'], name='animals_active_ranch_idx'),
+        ),
+    ]
@@ -0,0 +1,60 @@
+# Generated by Django 4.2.9 on 2026-10-19 23:20
+
+from django.db import migrations
+
+SEARCH_COLUMNS = ('tag_number', 'rfid_code', 'qr_code', 'breed', 'notes')
+
+
+def key_search_rows(apps, schema_editor):
+    # Index rows are keyed by a stable integer per tag so updates and deletes
+    # hit one rowid instead of scanning the FTS table for the tag.
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    columns = ', '.join(SEARCH_COLUMNS)
+    values = ', '.join("COALESCE(a.%s, '')" % column for column in SEARCH_COLUMNS)
+    schema_editor.execute(
+        'CREATE TABLE IF NOT EXISTS animal_search_keys '
+        '(id INTEGER PRIMARY KEY, tag_number TEXT NOT NULL UNIQUE)'
+    )
+    schema_editor.execute(
+        'INSERT OR IGNORE INTO animal_search_keys (tag_number) SELECT tag_number FROM animals'
+    )
+    schema_editor.execute('DELETE FROM animal_search')
+    schema_editor.execute(
+        f'INSERT INTO animal_search (rowid, {columns}) SELECT k.id, {values} '
+        'FROM animals a JOIN animal_search_keys k ON k.tag_number = a.tag_number'
+    )
+
+
+def unkey_search_rows(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        schema_editor.execute('DROP TABLE IF EXISTS animal_search_keys')
+
+
+def create_trigram_index(apps, schema_editor):
+    # ``icontains``/``istartswith`` compare UPPER(column::text), so the index
+    # is built over the same expressions.
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    expressions = ', '.join(f'UPPER({column}::text) gin_trgm_ops' for column in SEARCH_COLUMNS)
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    schema_editor.execute(
+        f'CREATE INDEX IF NOT EXISTS animals_search_trgm ON animals USING gin ({expressions})'
+    )
+
+
+def drop_trigram_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute('DROP INDEX IF EXISTS animals_search_trgm')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('animals', '0007_animals_active_ranch_idx'),
+    ]
+
+    operations = [
+        migrations.RunPython(key_search_rows, unkey_search_rows),
+        migrations.RunPython(create_trigram_index, drop_trigram_index),
+    ]
@@ -1,7 +1,16 @@
 import uuid
+from datetime import date
 from django.db import models
 from apps.core.models import Ranch
 
+
+def age_in_months(date_of_birth, today=None):
+    if not date_of_birth:
+        return None
+    today = today or date.today()
+    return (today.year - date_of_birth.year) * 12 + today.month - date_of_birth.month
+
+
 class Animal(models.Model):
     SPECIES_CHOICES = [
         ('cattle', 'Cattle'),
@@ -46,6 +55,7 @@ class Animal(models.Model):
     # Status & metadata
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='active')
     photo = models.ImageField(upload_to='animals/', blank=True, null=True)
+    photo_variants = models.JSONField(default=dict, blank=True)  # variant -> stored file name
     purchase_price = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
     purchase_date = models.DateField(null=True, blank=True)
     notes = models.TextField(blank=True)
@@ -59,15 +69,21 @@ class Animal(models.Model):
         ordering = ['-created_at']
         indexes = [
             models.Index(fields=['species', 'status']),
+            models.Index(fields=['status', '-created_at']),
+            models.Index(fields=['ranch', '-created_at']),
+            models.Index(fields=['ranch', '-created_at'], condition=models.Q(status='active'), name='animals_active_ranch_idx'),
         ]
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Lets a save tell whether the animal moved ranch (see signals).
+        instance._loaded_ranch_id = instance.__dict__.get('ranch_id')
+        return instance
+    
     def __str__(self):
         return f"{self.tag_number} ({self.species})"
     
     @property
     def age_months(self):
-        if not self.date_of_birth:
-            return None
-        from datetime import date
-        today = date.today()
-        return (today.year - self.date_of_birth.year) * 12 + today.month - self.date_of_birth.month
+        return age_in_months(self.date_of_birth)
@@ -0,0 +1,266 @@
+"""Typeahead search over animal identifiers, breed and notes.
+
+On SQLite the ``animal_search`` FTS5 table (trigram tokenizer) answers
+substring queries from an index instead of scanning ``animals``; signals
+keep it in step with ``Animal`` saves and deletes, addressing each index row
+by the rowid ``animal_search_keys`` assigns its tag. Identifier hits rank
+first (exact, then prefix, then bm25), free-text hits follow, and a query
+with no substring hit falls back to trigram-overlap fuzzy matching. Queries
+shorter than one trigram use an identifier prefix match. Other databases use plain
+``icontains`` filters; on PostgreSQL a ``pg_trgm`` GIN index serves them.
+"""
+
+from django.db import connection
+from django.db.models import Q
+
+from apps.core.tenancy import scope_to_ranches
+
+from .models import Animal
+
+SEARCH_TABLE = "animal_search"
+SEARCH_KEYS_TABLE = "animal_search_keys"
+SEARCH_COLUMNS = ("tag_number", "rfid_code", "qr_code", "breed", "notes")
+IDENTIFIER_COLUMNS = ("tag_number", "rfid_code", "qr_code")
+# bm25 weights, in SEARCH_COLUMNS order: identifiers outrank free text.
+COLUMN_WEIGHTS = (10.0, 8.0, 8.0, 2.0, 1.0)
+RESULT_FIELDS = ("tag_number", "rfid_code", "qr_code", "species", "breed", "sex", "status", "ranch")
+MAX_RESULTS = 50
+RANKED_CANDIDATES = 2000
+
+
+def search_index_enabled():
+    return connection.vendor == "sqlite"
+
+
+def _row(animal):
+    return [getattr(animal, column) or "" for column in SEARCH_COLUMNS]
+
+
+def _search_rowid(cursor, tag_number):
+    cursor.execute(f"SELECT id FROM {SEARCH_KEYS_TABLE} WHERE tag_number = %s", [tag_number])
+    row = cursor.fetchone()
+    return row[0] if row else None
+
+
+def index_animal(animal):
+    if not search_index_enabled():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT OR IGNORE INTO {SEARCH_KEYS_TABLE} (tag_number) VALUES (%s)", [animal.pk]
+        )
+        rowid = _search_rowid(cursor, animal.pk)
+        cursor.execute(f"DELETE FROM {SEARCH_TABLE} WHERE rowid = %s", [rowid])
+        cursor.execute(
+            f"INSERT INTO {SEARCH_TABLE} (rowid, {', '.join(SEARCH_COLUMNS)}) "
+            f"VALUES (%s, %s, %s, %s, %s, %s)",
+            [rowid, *_row(animal)],
+        )
+
+
+def remove_animal(tag_number):
+    if not search_index_enabled():
+        return
+    with connection.cursor() as cursor:
+        rowid = _search_rowid(cursor, tag_number)
+        if rowid is not None:
+            cursor.execute(f"DELETE FROM {SEARCH_TABLE} WHERE rowid = %s", [rowid])
+            cursor.execute(f"DELETE FROM {SEARCH_KEYS_TABLE} WHERE id = %s", [rowid])
+
+
+def rebuild_index():
+    """Repopulate the index from ``animals``; returns the number of rows indexed."""
+    if not search_index_enabled():
+        return 0
+    animals = Animal._meta.db_table
+    values = ", ".join("COALESCE(a.%s, '')" % column for column in SEARCH_COLUMNS)
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {SEARCH_TABLE}")
+        cursor.execute(
+            f"DELETE FROM {SEARCH_KEYS_TABLE} "
+            f"WHERE tag_number NOT IN (SELECT tag_number FROM {animals})"
+        )
+        cursor.execute(
+            f"INSERT OR IGNORE INTO {SEARCH_KEYS_TABLE} (tag_number) SELECT tag_number FROM {animals}"
+        )
+        cursor.execute(
+            f"INSERT INTO {SEARCH_TABLE} (rowid, {', '.join(SEARCH_COLUMNS)}) "
+            f"SELECT k.id, {values} FROM {animals} a "
+            f"JOIN {SEARCH_KEYS_TABLE} k ON k.tag_number = a.tag_number"
+        )
+        cursor.execute(f"INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}) VALUES ('optimize')")
+        cursor.execute(f"SELECT COUNT(*) FROM {SEARCH_TABLE}")
+        return cursor.fetchone()[0]
+
+
+def _phrase(term):
+    return '"' + term.replace('"', '""') + '"'
+
+
+def _strict_match(terms):
+    # Every term must appear somewhere, as a substring.
+    return " AND ".join(_phrase(term) for term in terms)
+
+
+def _ranch_filter(ranch_ids):
+    """``(join, condition, params)`` limiting index rows to ``ranch_ids``."""
+    ranch_field = Animal._meta.get_field("ranch")
+    placeholders = ", ".join(["%s"] * len(ranch_ids))
+    return (
+        f" JOIN {Animal._meta.db_table} a ON a.tag_number = s.tag_number",
+        f" AND a.{ranch_field.column} IN ({placeholders})",
+        [ranch_field.get_db_prep_value(ranch, connection) for ranch in sorted(ranch_ids, key=str)],
+    )
+
+
+def _trigrams(text):
+    text = text.lower()
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def _fuzzy_search(terms, ranch_ids, limit):
+    # Candidates share at least one trigram with the query; they are ranked
+    # by how many of the query's trigrams they contain, which tolerates
+    # typos such as "ankolle" for "Ankole". Past RANKED_CANDIDATES rows the
+    # ranking is approximate.
+    wanted = set().union(*(_trigrams(term) for term in terms))
+    match = " OR ".join(_phrase(trigram) for trigram in sorted(wanted))
+    where = f"{SEARCH_TABLE} MATCH %s"
+    params = [match]
+    source = f"{SEARCH_TABLE} s"
+    if ranch_ids is not None:
+        join, condition, ranch_params = _ranch_filter(ranch_ids)
+        source += join
+        where += condition
+        params += ranch_params
+    columns = ", ".join(f"s.{column}" for column in SEARCH_COLUMNS)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT {columns} FROM {source} WHERE {where} LIMIT {RANKED_CANDIDATES}", params
+        )
+        candidates = cursor.fetchall()
+
+    def score(row):
+        identifiers = len(wanted & _trigrams(" ".join(row[:len(IDENTIFIER_COLUMNS)])))
+        return (-len(wanted & _trigrams(" ".join(row))), -identifiers, row[0])
+
+    best = [row[0] for row in sorted(candidates, key=score)[:limit]]
+    animals = {
+        row["tag_number"]: row
+        for row in Animal.objects.filter(pk__in=best).values(*RESULT_FIELDS)
+    }
+    return [animals[tag] for tag in best if tag in animals]
+
+
+def _identifiers_only(match):
+    return "{%s} : (%s)" % (" ".join(IDENTIFIER_COLUMNS), match)
+
+
+def _match_count(match):
+    with connection.cursor() as cursor:
+        cursor.execute(f"SELECT COUNT(*) FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH %s", [match])
+        return cursor.fetchone()[0]
+
+
+def _fts_search(match, query, ranch_ids=None, limit=MAX_RESULTS, exclude=(), ranked=True):
+    # Rank inside the index first and join only the winning rows; the
+    # identifier columns stored in the index are enough to order by.
+    animals = Animal._meta.db_table
+    ranch_field = Animal._meta.get_field("ranch")
+    columns = ", ".join(f"a.{Animal._meta.get_field(field).column}" for field in RESULT_FIELDS)
+    weights = ", ".join(str(weight) for weight in COLUMN_WEIGHTS)
+    exact = " OR ".join(f"s.{column} = %s COLLATE NOCASE" for column in IDENTIFIER_COLUMNS)
+    prefix = " OR ".join(f"s.{column} LIKE %s" for column in IDENTIFIER_COLUMNS)
+    like = query.replace("\\", "").replace("%", "").replace("_", "") + "%"
+
+    params = []
+    if ranked:
+        order = (
+            f"CASE WHEN {exact} THEN 0 WHEN {prefix} THEN 1 ELSE 2 END, "
+            f"bm25({SEARCH_TABLE}, {weights})"
+        )
+        params += [query] * len(IDENTIFIER_COLUMNS) + [like] * len(IDENTIFIER_COLUMNS)
+    else:
+        order = "s.rowid"
+    source = f"{SEARCH_TABLE} s"
+    where = f"{SEARCH_TABLE} MATCH %s"
+    params.append(match)
+    if ranch_ids is not None:
+        join, condition, ranch_params = _ranch_filter(ranch_ids)
+        source += join
+        where += condition
+        params += ranch_params
+    if exclude:
+        where += f" AND s.tag_number NOT IN ({', '.join(['%s'] * len(exclude))})"
+        params += list(exclude)
+    params.append(limit)
+
+    sql = (
+        f"SELECT {columns} FROM ("
+        f"SELECT s.tag_number, {order} AS position FROM {source} WHERE {where} "
+        f"ORDER BY position LIMIT %s"
+        f") r JOIN {animals} a ON a.tag_number = r.tag_number ORDER BY r.position"
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        rows = cursor.fetchall()
+    to_ranch = ranch_field.target_field.to_python
+    return [{**dict(zip(RESULT_FIELDS, row)), "ranch": to_ranch(row[-1])} for row in rows]
+
+
+def _indexed_search(terms, query, ranch_ids, limit):
+    match = _strict_match(terms)
+    # Identifier hits are few and always worth ranking.
+    results = _fts_search(_identifiers_only(match), query, ranch_ids, limit)
+    if len(results) < limit:
+        # Free-text terms ("boran") can hit most of the herd; ranking tens of
+        # thousands of equally good rows costs more than it is worth.
+        results += _fts_search(
+            match,
+            query,
+            ranch_ids,
+            limit - len(results),
+            exclude=[row["tag_number"] for row in results],
+            ranked=_match_count(match) <= RANKED_CANDIDATES,
+        )
+    if not results:
+        results = _fuzzy_search(terms, ranch_ids, limit)
+    return results
+
+
+def _orm_search(query, terms, ranch_ids=None, limit=MAX_RESULTS, prefix_only=False):
+    queryset = scope_to_ranches(Animal.objects.all(), ranch_ids)
+    if prefix_only:
+        condition = Q()
+        for column in IDENTIFIER_COLUMNS:
+            condition |= Q(**{f"{column}__istartswith": query})
+        queryset = queryset.filter(condition)
+    else:
+        for term in terms:
+            condition = Q()
+            for column in SEARCH_COLUMNS:
+                condition |= Q(**{f"{column}__icontains": term})
+            queryset = queryset.filter(condition)
+    return list(queryset.order_by("tag_number").values(*RESULT_FIELDS)[:limit])
+
+
+def search_animals(query, ranch_ids=None, limit=MAX_RESULTS):
+    """Return up to ``limit`` animals matching ``query``, best matches first.
+
+    ``ranch_ids`` limits the search to those ranches (``None`` searches every
+    ranch); the filter runs before ranking and the limit.
+    """
+    query = " ".join(query.split())
+    terms = query.split(" ") if query else []
+    if not terms or (ranch_ids is not None and not ranch_ids):
+        return []
+    limit = max(1, min(limit, MAX_RESULTS))
+
+    if not search_index_enabled():
+        return _orm_search(query, terms, ranch_ids, limit)
+    if len(query) < 3:
+        # Too short for a trigram: match identifier prefixes instead.
+        return _orm_search(query, terms, ranch_ids, limit, prefix_only=True)
+
+    long_terms = [term for term in terms if len(term) >= 3] or [query]
+    return _indexed_search(long_terms, query, ranch_ids, limit)
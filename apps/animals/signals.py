@@ -0,0 +1,49 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from apps.core.jobs import enqueue
+from apps.core.snapshots import record_removals
+from apps.core.tenancy import move_animal_events
+
+from .images import variants_are_current
+from .models import Animal
+from .search import index_animal, remove_animal
+
+
+@receiver(pre_save, sender=Animal)
+def drop_stale_photo_variants(sender, instance, **kwargs):
+    if instance.photo_variants and not variants_are_current(instance):
+        instance.photo_variants = {}
+
+
+@receiver(post_save, sender=Animal)
+def queue_photo_variants(sender, instance, **kwargs):
+    if instance.photo and not instance.photo_variants:
+        tag_number = instance.pk
+        transaction.on_commit(
+            lambda: enqueue(
+                "animals.generate_photo_variants",
+                {"tag_number": tag_number},
+                dedupe_key=f"photo-variants:{tag_number}",
+            )
+        )
+
+
+@receiver(post_save, sender=Animal)
+def follow_ranch_move(sender, instance, created, raw=False, **kwargs):
+    loaded = getattr(instance, "_loaded_ranch_id", instance.ranch_id)
+    if not created and not raw and loaded != instance.ranch_id:
+        record_removals(Animal, [(instance.pk, loaded)])
+        move_animal_events(instance.pk, instance.ranch_id)
+    instance._loaded_ranch_id = instance.ranch_id
+
+
+@receiver(post_save, sender=Animal)
+def update_search_index(sender, instance, **kwargs):
+    index_animal(instance)
+
+
+@receiver(post_delete, sender=Animal)
+def drop_from_search_index(sender, instance, **kwargs):
+    remove_animal(instance.pk)
@@ -1,3 +1,355 @@
-from django.test import TestCase
+import shutil
+import tempfile
+from datetime import date, datetime, timezone as dt_timezone
+from decimal import Decimal
+from io import BytesIO
+from unittest import mock
 
-# Create your tests here.
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from PIL import Image
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from apps.breeding.models import BreedingEvent
+from apps.core import jobs
+from apps.core.models import Ranch, Staff, User
+from apps.health.models import Mortality, Treatment, Vaccination
+from apps.operations.models import HerdCount, MovementLog, RFIDScanLog
+from kris.api_views import BaseQueryParamFilterViewSet
+from kris.api_urls import router
+from kris.list_fastpath import get_list_plan
+
+from .images import PHOTO_VARIANTS
+from .models import Animal
+from .search import rebuild_index
+
+
+class ListFastPathTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="manager", password="pass12345")
+        ranch = Ranch.objects.create(name="Kisombwa Ranch", owner=cls.user)
+        staff = Staff.objects.create(ranch=ranch, name="Vet", role="vet")
+        dam = Animal.objects.create(
+            tag_number="DAM001",
+            ranch=ranch,
+            species="cattle",
+            sex="female",
+            date_of_birth=date(2020, 5, 1),
+            source="imported",
+            purchase_price=Decimal("1200.5"),
+            purchase_date=date(2021, 1, 3),
+            photo="animals/dam.jpg",
+            rfid_code="RF-1",
+        )
+        calf = Animal.objects.create(
+            tag_number="CALF001",
+            ranch=ranch,
+            species="cattle",
+            sex="male",
+            source="born",
+            dam_tag=dam,
+            notes="Weak at birth",
+        )
+        BreedingEvent.objects.create(
+            female_tag=dam, male_tag=calf, service_date=date(2024, 3, 1), method="natural"
+        )
+        Vaccination.objects.create(
+            animal_tag=dam,
+            vaccine_type="FMD",
+            date_administered=date(2024, 2, 1),
+            administered_by=staff,
+            cost=Decimal("4.5"),
+        )
+        Treatment.objects.create(animal_tag=calf, treatment_date=date(2024, 2, 2), cost=12)
+        HerdCount.objects.create(
+            ranch=ranch,
+            count_date=date(2024, 2, 3),
+            species="cattle",
+            expected_count=2,
+            actual_count=2,
+            difference=0,
+        )
+        MovementLog.objects.create(
+            animal_tag=dam, to_zone="North", movement_date=date(2024, 2, 4)
+        )
+        RFIDScanLog.objects.create(
+            rfid_code="RF-1",
+            animal_tag=dam,
+            gate_id="G1",
+            scan_timestamp=datetime(2024, 2, 5, 6, 30, 15, 123456, tzinfo=dt_timezone.utc),
+        )
+        Mortality.objects.create(
+            animal_tag=calf, death_date=date(2024, 3, 1), estimated_value=Decimal("380")
+        )
+
+    def setUp(self):
+        self.client = APIClient()
+        token = Token.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {token.key}")
+
+    def test_every_viewset_has_a_fast_plan(self):
+        for prefix, viewset, _ in router.registry:
+            with self.subTest(prefix):
+                self.assertIsNotNone(get_list_plan(viewset.serializer_class))
+
+    def test_fast_list_output_is_byte_identical(self):
+        for prefix, _, _ in router.registry:
+            url = f"/api/{prefix}/"
+            with self.subTest(url):
+                fast = self.client.get(url)
+                with mock.patch.object(BaseQueryParamFilterViewSet, "fast_list", False):
+                    slow = self.client.get(url)
+                self.assertEqual(fast.status_code, 200)
+                self.assertEqual(fast.content, slow.content)
+                self.assertNotEqual(fast.content, b"[]")
+
+    def test_sparse_fieldset_prunes_output_and_columns(self):
+        url = "/api/animals/?fields=tag_number,status,species"
+        self.client.get(url)  # Warm the token cache.
+        # The user's ranch ids (one lookup per request), then the list query.
+        with self.assertNumQueries(2) as ctx:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [list(row) for row in response.json()], [["tag_number", "species", "status"]] * 2
+        )
+        ranch_sql, sql = (query["sql"] for query in ctx.captured_queries)
+        self.assertIn('FROM "ranches"', ranch_sql)
+        self.assertNotIn("notes", sql)
+        self.assertNotIn("JOIN", sql)
+        self.assertIn('"ranch_id" IN', sql)
+
+        with mock.patch.object(BaseQueryParamFilterViewSet, "fast_list", False):
+            slow = self.client.get(url)
+        self.assertEqual(response.content, slow.content)
+
+    def test_sparse_fieldset_on_detail_and_exclude(self):
+        response = self.client.get("/api/animals/DAM001/?exclude=notes,photo,dam_tag,sire_tag")
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn("notes", response.json())
+        self.assertEqual(response.json()["age_months"], Animal.objects.get(pk="DAM001").age_months)
+
+        response = self.client.get("/api/animals/DAM001/?fields=age_months")
+        self.assertEqual(list(response.json()), ["age_months"])
+
+    def test_unknown_sparse_field_is_rejected(self):
+        response = self.client.get("/api/vaccinations/?fields=vaccine_type,bogus")
+        self.assertEqual(response.status_code, 400)
+
+
+def _jpeg_upload(name="cow.jpg", size=(1600, 1200)):
+    buffer = BytesIO()
+    Image.new("RGB", size, (120, 80, 40)).save(buffer, "JPEG")
+    return SimpleUploadedFile(name, buffer.getvalue(), content_type="image/jpeg")
+
+
+class PhotoVariantTests(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.user = User.objects.create_user(username="herdsman", password="pass12345")
+        self.ranch = Ranch.objects.create(name="Kisombwa Ranch", owner=self.user)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def _create_animal(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            return Animal.objects.create(
+                tag_number="PHOTO001",
+                ranch=self.ranch,
+                species="cattle",
+                sex="female",
+                source="born",
+                photo=_jpeg_upload(),
+            )
+
+    def test_upload_queues_content_addressed_variants(self):
+        animal = self._create_animal()
+        jobs.work(burst=True, names=["animals.generate_photo_variants"])
+        animal.refresh_from_db()
+
+        storage = animal.photo.storage
+        for variant, bounds in PHOTO_VARIANTS.items():
+            with storage.open(animal.photo_variants[variant]) as stored, Image.open(stored) as image:
+                self.assertLessEqual(max(image.size), max(bounds))
+
+        data = self.client.get("/api/animals/PHOTO001/").json()
+        self.assertTrue(data["photo_variants"]["thumbnail"].endswith("-thumbnail.jpg"))
+        listed = self.client.get("/api/animals/").json()[0]
+        self.assertEqual(listed["photo_variants"], data["photo_variants"])
+
+    def test_replacing_photo_drops_stale_variants(self):
+        animal = self._create_animal()
+        jobs.work(burst=True)
+        animal.refresh_from_db()
+        old_thumbnail = animal.photo_variants["thumbnail"]
+
+        animal.photo = _jpeg_upload("cow2.jpg", size=(900, 900))
+        animal.save()
+        self.assertEqual(animal.photo_variants, {})
+        self.assertEqual(
+            self.client.get("/api/animals/PHOTO001/").json()["photo_variants"],
+            {"thumbnail": None, "medium": None},
+        )
+
+        response = self.client.get("/api/animals/PHOTO001/photo/thumbnail/")
+        self.assertEqual(response.status_code, 302)
+        animal.refresh_from_db()
+        self.assertNotEqual(animal.photo_variants["thumbnail"], old_thumbnail)
+        self.assertTrue(response["Location"].endswith(animal.photo_variants["thumbnail"]))
+
+
+class AnimalSearchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="herdsman", password="pass12345")
+        cls.ranch = Ranch.objects.create(name="Kisombwa Ranch", owner=cls.user)
+        other = Ranch.objects.create(name="Kapiri Ranch", owner=cls.user)
+        for tag, ranch, breed, rfid, notes in [
+            ("KSB-0042", cls.ranch, "Boran", "982000411", "Limps on left hind leg"),
+            ("KSB-0420", cls.ranch, "Ankole", "982000999", ""),
+            ("KAP-0042", other, "Boran", None, "Bought at Mumbwa auction"),
+        ]:
+            Animal.objects.create(
+                tag_number=tag,
+                ranch=ranch,
+                species="cattle",
+                sex="female",
+                source="born",
+                breed=breed,
+                rfid_code=rfid,
+                notes=notes,
+            )
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def _tags(self, query, **params):
+        response = self.client.get("/api/animals/search/", {"q": query, **params})
+        self.assertEqual(response.status_code, 200)
+        return [row["tag_number"] for row in response.json()]
+
+    def test_ranks_exact_and_prefix_identifier_matches_first(self):
+        self.assertEqual(self._tags("ksb-0042"), ["KSB-0042"])
+        self.assertEqual(self._tags("0042"), ["KAP-0042", "KSB-0042"])
+        self.assertEqual(self._tags("KSB-04"), ["KSB-0420"])
+        self.assertEqual(self._tags("9820004"), ["KSB-0042"])
+        self.assertEqual(self._tags("KS"), ["KSB-0042", "KSB-0420"])
+
+    def test_matches_free_text_fuzzy_and_ranch_scope(self):
+        self.assertEqual(self._tags("mumbwa"), ["KAP-0042"])
+        self.assertEqual(self._tags("boran hind"), ["KSB-0042"])
+        self.assertEqual(self._tags("ankolle")[0], "KSB-0420")
+        self.assertEqual(self._tags("boran", ranch=str(self.ranch.pk)), ["KSB-0042"])
+        row = self.client.get("/api/animals/search/", {"q": "KSB-0042"}).json()[0]
+        self.assertEqual(row["ranch"], str(self.ranch.pk))
+
+    def test_other_owners_ranches_are_filtered_before_the_limit(self):
+        stranger = User.objects.create_user(username="stranger", password="pass12345")
+        foreign = Ranch.objects.create(name="Foreign Ranch", owner=stranger)
+        Animal.objects.create(
+            tag_number="0042", ranch=foreign, species="cattle", sex="female", source="born"
+        )
+        # The foreign exact match would win a global top-1 search.
+        self.assertEqual(len(self._tags("0042", limit=1)), 1)
+        self.assertNotIn("0042", self._tags("0042"))
+        self.assertEqual(self._tags("0042", ranch=str(foreign.pk)), [])
+        self.assertEqual(self._tags("ankolle", limit=1), ["KSB-0420"])
+
+    def test_index_follows_saves_and_deletes(self):
+        animal = Animal.objects.get(pk="KSB-0420")
+        animal.qr_code = "QR-PASTURE-7"
+        with CaptureQueriesContext(connection) as queries:
+            animal.save()
+        # Index rows are replaced by rowid, not found by scanning for the tag.
+        deletes = [
+            query["sql"] for query in queries if query["sql"].startswith("DELETE FROM animal_search ")
+        ]
+        self.assertEqual(len(deletes), 1)
+        self.assertIn("WHERE rowid =", deletes[0])
+        self.assertEqual(self._tags("pasture"), ["KSB-0420"])
+        self.assertEqual(self._index_rows(), Animal.objects.count())
+
+        animal.delete()
+        self.assertEqual(self._tags("pasture"), [])
+        self.assertNotIn("KSB-0420", self._tags("0420"))
+        self.assertEqual(self._index_rows(), Animal.objects.count())
+        self.assertEqual(rebuild_index(), Animal.objects.count())
+        self.assertEqual(self._tags("mumbwa"), ["KAP-0042"])
+
+    def _index_rows(self):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT COUNT(*) FROM animal_search s JOIN animal_search_keys k ON k.id = s.rowid"
+            )
+            return cursor.fetchone()[0]
+
+
+class AnimalTimelineTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="herdsman", password="pass12345")
+        ranch = Ranch.objects.create(name="Kisombwa Ranch", owner=cls.user)
+        dam = Animal.objects.create(
+            tag_number="DAM001", ranch=ranch, species="cattle", sex="female", source="born"
+        )
+        other = Animal.objects.create(
+            tag_number="DAM002", ranch=ranch, species="cattle", sex="female", source="born"
+        )
+        BreedingEvent.objects.create(female_tag=dam, service_date=date(2024, 1, 10), method="natural")
+        for day in (1, 20):
+            Vaccination.objects.create(animal_tag=dam, vaccine_type="FMD", date_administered=date(2024, 1, day))
+        Vaccination.objects.create(animal_tag=other, vaccine_type="FMD", date_administered=date(2024, 1, 5))
+        Treatment.objects.create(animal_tag=dam, treatment_date=date(2024, 1, 15))
+        MovementLog.objects.create(animal_tag=dam, to_zone="North", movement_date=date(2024, 1, 12))
+        for hour in (6, 18):
+            RFIDScanLog.objects.create(
+                rfid_code="RF-1", animal_tag=dam, gate_id="G1",
+                scan_timestamp=datetime(2024, 1, 12, hour, tzinfo=dt_timezone.utc),
+            )
+        Mortality.objects.create(animal_tag=dam, death_date=date(2024, 2, 1))
+        cls.expected = [
+            ("mortality", "2024-02-01"),
+            ("vaccination", "2024-01-20"),
+            ("treatment", "2024-01-15"),
+            ("rfid_scan", "2024-01-12T18:00:00Z"),
+            ("rfid_scan", "2024-01-12T06:00:00Z"),
+            ("movement", "2024-01-12"),
+            ("breeding", "2024-01-10"),
+            ("vaccination", "2024-01-01"),
+        ]
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_pages_through_one_merged_newest_first_stream(self):
+        seen, url = [], "/api/animals/DAM001/timeline/?limit=3"
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            body = response.json()
+            self.assertLessEqual(len(body["results"]), 3)
+            seen += [(item["type"], item["date"]) for item in body["results"]]
+            url = body["next"]
+        self.assertEqual(seen, self.expected)
+
+    def test_single_page_holds_everything_when_the_limit_allows(self):
+        body = self.client.get("/api/animals/DAM001/timeline/").json()
+        self.assertEqual([(item["type"], item["date"]) for item in body["results"]], self.expected)
+        self.assertIsNone(body["next"])
+        self.assertEqual(body["results"][0]["data"]["animal_tag"], "DAM001")
+
+    def test_rejects_bad_cursor_and_limit(self):
+        url = "/api/animals/DAM001/timeline/"
+        self.assertEqual(self.client.get(url, {"cursor": "not-a-cursor"}).status_code, 400)
+        self.assertEqual(self.client.get(url, {"limit": 0}).status_code, 400)
@@ -0,0 +1,10 @@
+from datetime import timedelta
+
+from apps.core.jobs import job
+
+from .scheduler import refresh_calendar
+
+
+@job("breeding.refresh_calendar", schedule=timedelta(days=1), max_attempts=3)
+def refresh_reproductive_calendar():
+    refresh_calendar()
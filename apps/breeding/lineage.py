@@ -0,0 +1,73 @@
+"""Dam/sire productivity and calf-origin lookups over ``BreedingOffspring``.
+
+Every query joins the indexed link table instead of scanning
+``offspring_tags`` with ``LIKE`` and splitting strings in Python.
+"""
+
+from django.db import transaction
+from django.db.models import Count, F, Q
+
+from apps.core.tenancy import scope_to_ranches
+
+from .models import BreedingEvent, BreedingOffspring, parse_offspring_tags
+
+PARENTS = {"dam": "female_tag", "sire": "male_tag"}
+
+
+def birth_event(tag_number):
+    """The breeding event that produced ``tag_number``, or ``None``."""
+    return (
+        BreedingEvent.objects.filter(offspring_links__offspring=tag_number)
+        .select_related("female_tag", "male_tag")
+        .order_by("-service_date")
+        .first()
+    )
+
+
+def productivity(parent="sire", ranch_ids=None):
+    """Offspring totals per dam or sire, most live offspring first.
+
+    One row per parent tag: ``services`` (breeding events), ``births``
+    (live-birth events) and ``live_offspring`` (linked calves of live births).
+    """
+    field = PARENTS[parent]
+    events = scope_to_ranches(BreedingEvent.objects.order_by(), ranch_ids).filter(
+        **{f"{field}__isnull": False}
+    )
+    live = Q(outcome="live_birth")
+    return list(
+        events.values(tag=F(field))
+        .annotate(
+            services=Count("id", distinct=True),
+            births=Count("id", filter=live, distinct=True),
+            live_offspring=Count("offspring_links", filter=live),
+        )
+        .order_by("-live_offspring", "tag")
+    )
+
+
+def backfill_offspring_links(batch_size=2000):
+    """Rebuild ``BreedingOffspring`` from ``offspring_tags``; returns links written.
+
+    Every event is visited, so links left on events whose tags were cleared
+    are removed too.
+    """
+    written = 0
+    last = None
+    while True:
+        events = BreedingEvent.objects.order_by("pk")
+        if last is not None:
+            events = events.filter(pk__gt=last)
+        batch = list(events.values_list("pk", "offspring_tags")[:batch_size])
+        if not batch:
+            return written
+        last = batch[-1][0]
+        links = [
+            BreedingOffspring(breeding_event_id=pk, offspring_id=tag)
+            for pk, value in batch
+            for tag in parse_offspring_tags(value)
+        ]
+        with transaction.atomic():
+            BreedingOffspring.objects.filter(breeding_event_id__in=[pk for pk, _ in batch]).delete()
+            BreedingOffspring.objects.bulk_create(links, batch_size=1000)
+        written += len(links)
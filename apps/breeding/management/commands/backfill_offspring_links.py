@@ -0,0 +1,21 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.breeding.lineage import backfill_offspring_links
+
+
+class Command(BaseCommand):
+    help = "Parse offspring_tags on existing breeding events into the breeding_offspring link table"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=2000)
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        written = backfill_offspring_links(batch_size=options["batch_size"])
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Linked {written} offspring tag(s) in {time.monotonic() - started:.2f}s."
+            )
+        )
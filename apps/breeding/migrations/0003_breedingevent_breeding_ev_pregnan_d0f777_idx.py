@@ -0,0 +1,17 @@
+# Generated by Django 4.2.9 on 2026-10-19 15:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('breeding', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='breedingevent',
+            index=models.Index(fields=['pregnancy_confirmed', '-service_date'], name='breeding_ev_pregnan_d0f777_idx'),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 4.2.9 on 2026-10-19 17:10
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def copy_ranch(apps, schema_editor):
+    Animal = apps.get_model('animals', 'Animal')
+    BreedingEvent = apps.get_model('breeding', 'BreedingEvent')
+    BreedingEvent.objects.update(
+        ranch=models.Subquery(
+            Animal.objects.filter(pk=models.OuterRef('female_tag')).values('ranch')[:1]
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_ranchsnapshot'),
+        ('animals', '0006_animal_animals_ranch_i_b5fddf_idx'),
+        ('breeding', '0003_breedingevent_breeding_ev_pregnan_d0f777_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='breedingevent',
+            name='ranch',
+            field=models.ForeignKey(editable=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='breeding_events', to='core.ranch'),
+        ),
+        migrations.RunPython(copy_ranch, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='breedingevent',
+            index=models.Index(fields=['ranch', '-service_date'], name='breeding_ev_ranch_i_d1ab04_idx'),
+        ),
+    ]
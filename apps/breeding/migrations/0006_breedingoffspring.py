@@ -0,0 +1,31 @@
+# Generated by Django 4.2.9 on 2026-10-19 21:40
+
+import apps.core.ids
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('animals', '0007_animals_active_ranch_idx'),
+        ('breeding', '0005_alter_breedingevent_id'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BreedingOffspring',
+            fields=[
+                ('id', models.UUIDField(default=apps.core.ids.uuid7, editable=False, primary_key=True, serialize=False)),
+                ('breeding_event', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='offspring_links', to='breeding.breedingevent')),
+                ('offspring', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='birth_links', to='animals.animal')),
+            ],
+            options={
+                'db_table': 'breeding_offspring',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='breedingoffspring',
+            constraint=models.UniqueConstraint(fields=('breeding_event', 'offspring'), name='breeding_offspring_unique'),
+        ),
+    ]
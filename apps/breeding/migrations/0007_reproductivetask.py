@@ -0,0 +1,45 @@
+# Generated by Django 4.2.9 on 2026-10-19 22:40
+
+import apps.core.ids
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('animals', '0007_animals_active_ranch_idx'),
+        ('core', '0005_uuid7_keys'),
+        ('breeding', '0006_breedingoffspring'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReproductiveTask',
+            fields=[
+                ('id', models.UUIDField(default=apps.core.ids.uuid7, editable=False, primary_key=True, serialize=False)),
+                ('kind', models.CharField(choices=[('heat', 'Predicted Heat'), ('pregnancy_check', 'Pregnancy Check Due'), ('calving', 'Expected Calving')], max_length=20)),
+                ('due_date', models.DateField()),
+                ('computed_at', models.DateTimeField(auto_now=True)),
+                ('animal', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='reproductive_tasks', to='animals.animal')),
+                ('breeding_event', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='tasks', to='breeding.breedingevent')),
+                ('ranch', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='reproductive_tasks', to='core.ranch')),
+            ],
+            options={
+                'db_table': 'reproductive_calendar',
+                'ordering': ['due_date'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='reproductivetask',
+            index=models.Index(fields=['ranch', 'due_date'], name='reproductiv_ranch_i_ede20b_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='reproductivetask',
+            index=models.Index(fields=['kind', 'due_date'], name='reproductiv_kind_daf86d_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='reproductivetask',
+            constraint=models.UniqueConstraint(fields=('animal', 'kind'), name='reproductive_calendar_unique'),
+        ),
+    ]
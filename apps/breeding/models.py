@@ -1,8 +1,21 @@
-import uuid
 from django.db import models
 from datetime import timedelta
 from apps.animals.models import Animal
-from apps.core.models import User
+from apps.core.ids import uuid7
+from apps.core.models import Ranch, User
+
+GESTATION_DAYS = {
+    'cattle': 283,
+    'goat': 150,
+    'sheep': 147,
+}
+
+
+def parse_offspring_tags(value):
+    """Tag numbers in a comma-separated ``offspring_tags`` value, deduplicated."""
+    tags = (tag.strip() for tag in (value or '').split(','))
+    return list(dict.fromkeys(tag for tag in tags if tag))
+
 
 class BreedingEvent(models.Model):
     METHOD_CHOICES = [
@@ -21,8 +34,9 @@ class BreedingEvent(models.Model):
         ('failed_conception', 'Failed Conception'),
     ]
     
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
     female_tag = models.ForeignKey(Animal, on_delete=models.CASCADE, to_field='tag_number', related_name='breeding_as_dam')
+    ranch = models.ForeignKey(Ranch, on_delete=models.CASCADE, null=True, editable=False, related_name='breeding_events')  # copied from female_tag
     male_tag = models.ForeignKey(Animal, on_delete=models.SET_NULL, to_field='tag_number', null=True, blank=True, related_name='breeding_as_sire')
     semen_batch_id = models.CharField(max_length=100, blank=True)
     
@@ -40,7 +54,7 @@ class BreedingEvent(models.Model):
     actual_delivery_date = models.DateField(null=True, blank=True)
     outcome = models.CharField(max_length=30, choices=OUTCOME_CHOICES, blank=True)
     number_of_offspring = models.IntegerField(default=1)
-    offspring_tags = models.TextField(blank=True)  # Comma-separated
+    offspring_tags = models.TextField(blank=True)  # Comma-separated; mirrored in BreedingOffspring
     
     # Metadata
     notes = models.TextField(blank=True)
@@ -53,17 +67,69 @@ class BreedingEvent(models.Model):
         ordering = ['-service_date']
         indexes = [
             models.Index(fields=['female_tag', '-service_date']),
+            models.Index(fields=['pregnancy_confirmed', '-service_date']),
+            models.Index(fields=['ranch', '-service_date']),
         ]
     
     def save(self, *args, **kwargs):
         # Auto-calculate expected delivery date based on species
         if self.service_date and not self.expected_delivery_date:
-            gestation_days = {
-                'cattle': 283,
-                'goat': 150,
-                'sheep': 147,
-            }
-            days = gestation_days.get(self.female_tag.species, 283)
+            days = GESTATION_DAYS.get(self.female_tag.species, 283)
             self.expected_delivery_date = self.service_date + timedelta(days=days)
         
+        self.ranch_id = self.female_tag.ranch_id
         super().save(*args, **kwargs)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or 'offspring_tags' in update_fields:
+            self.link_offspring()
+
+    def link_offspring(self):
+        """Make the ``offspring_links`` rows match ``offspring_tags``."""
+        tags = parse_offspring_tags(self.offspring_tags)
+        self.offspring_links.exclude(offspring_id__in=tags).delete()
+        linked = set(self.offspring_links.values_list('offspring_id', flat=True))
+        BreedingOffspring.objects.bulk_create(
+            [BreedingOffspring(breeding_event=self, offspring_id=tag) for tag in tags if tag not in linked]
+        )
+
+
+class BreedingOffspring(models.Model):
+    # One row per calf tag recorded on a breeding event. No database-level
+    # constraint on the tag: calves are often tagged before they are registered.
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
+    breeding_event = models.ForeignKey(BreedingEvent, on_delete=models.CASCADE, related_name='offspring_links')
+    offspring = models.ForeignKey(Animal, on_delete=models.DO_NOTHING, db_constraint=False, to_field='tag_number', related_name='birth_links')
+
+    class Meta:
+        db_table = 'breeding_offspring'
+        constraints = [
+            models.UniqueConstraint(fields=['breeding_event', 'offspring'], name='breeding_offspring_unique'),
+        ]
+
+
+class ReproductiveTask(models.Model):
+    KIND_CHOICES = [
+        ('heat', 'Predicted Heat'),
+        ('pregnancy_check', 'Pregnancy Check Due'),
+        ('calving', 'Expected Calving'),
+    ]
+
+    # At most one upcoming task per female and kind, recomputed by ``scheduler``.
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
+    animal = models.ForeignKey(Animal, on_delete=models.CASCADE, to_field='tag_number', related_name='reproductive_tasks')
+    ranch = models.ForeignKey(Ranch, on_delete=models.CASCADE, related_name='reproductive_tasks')  # copied from animal
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    due_date = models.DateField()
+    breeding_event = models.ForeignKey(BreedingEvent, on_delete=models.CASCADE, null=True, blank=True, related_name='tasks')
+    computed_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'reproductive_calendar'
+        ordering = ['due_date']
+        constraints = [
+            models.UniqueConstraint(fields=['animal', 'kind'], name='reproductive_calendar_unique'),
+        ]
+        indexes = [
+            models.Index(fields=['ranch', 'due_date']),
+            models.Index(fields=['kind', 'due_date']),
+        ]
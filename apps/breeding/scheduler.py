@@ -0,0 +1,121 @@
+"""Reproductive calendar: predicted heats, pregnancy checks and calvings.
+
+``refresh_calendar`` reads every active breeding-age female together with
+her latest breeding event in one query (correlated subqueries over the
+``(female_tag, -service_date)`` index), derives her upcoming tasks and
+replaces her ``ReproductiveTask`` rows. Breeding-event and animal writes
+refresh just that female; the daily job rebuilds everyone so heat
+predictions roll forward one cycle at a time.
+
+Females with no recorded heat or service get no heat prediction: there is
+nothing to count the cycle from.
+"""
+
+from datetime import timedelta
+
+from dateutil.relativedelta import relativedelta
+from django.db import transaction
+from django.db.models import OuterRef, Q, Subquery
+from django.utils import timezone
+
+from apps.animals.models import Animal
+
+from .models import GESTATION_DAYS, BreedingEvent, ReproductiveTask
+
+ESTROUS_CYCLE_DAYS = {"cattle": 21, "goat": 21, "sheep": 17}
+BREEDING_AGE_MONTHS = {"cattle": 15, "goat": 8, "sheep": 8}
+PREGNANCY_CHECK_DAYS = {"cattle": 35, "goat": 45, "sheep": 45}
+# Days from calving to the first heat worth serving on.
+POSTPARTUM_DAYS = {"cattle": 45, "goat": 30, "sheep": 30}
+CALVED = {"live_birth", "stillbirth"}
+DEFAULT_SPECIES = "cattle"
+
+LATEST_EVENT_FIELDS = {
+    "event_id": "id",
+    "service_date": "service_date",
+    "heat_date": "heat_detected_date",
+    "pregnancy": "pregnancy_confirmed",
+    "check_date": "pregnancy_check_date",
+    "expected_date": "expected_delivery_date",
+    "delivered_date": "actual_delivery_date",
+    "outcome": "outcome",
+}
+
+
+def _days(table, species):
+    return timedelta(days=table.get(species, table[DEFAULT_SPECIES]))
+
+
+def _breeding_females(today, tags=None):
+    of_age = Q(date_of_birth__isnull=True)
+    for species, months in BREEDING_AGE_MONTHS.items():
+        of_age |= Q(species=species, date_of_birth__lte=today - relativedelta(months=months))
+    females = Animal.objects.filter(of_age, sex="female", status="active")
+    if tags is not None:
+        females = females.filter(pk__in=tags)
+    latest = BreedingEvent.objects.filter(female_tag=OuterRef("pk")).order_by(
+        "-service_date", "-created_at"
+    )
+    return females.order_by().values("tag_number", "ranch_id", "species").annotate(
+        **{alias: Subquery(latest.values(field)[:1]) for alias, field in LATEST_EVENT_FIELDS.items()}
+    )
+
+
+def _next_heat(anchor, cycle, today):
+    # The first predicted heat on or after today.
+    if anchor < today:
+        anchor += cycle * -(-(today - anchor).days // cycle.days)
+    return anchor
+
+
+def female_tasks(row, today):
+    """``[(kind, due_date)]`` for one row of ``_breeding_females``."""
+    if row["event_id"] is None:
+        return []
+    species = row["species"]
+    cycle = _days(ESTROUS_CYCLE_DAYS, species)
+    service = row["service_date"]
+    outcome = row["outcome"]
+
+    if not outcome and row["pregnancy"] == "pending":
+        tasks = [
+            ("pregnancy_check", row["check_date"] or service + _days(PREGNANCY_CHECK_DAYS, species))
+        ]
+        # If the service did not hold she returns to heat one cycle later.
+        if service + cycle >= today:
+            tasks.append(("heat", service + cycle))
+        return tasks
+    if not outcome and row["pregnancy"] == "yes":
+        return [("calving", row["expected_date"] or service + _days(GESTATION_DAYS, species))]
+
+    if outcome in CALVED and row["delivered_date"]:
+        anchor = row["delivered_date"] + _days(POSTPARTUM_DAYS, species)
+    else:
+        anchor = (row["heat_date"] or service) + cycle
+    return [("heat", _next_heat(anchor, cycle, today))]
+
+
+def refresh_calendar(tags=None, today=None):
+    """Recompute the tasks of females ``tags`` (every female when ``None``).
+
+    Returns the number of tasks stored.
+    """
+    today = today or timezone.localdate()
+    tasks = [
+        ReproductiveTask(
+            animal_id=row["tag_number"],
+            ranch_id=row["ranch_id"],
+            kind=kind,
+            due_date=due_date,
+            breeding_event_id=row["event_id"],
+        )
+        for row in _breeding_females(today, tags)
+        for kind, due_date in female_tasks(row, today)
+    ]
+    stale = ReproductiveTask.objects.all()
+    if tags is not None:
+        stale = stale.filter(animal_id__in=tags)
+    with transaction.atomic():
+        stale.delete()
+        ReproductiveTask.objects.bulk_create(tasks, batch_size=1000)
+    return len(tasks)
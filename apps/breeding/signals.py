@@ -0,0 +1,29 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from apps.animals.models import Animal
+
+from .models import BreedingEvent
+from .scheduler import refresh_calendar
+
+
+@receiver(post_save, sender=BreedingEvent)
+def breeding_event_saved(sender, instance, raw=False, **kwargs):
+    if not raw:
+        refresh_calendar([instance.female_tag_id])
+
+
+@receiver(post_delete, sender=BreedingEvent)
+def breeding_event_deleted(sender, instance, origin=None, **kwargs):
+    # When the female (or her ranch) is being deleted, her tasks cascade
+    # with her; recomputing them here would recreate rows for a dead key.
+    if getattr(origin, "model", type(origin)) is BreedingEvent:
+        refresh_calendar([instance.female_tag_id])
+
+
+@receiver(post_save, sender=Animal)
+def female_changed(sender, instance, created, raw=False, **kwargs):
+    # Sold, dead or re-homed females: their tasks leave or follow them. A new
+    # animal has no breeding events yet, so there is nothing to compute.
+    if not created and not raw and instance.sex == "female":
+        refresh_calendar([instance.pk])
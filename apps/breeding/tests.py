@@ -1,3 +1,173 @@
+from datetime import date, timedelta
+from io import StringIO
+
+from django.core.management import call_command
 from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.animals.models import Animal
+from apps.core.models import Ranch, User
+
+from .lineage import birth_event, productivity
+from .models import BreedingEvent, BreedingOffspring, ReproductiveTask, parse_offspring_tags
+from .scheduler import refresh_calendar
+
+
+class OffspringLinkTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="manager", password="pass12345")
+        cls.ranch = Ranch.objects.create(name="Kisombwa Ranch", owner=cls.user)
+        cls.dam = cls._animal("DAM001", "female")
+        cls.sire = cls._animal("BULL001", "male")
+        cls.calves = [cls._animal(f"CALF00{i}", "female") for i in range(1, 4)]
+
+    @classmethod
+    def _animal(cls, tag, sex):
+        return Animal.objects.create(
+            tag_number=tag, ranch=cls.ranch, species="cattle", sex=sex, source="born"
+        )
+
+    def _event(self, **kwargs):
+        return BreedingEvent.objects.create(
+            female_tag=self.dam, male_tag=self.sire, service_date=date(2024, 3, 1),
+            method="natural", **kwargs,
+        )
+
+    def test_parse_offspring_tags(self):
+        self.assertEqual(parse_offspring_tags(" CALF001, ,CALF002,CALF001 "), ["CALF001", "CALF002"])
+        self.assertEqual(parse_offspring_tags(""), [])
+
+    def test_links_follow_offspring_tags_on_save(self):
+        event = self._event(outcome="live_birth", offspring_tags="CALF001,CALF002")
+        self.assertEqual(
+            set(event.offspring_links.values_list("offspring_id", flat=True)), {"CALF001", "CALF002"}
+        )
+        event.offspring_tags = "CALF002, CALF003"
+        event.save()
+        self.assertEqual(
+            set(event.offspring_links.values_list("offspring_id", flat=True)), {"CALF002", "CALF003"}
+        )
+        self.assertEqual(birth_event("CALF003"), event)
+        self.assertIsNone(birth_event("CALF001"))
+
+    def test_unregistered_calf_tags_are_linked(self):
+        event = self._event(outcome="live_birth", offspring_tags="NEW001")
+        self.assertEqual(birth_event("NEW001"), event)
+
+    def test_productivity_counts_live_offspring_per_parent(self):
+        self._event(outcome="live_birth", offspring_tags="CALF001,CALF002")
+        self._event(outcome="stillbirth", offspring_tags="CALF003")
+        self._event(outcome="failed_conception")
+        [row] = productivity("sire")
+        self.assertEqual(
+            row, {"tag": "BULL001", "services": 3, "births": 1, "live_offspring": 2}
+        )
+        self.assertEqual(productivity("dam", ranch_ids=set()), [])
+
+    def test_backfill_parses_existing_rows(self):
+        event = self._event(outcome="live_birth")
+        cleared = self._event(outcome="live_birth", offspring_tags="CALF009")
+        BreedingEvent.objects.filter(pk=event.pk).update(offspring_tags="CALF001,CALF002")
+        BreedingEvent.objects.filter(pk=cleared.pk).update(offspring_tags="")
+        self.assertEqual(list(BreedingOffspring.objects.values_list("offspring_id", flat=True)), ["CALF009"])
+        call_command("backfill_offspring_links", stdout=StringIO())
+        self.assertEqual(
+            set(BreedingOffspring.objects.values_list("offspring_id", flat=True)), {"CALF001", "CALF002"}
+        )
+
+    def test_origin_and_productivity_endpoints(self):
+        event = self._event(outcome="live_birth", offspring_tags="CALF001")
+        client = APIClient()
+        client.force_authenticate(self.user)
+        response = client.get("/api/animals/CALF001/origin/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["id"], str(event.pk))
+        self.assertEqual(client.get("/api/animals/CALF002/origin/").status_code, 404)
+        response = client.get("/api/breeding/productivity/?parent=dam")
+        self.assertEqual(response.json()[0]["live_offspring"], 1)
+        self.assertEqual(client.get("/api/breeding/productivity/?parent=calf").status_code, 400)
+
+
+class ReproductiveCalendarTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.today = timezone.localdate()
+        cls.user = User.objects.create_user(username="manager", password="pass12345")
+        cls.ranch = Ranch.objects.create(name="Kisombwa Ranch", owner=cls.user)
+
+    def _female(self, tag, born_days_ago=1500, **event):
+        animal = Animal.objects.create(
+            tag_number=tag, ranch=self.ranch, species="cattle", sex="female", source="born",
+            date_of_birth=self.today - timedelta(days=born_days_ago),
+        )
+        if event:
+            event.setdefault("service_date", self.today - timedelta(days=10))
+            BreedingEvent.objects.create(female_tag=animal, method="natural", **event)
+        return animal
+
+    def _tasks(self, tag):
+        return dict(ReproductiveTask.objects.filter(animal=tag).values_list("kind", "due_date"))
+
+    def _days(self, days):
+        return self.today + timedelta(days=days)
+
+    def test_predicts_checks_calvings_and_next_heats(self):
+        self._female("PENDING", pregnancy_confirmed="pending")
+        self._female("PREG", pregnancy_confirmed="yes", service_date=self._days(-100))
+        self._female("OPEN", pregnancy_confirmed="no", heat_detected_date=self._days(-30))
+        self._female(
+            "CALVED", pregnancy_confirmed="yes", outcome="live_birth",
+            service_date=self._days(-300), actual_delivery_date=self._days(-10),
+        )
+        self._female("HEIFER", born_days_ago=200, service_date=self._days(-10))
+        self._female("MAIDEN")
+
+        self.assertEqual(
+            self._tasks("PENDING"), {"pregnancy_check": self._days(25), "heat": self._days(11)}
+        )
+        self.assertEqual(self._tasks("PREG"), {"calving": self._days(183)})
+        self.assertEqual(self._tasks("OPEN"), {"heat": self._days(12)})
+        self.assertEqual(self._tasks("CALVED"), {"heat": self._days(35)})
+        self.assertEqual(self._tasks("HEIFER"), {})
+        self.assertEqual(self._tasks("MAIDEN"), {})
+        self.assertEqual(refresh_calendar(), ReproductiveTask.objects.count())
+
+    def test_refreshes_when_events_and_females_change(self):
+        self._female("DAM001", service_date=self._days(-40))
+        event = BreedingEvent.objects.get(female_tag="DAM001")
+        self.assertIn("pregnancy_check", self._tasks("DAM001"))
+        event.pregnancy_confirmed = "yes"
+        event.save()
+        self.assertEqual(set(self._tasks("DAM001")), {"calving"})
+
+        event.delete()
+        self.assertEqual(self._tasks("DAM001"), {})
+        self._female("DAM002", pregnancy_confirmed="yes")
+        dam = Animal.objects.get(pk="DAM002")
+        dam.status = "sold"
+        dam.save()
+        self.assertEqual(self._tasks("DAM002"), {})
+
+        # Deleting a female cascades her events without recomputing her tasks.
+        self._female("DAM003", pregnancy_confirmed="yes").delete()
+        self.assertFalse(ReproductiveTask.objects.exists())
+
+    def test_calendar_endpoint_filters_by_date_range_and_kind(self):
+        self._female("PENDING", service_date=self._days(-40))
+        self._female("PREG", pregnancy_confirmed="yes", service_date=self._days(-280))
+        client = APIClient()
+        client.force_authenticate(self.user)
 
-# Create your tests here.
+        rows = client.get("/api/breeding/calendar/").json()
+        self.assertEqual(
+            [(row["animal_tag"], row["kind"], row["overdue"]) for row in rows],
+            [("PENDING", "pregnancy_check", True), ("PREG", "calving", False)],
+        )
+        rows = client.get(
+            "/api/breeding/calendar/",
+            {"start": self.today.isoformat(), "end": self._days(30).isoformat(), "kind": "calving"},
+        ).json()
+        self.assertEqual([row["animal_tag"] for row in rows], ["PREG"])
+        self.assertEqual(client.get("/api/breeding/calendar/", {"end": "soon"}).status_code, 400)
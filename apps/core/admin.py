@@ -1,8 +1,9 @@
 from django.contrib import admin
 
-from .models import Ranch, Staff, SyncQueue, User
+from .models import Job, Ranch, Staff, SyncQueue, User
 
 admin.site.register(User)
 admin.site.register(Ranch)
 admin.site.register(Staff)
 admin.site.register(SyncQueue)
+admin.site.register(Job)
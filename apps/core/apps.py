@@ -4,3 +4,9 @@ from django.apps import AppConfig
 class CoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.core'
+
+    def ready(self):
+        # Core's own jobs are registered where they are defined.
+        from . import authentication, jobs, signals, snapshots  # noqa: F401
+
+        jobs.autodiscover()
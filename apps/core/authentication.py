@@ -0,0 +1,141 @@
+import threading
+import time
+from collections import OrderedDict
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils import timezone
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+
+from .jobs import job
+
+DEFAULT_TOKEN_AUTH_CACHE = {
+    "MAX_ENTRIES": 10000,
+    "LOCAL_TTL": 60,
+    "SHARED_CACHE": None,
+    "SHARED_TTL": 300,
+}
+
+
+def _cache_settings():
+    return {**DEFAULT_TOKEN_AUTH_CACHE, **getattr(settings, "TOKEN_AUTH_CACHE", {})}
+
+
+def token_expiry():
+    days = getattr(settings, "TOKEN_EXPIRY_DAYS", None)
+    return timedelta(days=days) if days else None
+
+
+def token_expires_at(token):
+    expiry = token_expiry()
+    return token.created + expiry if expiry else None
+
+
+def is_token_expired(token):
+    expires_at = token_expires_at(token)
+    return expires_at is not None and expires_at <= timezone.now()
+
+
+@job("core.purge_expired_tokens", schedule=timedelta(hours=6))
+def purge_expired_tokens():
+    expiry = token_expiry()
+    if expiry is None:
+        return 0
+    deleted, _ = Token.objects.filter(created__lte=timezone.now() - expiry).delete()
+    return deleted
+
+
+class TokenCache:
+    """LRU of token key -> (user, token), optionally backed by a shared cache.
+
+    Local entries live at most ``LOCAL_TTL`` seconds, which bounds how long
+    another process can keep serving a token invalidated elsewhere.
+    """
+
+    key_prefix = "auth:token:"
+
+    def __init__(self):
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _shared(self, config):
+        alias = config["SHARED_CACHE"]
+        return caches[alias] if alias else None
+
+    def get(self, key):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    self._entries.move_to_end(key)
+                    return entry[1]
+                del self._entries[key]
+
+        config = _cache_settings()
+        shared = self._shared(config)
+        if shared is None:
+            return None
+        value = shared.get(self.key_prefix + key)
+        if value is not None:
+            self._store_local(key, value, config)
+        return value
+
+    def set(self, key, user, token):
+        config = _cache_settings()
+        value = (user, token)
+        self._store_local(key, value, config)
+
+        shared = self._shared(config)
+        if shared is not None:
+            ttl = config["SHARED_TTL"]
+            expires_at = token_expires_at(token)
+            if expires_at is not None:
+                ttl = min(ttl, (expires_at - timezone.now()).total_seconds())
+            shared.set(self.key_prefix + key, value, max(int(ttl), 1))
+
+    def _store_local(self, key, value, config):
+        ttl = config["LOCAL_TTL"]
+        expires_at = token_expires_at(value[1])
+        if expires_at is not None:
+            ttl = min(ttl, (expires_at - timezone.now()).total_seconds())
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > config["MAX_ENTRIES"]:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, *keys):
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+        shared = self._shared(_cache_settings())
+        if shared is not None and keys:
+            shared.delete_many([self.key_prefix + key for key in keys])
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+token_cache = TokenCache()
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """TokenAuthentication that skips the Token/User query for cached keys."""
+
+    def authenticate_credentials(self, key):
+        cached = token_cache.get(key)
+        if cached is not None:
+            return cached
+
+        user, token = super().authenticate_credentials(key)
+        if is_token_expired(token):
+            token.delete()
+            raise exceptions.AuthenticationFailed("Token has expired.")
+
+        token_cache.set(key, user, token)
+        return user, token
@@ -0,0 +1,89 @@
+"""SQLite tuning for the on-ranch edge server (``SQLITE_EDGE`` setting).
+
+When enabled, every new SQLite connection gets the configured pragmas
+(WAL journaling, relaxed fsync, larger page cache and mmap, a busy
+timeout), and device write paths run inside ``single_writer()`` so that
+concurrent sync and ingestion transactions wait their turn instead of
+failing with "database is locked". Other databases are left alone, and
+``single_writer()`` is then just a transaction.
+"""
+
+import threading
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, OperationalError, connections, transaction
+
+try:
+    import fcntl
+except ImportError:  # Windows: writers are serialized per process only.
+    fcntl = None
+
+DEFAULT_EDGE = {
+    "ENABLED": False,
+    "PRAGMAS": {
+        "journal_mode": "wal",
+        "synchronous": "normal",
+        "cache_size": -64000,
+        "mmap_size": 256 * 1024 * 1024,
+        "temp_store": "memory",
+        "busy_timeout": 10000,
+    },
+    "WRITE_LOCK_TIMEOUT": 30.0,
+}
+
+_writer_lock = threading.Lock()
+_held = threading.local()
+
+
+def edge_settings():
+    config = {**DEFAULT_EDGE, **getattr(settings, "SQLITE_EDGE", {})}
+    config["PRAGMAS"] = {**DEFAULT_EDGE["PRAGMAS"], **config["PRAGMAS"]}
+    return config
+
+
+def edge_enabled(connection):
+    return connection.vendor == "sqlite" and edge_settings()["ENABLED"]
+
+
+def apply_pragmas(connection):
+    """Set the edge pragmas on a freshly opened SQLite connection."""
+    if not edge_enabled(connection):
+        return
+    with connection.cursor() as cursor:
+        for name, value in edge_settings()["PRAGMAS"].items():
+            cursor.execute(f"PRAGMA {name} = {value}")
+
+
+@contextmanager
+def _file_lock(connection):
+    # Serializes writers across worker processes sharing the database file.
+    if fcntl is None or connection.is_in_memory_db():
+        yield
+        return
+    with open(f"{connection.settings_dict['NAME']}.write-lock", "a") as handle:
+        fcntl.flock(handle, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(handle, fcntl.LOCK_UN)
+
+
+@contextmanager
+def single_writer(using=DEFAULT_DB_ALIAS):
+    """Run the block as one write transaction, queued behind other writers."""
+    connection = connections[using]
+    depth = getattr(_held, "depth", 0)
+    if depth or not edge_enabled(connection):
+        with transaction.atomic(using=using):
+            yield
+        return
+    if not _writer_lock.acquire(timeout=edge_settings()["WRITE_LOCK_TIMEOUT"]):
+        raise OperationalError("Timed out waiting for the SQLite writer lock.")
+    _held.depth = 1
+    try:
+        with _file_lock(connection), transaction.atomic(using=using):
+            yield
+    finally:
+        _held.depth = 0
+        _writer_lock.release()
@@ -0,0 +1,245 @@
+import os
+import socket
+import time
+import traceback
+from dataclasses import dataclass
+from datetime import timedelta
+
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Avg, Count, F, Max, Q
+from django.utils import timezone
+from django.utils.module_loading import autodiscover_modules
+
+from .models import Job
+
+RETRY_BASE_SECONDS = 30
+RETRY_MAX_SECONDS = 60 * 60
+STALE_LOCK_AFTER = timedelta(minutes=30)
+
+
+@dataclass(frozen=True)
+class JobSpec:
+    name: str
+    func: object
+    schedule: timedelta = None
+    max_attempts: int = 5
+    priority: int = 0
+
+
+_registry = {}
+
+
+def job(name, schedule=None, max_attempts=5, priority=0):
+    """Register ``func(**payload)`` as a background job.
+
+    Jobs with a ``schedule`` are periodic: workers keep exactly one queued copy
+    of them, due ``schedule`` after the previous run finished.
+    """
+
+    def decorator(func):
+        _registry[name] = JobSpec(name, func, schedule, max_attempts, priority)
+        return func
+
+    return decorator
+
+
+def get_registry():
+    return _registry
+
+
+def autodiscover():
+    autodiscover_modules("jobs")
+
+
+def enqueue(name, payload=None, run_at=None, priority=None, dedupe_key=None):
+    spec = _registry.get(name)
+    fields = {
+        "name": name,
+        "payload": payload or {},
+        "run_at": run_at or timezone.now(),
+        "dedupe_key": dedupe_key,
+    }
+    if spec:
+        fields["max_attempts"] = spec.max_attempts
+        fields["priority"] = spec.priority
+    if priority is not None:
+        fields["priority"] = priority
+
+    if dedupe_key is None:
+        return Job.objects.create(**fields)
+
+    try:
+        with transaction.atomic():
+            return Job.objects.create(**fields)
+    except IntegrityError:
+        # An identical job is already queued or running.
+        return None
+
+
+def retry_delay(attempts):
+    return timedelta(seconds=min(RETRY_BASE_SECONDS * 2 ** (attempts - 1), RETRY_MAX_SECONDS))
+
+
+def worker_id():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def _claim_skip_locked(worker, now, names):
+    with transaction.atomic():
+        candidates = Job.objects.select_for_update(skip_locked=True).filter(
+            status="queued", run_at__lte=now
+        )
+        if names:
+            candidates = candidates.filter(name__in=names)
+        claimed = candidates.order_by("priority", "run_at").first()
+        if claimed is None:
+            return None
+        claimed.status = "running"
+        claimed.locked_by = worker
+        claimed.locked_at = now
+        claimed.started_at = now
+        claimed.attempts += 1
+        claimed.save(
+            update_fields=["status", "locked_by", "locked_at", "started_at", "attempts", "updated_at"]
+        )
+        return claimed
+
+
+def _claim_atomic_update(worker, now, names):
+    # No row-level locks (SQLite): pick a candidate, then win it with a
+    # conditional UPDATE. Losing the race just means trying the next one.
+    candidates = Job.objects.filter(status="queued", run_at__lte=now)
+    if names:
+        candidates = candidates.filter(name__in=names)
+    for job_id in candidates.order_by("priority", "run_at").values_list("id", flat=True)[:10]:
+        won = Job.objects.filter(pk=job_id, status="queued").update(
+            status="running",
+            locked_by=worker,
+            locked_at=now,
+            started_at=now,
+            attempts=F("attempts") + 1,
+            updated_at=now,
+        )
+        if won:
+            return Job.objects.get(pk=job_id)
+    return None
+
+
+def claim_next(worker=None, names=None):
+    worker = worker or worker_id()
+    now = timezone.now()
+    if connection.features.has_select_for_update_skip_locked:
+        return _claim_skip_locked(worker, now, names)
+    return _claim_atomic_update(worker, now, names)
+
+
+def run_job(claimed):
+    spec = _registry.get(claimed.name)
+    started = time.monotonic()
+    error = ""
+    try:
+        if spec is None:
+            raise LookupError(f"No job registered as '{claimed.name}'.")
+        spec.func(**claimed.payload)
+    except Exception:
+        error = traceback.format_exc()
+
+    now = timezone.now()
+    claimed.duration_ms = int((time.monotonic() - started) * 1000)
+    claimed.finished_at = now
+    claimed.locked_by = ""
+    claimed.locked_at = None
+    if not error:
+        claimed.status = "succeeded"
+        claimed.last_error = ""
+    elif claimed.attempts < claimed.max_attempts:
+        claimed.status = "queued"
+        claimed.last_error = error
+        claimed.run_at = now + retry_delay(claimed.attempts)
+    else:
+        claimed.status = "failed"
+        claimed.last_error = error
+    claimed.save()
+
+    if spec is not None and spec.schedule is not None and claimed.status != "queued":
+        schedule_periodic(spec, after=now)
+    return claimed
+
+
+def schedule_periodic(spec, after=None):
+    last_run = after or Job.objects.filter(
+        name=spec.name, finished_at__isnull=False
+    ).aggregate(last=Max("finished_at"))["last"]
+    run_at = last_run + spec.schedule if last_run else timezone.now()
+    return enqueue(spec.name, run_at=run_at, dedupe_key=f"periodic:{spec.name}")
+
+
+def ensure_periodic_jobs():
+    for spec in _registry.values():
+        if spec.schedule is not None:
+            schedule_periodic(spec)
+
+
+def requeue_stale(older_than=STALE_LOCK_AFTER):
+    # Jobs whose worker died mid-run; the attempt still counts, so jobs that
+    # used up their attempts fail instead of being retried forever.
+    now = timezone.now()
+    stale = Job.objects.filter(status="running", locked_at__lt=now - older_than)
+    stale.filter(attempts__gte=F("max_attempts")).update(
+        status="failed",
+        locked_by="",
+        locked_at=None,
+        finished_at=now,
+        last_error="Worker stopped before the job finished.",
+        updated_at=now,
+    )
+    return stale.update(status="queued", locked_by="", locked_at=None, run_at=now)
+
+
+def work(worker=None, names=None, burst=False, poll_interval=1.0, max_jobs=None):
+    """Claim and run jobs until the queue is empty (``burst``) or forever."""
+    worker = worker or worker_id()
+    processed = 0
+    while max_jobs is None or processed < max_jobs:
+        claimed = claim_next(worker, names)
+        if claimed is None:
+            if burst:
+                break
+            time.sleep(poll_interval)
+            continue
+        run_job(claimed)
+        processed += 1
+    return processed
+
+
+def job_metrics(since=None):
+    finished = Job.objects.filter(finished_at__isnull=False)
+    if since is not None:
+        finished = finished.filter(finished_at__gte=since)
+
+    rows = finished.order_by().values("name").annotate(
+        runs=Count("id"),
+        succeeded=Count("id", filter=Q(status="succeeded")),
+        failed=Count("id", filter=Q(status="failed")),
+        avg_duration_ms=Avg("duration_ms"),
+        max_duration_ms=Max("duration_ms"),
+        last_finished_at=Max("finished_at"),
+    )
+    queued = dict(
+        Job.objects.filter(status="queued").order_by().values_list("name").annotate(total=Count("id"))
+    )
+    return {
+        row["name"]: {
+            **row,
+            "avg_duration_ms": round(row["avg_duration_ms"] or 0, 1),
+            "queued": queued.get(row["name"], 0),
+        }
+        for row in rows
+    }
+
+
+@job("core.seed_data", max_attempts=1)
+def seed_data():
+    from django.core.management import call_command
+
+    call_command("seed_data")
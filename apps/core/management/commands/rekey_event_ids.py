@@ -0,0 +1,57 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from apps.analytics.models import SystemMetric
+from apps.core.ids import uuid7
+from apps.core.models import SyncQueue
+from apps.operations.models import RFIDScanLog
+
+# Server-side append logs with no foreign keys pointing at them. Other event
+# tables keep their ids: devices and bootstrap snapshots refer to them.
+REKEYABLE = {
+    model._meta.db_table: model for model in (RFIDScanLog, SyncQueue, SystemMetric)
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Replace random (v4) primary keys of existing log rows with time-ordered v7 keys "
+        "derived from created_at. Optional: new rows already get v7 keys."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--table",
+            action="append",
+            dest="tables",
+            choices=sorted(REKEYABLE),
+            help="Only rekey this table (repeatable). Defaults to all of them.",
+        )
+        parser.add_argument("--batch-size", type=int, default=5000)
+
+    def handle(self, *args, **options):
+        for table in options["tables"] or sorted(REKEYABLE):
+            rekeyed = self._rekey(REKEYABLE[table], options["batch_size"])
+            self.stdout.write(f"{table}: rekeyed {rekeyed} row(s).")
+        self.stdout.write(
+            self.style.SUCCESS("Done. Run VACUUM (SQLite) or REINDEX (PostgreSQL) to compact the indexes.")
+        )
+
+    def _rekey(self, model, batch_size):
+        rekeyed = 0
+        last = None
+        while True:
+            rows = model.objects.order_by("pk")
+            if last is not None:
+                rows = rows.filter(pk__gt=last)
+            batch = list(rows.values_list("pk", "created_at")[:batch_size])
+            if not batch:
+                return rekeyed
+            last = batch[-1][0]
+            # Rows rekeyed earlier may come round again; they are already v7.
+            stale = [(pk, created_at) for pk, created_at in batch if pk.version != 7]
+            with transaction.atomic():
+                for pk, created_at in stale:
+                    new_pk = uuid7(int(created_at.timestamp() * 1000))
+                    model.objects.filter(pk=pk).update(id=new_pk)
+            rekeyed += len(stale)
@@ -0,0 +1,92 @@
+import multiprocessing
+import signal
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from apps.core import jobs
+
+
+def _worker_main(names, burst, poll_interval):
+    # Forked children must never reuse the parent's DB connections.
+    connections.close_all()
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    jobs.work(names=names, burst=burst, poll_interval=poll_interval)
+
+
+class Command(BaseCommand):
+    help = "Run background jobs from the KRIS job queue"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--processes", type=int, default=1, help="Worker processes to fork.")
+        parser.add_argument(
+            "--queue",
+            action="append",
+            dest="names",
+            help="Only run jobs with this name (repeatable).",
+        )
+        parser.add_argument(
+            "--burst", action="store_true", help="Exit once no runnable jobs remain."
+        )
+        parser.add_argument("--poll-interval", type=float, default=1.0)
+        parser.add_argument(
+            "--metrics", action="store_true", help="Print per-job timing metrics and exit."
+        )
+
+    def handle(self, *args, **options):
+        if options["metrics"]:
+            self._print_metrics()
+            return
+
+        requeued = jobs.requeue_stale()
+        if requeued:
+            self.stdout.write(f"Requeued {requeued} stale job(s).")
+        jobs.ensure_periodic_jobs()
+
+        names = options["names"]
+        burst = options["burst"]
+        poll_interval = options["poll_interval"]
+        processes = max(options["processes"], 1)
+
+        started = time.monotonic()
+        if processes == 1:
+            processed = jobs.work(names=names, burst=burst, poll_interval=poll_interval)
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"Processed {processed} job(s) in {time.monotonic() - started:.2f}s."
+                )
+            )
+            return
+
+        connections.close_all()
+        context = multiprocessing.get_context("fork")
+        workers = [
+            context.Process(target=_worker_main, args=(names, burst, poll_interval), daemon=True)
+            for _ in range(processes)
+        ]
+        for worker in workers:
+            worker.start()
+        try:
+            for worker in workers:
+                worker.join()
+        except KeyboardInterrupt:
+            for worker in workers:
+                worker.terminate()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{processes} workers stopped after {time.monotonic() - started:.2f}s."
+            )
+        )
+
+    def _print_metrics(self):
+        metrics = jobs.job_metrics()
+        if not metrics:
+            self.stdout.write("No finished jobs.")
+            return
+        for name, row in sorted(metrics.items()):
+            self.stdout.write(
+                f"{name}: runs={row['runs']} ok={row['succeeded']} failed={row['failed']} "
+                f"queued={row['queued']} avg={row['avg_duration_ms']}ms "
+                f"max={row['max_duration_ms']}ms last={row['last_finished_at']:%Y-%m-%d %H:%M:%S}"
+            )
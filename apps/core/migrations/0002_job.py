@@ -0,0 +1,53 @@
+# Generated by Django 4.2.9 on 2026-10-19 15:02
+
+from django.core.management import call_command
+from django.db import migrations, models
+import django.utils.timezone
+import uuid
+
+
+def create_cache_table(apps, schema_editor):
+    # settings.CACHES uses DatabaseCache; createcachetable skips existing tables.
+    call_command('createcachetable', database=schema_editor.connection.alias, verbosity=0)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Job',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('name', models.CharField(max_length=100)),
+                ('payload', models.JSONField(blank=True, default=dict)),
+                ('status', models.CharField(choices=[('queued', 'Queued'), ('running', 'Running'), ('succeeded', 'Succeeded'), ('failed', 'Failed')], default='queued', max_length=20)),
+                ('priority', models.IntegerField(default=0)),
+                ('run_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('dedupe_key', models.CharField(blank=True, max_length=200, null=True)),
+                ('attempts', models.IntegerField(default=0)),
+                ('max_attempts', models.IntegerField(default=5)),
+                ('last_error', models.TextField(blank=True)),
+                ('locked_by', models.CharField(blank=True, max_length=100)),
+                ('locked_at', models.DateTimeField(blank=True, null=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('duration_ms', models.IntegerField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'jobs',
+                'ordering': ['priority', 'run_at'],
+                'indexes': [models.Index(fields=['status', 'priority', 'run_at'], name='jobs_status_267120_idx'), models.Index(fields=['name', '-finished_at'], name='jobs_name_2e5b51_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='job',
+            constraint=models.UniqueConstraint(condition=models.Q(('status__in', ['queued', 'running'])), fields=('dedupe_key',), name='jobs_active_dedupe_key'),
+        ),
+        migrations.RunPython(create_cache_table, migrations.RunPython.noop),
+    ]
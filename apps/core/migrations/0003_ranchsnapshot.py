@@ -0,0 +1,36 @@
+# Generated by Django 4.2.9 on 2026-10-19 16:40
+
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_job'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RanchSnapshot',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('version', models.CharField(max_length=64)),
+                ('file', models.FileField(upload_to='snapshots/')),
+                ('cursor', models.DateTimeField()),
+                ('size_bytes', models.IntegerField()),
+                ('row_counts', models.JSONField(default=dict)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('ranch', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='snapshots', to='core.ranch')),
+            ],
+            options={
+                'db_table': 'ranch_snapshots',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='ranchsnapshot',
+            index=models.Index(fields=['ranch', '-created_at'], name='ranch_snaps_ranch_i_785180_idx'),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 4.2.9 on 2026-10-19 20:05
+
+from django.db import migrations, models
+
+from apps.core.postgres import brin_indexes
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_ranchsnapshot'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='syncqueue',
+            index=models.Index(condition=models.Q(('synced', False)), fields=['device_id', 'timestamp'], name='sync_queue_unsynced_idx'),
+        ),
+        brin_indexes({'sync_queue_created_brin': ('sync_queue', 'created_at')}),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 4.2.9 on 2026-10-19 23:20
+
+import apps.core.ids
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_uuid7_keys'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SyncTombstone',
+            fields=[
+                ('id', models.UUIDField(default=apps.core.ids.uuid7, editable=False, primary_key=True, serialize=False)),
+                ('table_name', models.CharField(max_length=100)),
+                ('row_id', models.CharField(max_length=100)),
+                ('removed_at', models.DateTimeField(auto_now_add=True)),
+                ('ranch', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='sync_tombstones', to='core.ranch')),
+            ],
+            options={
+                'db_table': 'sync_tombstones',
+                'ordering': ['removed_at'],
+                'indexes': [models.Index(fields=['ranch', 'removed_at'], name='sync_tombst_ranch_i_b569ee_idx')],
+            },
+        ),
+    ]
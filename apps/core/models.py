@@ -1,6 +1,8 @@
 import uuid
 from django.db import models
 from django.contrib.auth.models import AbstractUser
+from django.utils import timezone
+from .ids import uuid7
 
 class User(AbstractUser):
     ROLE_CHOICES = [
@@ -67,7 +69,7 @@ class SyncQueue(models.Model):
         ('delete', 'Delete'),
     ]
     
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
     device_id = models.CharField(max_length=100)
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='sync_operations')
     operation = models.CharField(max_length=20, choices=OPERATION_CHOICES)
@@ -84,4 +86,92 @@ class SyncQueue(models.Model):
         ordering = ['timestamp']
         indexes = [
             models.Index(fields=['device_id', 'synced', 'timestamp']),
+            models.Index(fields=['device_id', 'timestamp'], condition=models.Q(synced=False), name='sync_queue_unsynced_idx'),
+        ]
+
+class Job(models.Model):
+    STATUS_CHOICES = [
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('succeeded', 'Succeeded'),
+        ('failed', 'Failed'),
+    ]
+    
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
+    name = models.CharField(max_length=100)
+    payload = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='queued')
+    priority = models.IntegerField(default=0)  # Lower runs first
+    run_at = models.DateTimeField(default=timezone.now)
+    dedupe_key = models.CharField(max_length=200, null=True, blank=True)
+    
+    # Retry tracking
+    attempts = models.IntegerField(default=0)
+    max_attempts = models.IntegerField(default=5)
+    last_error = models.TextField(blank=True)
+    
+    # Claiming & timing
+    locked_by = models.CharField(max_length=100, blank=True)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    duration_ms = models.IntegerField(null=True, blank=True)
+    
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        db_table = 'jobs'
+        ordering = ['priority', 'run_at']
+        indexes = [
+            models.Index(fields=['status', 'priority', 'run_at']),
+            models.Index(fields=['name', '-finished_at']),
+        ]
+        constraints = [
+            # At most one pending/running copy of a deduplicated (e.g. periodic) job.
+            models.UniqueConstraint(
+                fields=['dedupe_key'],
+                condition=models.Q(status__in=['queued', 'running']),
+                name='jobs_active_dedupe_key',
+            ),
+        ]
+    
+    def __str__(self):
+        return f"{self.name} ({self.status})"
+
+
+class RanchSnapshot(models.Model):
+    # Compressed SQLite bootstrap file for new devices (see ``snapshots``).
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    ranch = models.ForeignKey(Ranch, on_delete=models.CASCADE, related_name='snapshots')
+    version = models.CharField(max_length=64)  # sha256 of the database, served as the ETag
+    file = models.FileField(upload_to='snapshots/')
+    cursor = models.DateTimeField()  # delta sync starts here
+    size_bytes = models.IntegerField()
+    row_counts = models.JSONField(default=dict)
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        db_table = 'ranch_snapshots'
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['ranch', '-created_at']),
+        ]
+
+
+class SyncTombstone(models.Model):
+    # A row that left a ranch's offline database, deleted or moved to another
+    # ranch with its animal; delta syncs tell devices to drop it. Deleting a
+    # ranch records tombstones for its rows as they go, so no constraint.
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
+    ranch = models.ForeignKey(Ranch, on_delete=models.DO_NOTHING, db_constraint=False, related_name='sync_tombstones')
+    table_name = models.CharField(max_length=100)
+    row_id = models.CharField(max_length=100)
+    removed_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        db_table = 'sync_tombstones'
+        ordering = ['removed_at']
+        indexes = [
+            models.Index(fields=['ranch', 'removed_at']),
         ]
@@ -0,0 +1,56 @@
+"""Primary/replica routing for analytics and list reads.
+
+Reads go to the ``READ_REPLICA`` alias only inside ``read_from_replica()``
+blocks (safe viewset reads, analytics views and jobs); everything else,
+and every write, uses ``default``. Once a block writes, its remaining reads
+are pinned to ``default`` so a request always sees its own writes.
+"""
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+_replica_reads = ContextVar("kris_replica_reads", default=False)
+_pinned_to_primary = ContextVar("kris_pinned_to_primary", default=False)
+
+
+def replica_alias():
+    """The configured replica alias, or ``None`` when reads stay on ``default``."""
+    alias = getattr(settings, "READ_REPLICA", None)
+    return alias if alias in settings.DATABASES else None
+
+
+@contextmanager
+def read_from_replica():
+    reads = _replica_reads.set(True)
+    pinned = _pinned_to_primary.set(False)
+    try:
+        yield
+    finally:
+        _pinned_to_primary.reset(pinned)
+        _replica_reads.reset(reads)
+
+
+def _is_cache(model):
+    # DatabaseCache entries: always on the primary, and writing one is not a
+    # reason to pin a replica block's reads.
+    return model._meta.app_label == "django_cache"
+
+
+class PrimaryReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if _replica_reads.get() and not _pinned_to_primary.get() and not _is_cache(model):
+            return replica_alias() or DEFAULT_DB_ALIAS
+        return DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        if _replica_reads.get() and not _is_cache(model):
+            _pinned_to_primary.set(True)
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # The replica holds the same rows, so objects read from either side
+        # may be related to each other.
+        return True
@@ -0,0 +1,39 @@
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+
+from .authentication import token_cache
+from .edge import apply_pragmas
+from .models import User
+from .snapshots import SNAPSHOT_MODELS, record_removals
+
+
+@receiver(post_delete, sender=Token)
+def invalidate_deleted_token(sender, instance, **kwargs):
+    token_cache.invalidate(instance.key)
+
+
+@receiver(post_save, sender=User)
+def invalidate_user_tokens(sender, instance, created, **kwargs):
+    # Cached entries hold the user object, so any change (deactivation, role)
+    # must drop them.
+    if created:
+        return
+    keys = list(Token.objects.filter(user=instance).values_list("key", flat=True))
+    token_cache.invalidate(*keys)
+
+
+@receiver(connection_created, dispatch_uid="core.sqlite_edge_pragmas")
+def tune_sqlite_connection(sender, connection, **kwargs):
+    apply_pragmas(connection)
+
+
+def leave_snapshot_tombstone(sender, instance, **kwargs):
+    record_removals(sender, [(instance.pk, instance.ranch_id)])
+
+
+for _model in SNAPSHOT_MODELS:
+    post_delete.connect(
+        leave_snapshot_tombstone, sender=_model, dispatch_uid=f"snapshot-delete-{_model.__name__}"
+    )
@@ -0,0 +1,228 @@
+"""Prebuilt offline databases for bootstrapping new devices.
+
+A snapshot is a gzip-compressed SQLite file holding one ranch's animals and
+its recent events, using the server's table and column names. Devices
+download it once (``/api/sync/snapshot/``, revalidated by ETag) and then
+catch up with ``/api/sync/changes/?cursor=``, starting from the cursor
+stored in the snapshot's ``meta`` table. Rows deleted or moved to another
+ranch leave a ``SyncTombstone`` so the delta can tell devices to drop them.
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import sqlite3
+import tempfile
+import uuid
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+from django.core.files.base import ContentFile
+from django.db import models
+from django.db.models import Q
+from django.utils import timezone
+
+from apps.animals.models import Animal
+from apps.breeding.models import BreedingEvent
+from apps.health.models import Mortality, Treatment, Vaccination
+from apps.operations.models import HerdCount, MovementLog
+
+from .jobs import job
+from .models import Ranch, RanchSnapshot, SyncTombstone
+
+SCHEMA_VERSION = 1
+RECENT_EVENT_DAYS = 365
+KEEP_SNAPSHOTS = 2
+# Rebuilt even without changes so the recent-events window keeps sliding.
+MAX_SNAPSHOT_AGE = timedelta(days=1)
+MAX_CHANGES = 5000
+# Rows saved just before a cursor but committed after it must not be missed;
+# devices upsert, so resending a few rows is harmless.
+CURSOR_OVERLAP = timedelta(seconds=5)
+# Devices further behind than this re-download the snapshot instead.
+TOMBSTONE_RETENTION = timedelta(days=30)
+SNAPSHOT_MODELS = (Animal, BreedingEvent, Vaccination, Treatment, Mortality, HerdCount, MovementLog)
+
+
+def _tables(ranch_id, since):
+    """``(model, rows_for_ranch)`` for every snapshot table."""
+    return [
+        (Animal, Q(ranch_id=ranch_id)),
+        (BreedingEvent, Q(ranch_id=ranch_id) & Q(service_date__gte=since)),
+        (
+            Vaccination,
+            # Older vaccinations still matter while their next dose is due.
+            Q(ranch_id=ranch_id)
+            & (Q(date_administered__gte=since) | Q(next_due_date__gte=since)),
+        ),
+        (Treatment, Q(ranch_id=ranch_id) & Q(treatment_date__gte=since)),
+        (Mortality, Q(ranch_id=ranch_id)),
+        (HerdCount, Q(ranch_id=ranch_id) & Q(count_date__gte=since)),
+        (MovementLog, Q(ranch_id=ranch_id) & Q(movement_date__gte=since)),
+    ]
+
+
+def record_removals(model, rows):
+    """Leave tombstones for ``rows`` (``(pk, ranch_id)`` pairs) that left their ranch."""
+    if model not in SNAPSHOT_MODELS:
+        return
+    SyncTombstone.objects.bulk_create(
+        SyncTombstone(ranch_id=ranch_id, table_name=model._meta.db_table, row_id=str(pk))
+        for pk, ranch_id in rows
+        if ranch_id is not None
+    )
+
+
+def _columns(model):
+    return [field.column for field in model._meta.concrete_fields]
+
+
+def _sqlite_type(field):
+    if isinstance(field, (models.IntegerField, models.BooleanField)):
+        return "INTEGER"
+    if isinstance(field, models.FloatField):
+        return "REAL"
+    return "TEXT"  # decimals stay text so no precision is lost
+
+
+def _plain(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, (uuid.UUID, Decimal)):
+        return str(value)
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, sort_keys=True)
+    if value is None or isinstance(value, (int, float, str)):
+        return value
+    return str(value)
+
+
+def _rows(model, condition):
+    columns = _columns(model)
+    rows = model.objects.filter(condition).order_by("pk").values_list(
+        *[field.attname for field in model._meta.concrete_fields]
+    )
+    return columns, ([_plain(value) for value in row] for row in rows.iterator(chunk_size=2000))
+
+
+def write_database(path, ranch_id, cursor, since):
+    counts = {}
+    database = sqlite3.connect(path)
+    try:
+        database.execute("CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT)")
+        for model, condition in _tables(ranch_id, since):
+            table = model._meta.db_table
+            fields = model._meta.concrete_fields
+            definition = ", ".join(
+                f'"{field.column}" {_sqlite_type(field)}'
+                + (" PRIMARY KEY" if field.primary_key else "")
+                for field in fields
+            )
+            database.execute(f'CREATE TABLE "{table}" ({definition})')
+            columns, rows = _rows(model, condition)
+            placeholders = ", ".join("?" * len(columns))
+            inserted = database.executemany(f'INSERT INTO "{table}" VALUES ({placeholders})', rows)
+            counts[table] = inserted.rowcount
+        database.executemany(
+            "INSERT INTO meta VALUES (?, ?)",
+            [
+                ("schema_version", str(SCHEMA_VERSION)),
+                ("ranch", str(ranch_id)),
+                ("cursor", cursor.isoformat()),
+                ("events_since", since.isoformat()),
+            ],
+        )
+        database.commit()
+    finally:
+        database.close()
+    return counts
+
+
+def build_snapshot(ranch):
+    """Write a new snapshot for ``ranch`` and drop all but the newest few."""
+    # Taken before reading, so writes racing the build show up in the delta.
+    cursor = timezone.now()
+    since = timezone.localdate(cursor) - timedelta(days=RECENT_EVENT_DAYS)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "snapshot.sqlite3")
+        counts = write_database(path, ranch.pk, cursor, since)
+        with open(path, "rb") as database:
+            data = database.read()
+
+    version = hashlib.sha256(data).hexdigest()
+    compressed = gzip.compress(data, mtime=0)
+    snapshot = RanchSnapshot(
+        ranch=ranch, version=version, cursor=cursor, size_bytes=len(compressed), row_counts=counts
+    )
+    snapshot.file.save(f"{ranch.pk}/{version[:32]}.sqlite3.gz", ContentFile(compressed), save=False)
+    snapshot.save()
+
+    for old in RanchSnapshot.objects.filter(ranch=ranch).order_by("-created_at")[KEEP_SNAPSHOTS:]:
+        old.file.delete(save=False)
+        old.delete()
+    return snapshot
+
+
+def has_changes(ranch_id, cursor):
+    # No overlap here: late commits reach devices through the delta instead.
+    since = timezone.localdate(cursor) - timedelta(days=RECENT_EVENT_DAYS)
+    return SyncTombstone.objects.filter(ranch_id=ranch_id, removed_at__gte=cursor).exists() or any(
+        model.objects.filter(condition, updated_at__gte=cursor).exists()
+        for model, condition in _tables(ranch_id, since)
+    )
+
+
+def latest_snapshot(ranch):
+    return RanchSnapshot.objects.filter(ranch=ranch).order_by("-created_at").first()
+
+
+@job("core.refresh_snapshots", schedule=timedelta(hours=1), max_attempts=3)
+def refresh_snapshots():
+    """Rebuild every ranch snapshot that is missing, stale or behind its data."""
+    SyncTombstone.objects.filter(removed_at__lt=timezone.now() - TOMBSTONE_RETENTION).delete()
+    built = 0
+    for ranch in Ranch.objects.all():
+        snapshot = latest_snapshot(ranch)
+        if (
+            snapshot is None
+            or timezone.now() - snapshot.created_at > MAX_SNAPSHOT_AGE
+            or has_changes(ranch.pk, snapshot.cursor)
+        ):
+            build_snapshot(ranch)
+            built += 1
+    return built
+
+
+def changes_since(ranch_id, cursor):
+    """Rows created, updated or removed at/after ``cursor``.
+
+    ``changes`` holds rows in snapshot row format and ``deleted`` the ids of
+    rows that were deleted or moved to another ranch, per table; devices
+    apply the deletions first. Returns ``None`` when there are more than
+    ``MAX_CHANGES`` rows or the cursor predates the kept tombstones; the
+    device should download a fresh snapshot instead.
+    """
+    next_cursor = timezone.now()
+    if cursor < next_cursor - TOMBSTONE_RETENTION:
+        return None
+    since = timezone.localdate(cursor) - timedelta(days=RECENT_EVENT_DAYS)
+    deleted = {}
+    tombstones = SyncTombstone.objects.filter(
+        ranch_id=ranch_id, removed_at__gte=cursor - CURSOR_OVERLAP
+    ).values_list("table_name", "row_id")
+    for table, row_id in tombstones[: MAX_CHANGES + 1]:
+        deleted.setdefault(table, []).append(row_id)
+    changes = {}
+    total = sum(len(row_ids) for row_ids in deleted.values())
+    for model, condition in _tables(ranch_id, since):
+        if total > MAX_CHANGES:
+            return None
+        columns, rows = _rows(model, condition & Q(updated_at__gte=cursor - CURSOR_OVERLAP))
+        rows = [dict(zip(columns, row)) for row in rows]
+        total += len(rows)
+        if rows:
+            changes[model._meta.db_table] = rows
+    if total > MAX_CHANGES:
+        return None
+    return {"cursor": next_cursor.isoformat(), "changes": changes, "deleted": deleted}
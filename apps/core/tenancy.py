@@ -0,0 +1,79 @@
+"""Ranch scoping: which ranches a user may see, and querysets limited to them.
+
+Every event table carries a ``ranch`` column copied from its animal, with a
+``(ranch, date)`` index, so a scoped query never joins through ``animals``.
+"""
+
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import Ranch
+
+# Roles that see every ranch; everyone else sees the ranches they own or
+# are on the staff of.
+ALL_RANCH_ROLES = {"admin"}
+# Tables whose rows may have no animal (unknown RFID tags, group moves);
+# such rows take the ranch of the gate or device that recorded them.
+DEVICE_RANCH_TABLES = {"operations.movementlog", "operations.rfidscanlog"}
+
+
+def user_ranch_ids(user):
+    """Ranch ids ``user`` may see, or ``None`` for every ranch."""
+    if user.is_superuser or user.role in ALL_RANCH_ROLES:
+        return None
+    return set(
+        Ranch.objects.filter(Q(owner=user) | Q(staff__user=user)).values_list("id", flat=True)
+    )
+
+
+def scope_to_ranches(queryset, ranch_ids):
+    """Limit ``queryset`` to ``ranch_ids`` (``None`` leaves it unscoped)."""
+    if ranch_ids is None:
+        return queryset
+    # Rows without a ranch belong to nobody, so only admins see them.
+    return queryset.filter(ranch_id__in=ranch_ids)
+
+
+def can_access_ranch(user, ranch_id):
+    ranch_ids = user_ranch_ids(user)
+    return ranch_ids is None or ranch_id in ranch_ids
+
+
+def device_ranch_id(ranch_ids, requested=None):
+    """The ranch a gate or device records for, given the user's ``ranch_ids``.
+
+    That is ``requested`` (the ranch the device says it is on) if the user
+    may record for it, else the user's only ranch; ``None`` when neither
+    applies.
+    """
+    if requested is not None:
+        return requested if ranch_ids is None or requested in ranch_ids else None
+    if ranch_ids is not None and len(ranch_ids) == 1:
+        return next(iter(ranch_ids))
+    return None
+
+
+def move_animal_events(tag_number, ranch_id):
+    """Re-home an animal's event rows after the animal changed ranch.
+
+    The moved rows count as changed for the new ranch's devices and as
+    removed for the old ranch's.
+    """
+    from apps.breeding.models import BreedingEvent
+    from apps.health.models import Mortality, Treatment, Vaccination
+    from apps.operations.models import MovementLog, RFIDScanLog
+
+    from .snapshots import record_removals
+
+    now = timezone.now()
+    for model, tag_field in (
+        (BreedingEvent, "female_tag"),
+        (Vaccination, "animal_tag"),
+        (Treatment, "animal_tag"),
+        (Mortality, "animal_tag"),
+        (MovementLog, "animal_tag"),
+    ):
+        rows = model.objects.filter(**{tag_field: tag_number}).exclude(ranch_id=ranch_id)
+        record_removals(model, rows.values_list("pk", "ranch_id"))
+        rows.update(ranch_id=ranch_id, updated_at=now)
+    RFIDScanLog.objects.filter(animal_tag=tag_number).update(ranch_id=ranch_id)
@@ -1,13 +1,46 @@
-from datetime import date
+import gzip
+import json
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+import tracemalloc
+import uuid
+import zlib
+from datetime import date, timedelta
+from decimal import Decimal
+from io import StringIO
+from unittest import mock, skipUnless
 
-from django.test import TestCase
+import brotli
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import OperationalError, connection, connections, models, router as db_router
+from django.db.backends.sqlite3.base import DatabaseWrapper
+from django.http import QueryDict
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.test import APIClient
 
 from apps.animals.models import Animal
 from apps.breeding.models import BreedingEvent
 from apps.health.models import Mortality, Treatment, Vaccination
-from apps.operations.models import HerdCount, MovementLog
+from apps.operations.models import HerdCount, MovementLog, RFIDScanLog
+from kris.api_urls import router
+from kris.filters import apply_filters, declared_filters
+from kris.middleware import MIN_COMPRESS_LENGTH
+from kris.renderers import packb, unpackb
 
-from .models import Ranch, Staff, User
+from . import edge, jobs, snapshots
+from .authentication import CachedTokenAuthentication, token_cache
+from .ids import uuid7, uuid7_ms
+from .models import Job, Ranch, RanchSnapshot, Staff, SyncQueue, User
+from .postgres import copy_insert
+from .routers import read_from_replica
+from .tenancy import scope_to_ranches
 
 
 class RecordingWithoutRFIDTests(TestCase):
@@ -108,3 +141,753 @@ class RecordingWithoutRFIDTests(TestCase):
 
         self.assertEqual(self.female.status, "dead")
         self.assertIsNotNone(mortality.age_at_death_months)
+
+
+class JobQueueTests(TestCase):
+    def setUp(self):
+        self.calls = []
+        self._registry = dict(jobs._registry)
+
+        @jobs.job("test.ok")
+        def ok(value=None):
+            self.calls.append(value)
+
+        @jobs.job("test.boom", max_attempts=2)
+        def boom():
+            raise RuntimeError("boom")
+
+        @jobs.job("test.periodic", schedule=timedelta(minutes=5))
+        def periodic():
+            self.calls.append("tick")
+
+    def tearDown(self):
+        jobs._registry.clear()
+        jobs._registry.update(self._registry)
+
+    def test_every_apps_jobs_are_registered(self):
+        self.assertLessEqual(
+            {
+                "core.purge_expired_tokens",
+                "core.refresh_snapshots",
+                "analytics.refresh_dashboard",
+                "animals.generate_photo_variants",
+                "breeding.refresh_calendar",
+            },
+            set(jobs.get_registry()),
+        )
+
+    def test_claimed_job_runs_once_and_records_timing(self):
+        queued = jobs.enqueue("test.ok", {"value": 7})
+
+        self.assertEqual(jobs.work(burst=True), 1)
+        self.assertEqual(jobs.work(burst=True), 0)
+
+        queued.refresh_from_db()
+        self.assertEqual(self.calls, [7])
+        self.assertEqual(queued.status, "succeeded")
+        self.assertEqual(queued.attempts, 1)
+        self.assertIsNotNone(queued.duration_ms)
+        self.assertEqual(jobs.job_metrics()["test.ok"]["succeeded"], 1)
+
+    def test_future_jobs_are_not_claimed(self):
+        jobs.enqueue("test.ok", run_at=timezone.now() + timedelta(hours=1))
+        self.assertIsNone(jobs.claim_next())
+
+    def test_failed_job_backs_off_then_gives_up(self):
+        queued = jobs.enqueue("test.boom")
+
+        jobs.run_job(jobs.claim_next())
+        queued.refresh_from_db()
+        self.assertEqual(queued.status, "queued")
+        self.assertGreater(queued.run_at, timezone.now())
+        self.assertIn("RuntimeError", queued.last_error)
+
+        Job.objects.filter(pk=queued.pk).update(run_at=timezone.now())
+        jobs.run_job(jobs.claim_next())
+        queued.refresh_from_db()
+        self.assertEqual(queued.status, "failed")
+        self.assertEqual(queued.attempts, 2)
+
+    def test_periodic_job_keeps_single_queued_copy(self):
+        jobs.ensure_periodic_jobs()
+        jobs.ensure_periodic_jobs()
+        self.assertEqual(Job.objects.filter(name="test.periodic", status="queued").count(), 1)
+
+        jobs.work(burst=True, names=["test.periodic"])
+        next_run = Job.objects.get(name="test.periodic", status="queued")
+        self.assertEqual(self.calls, ["tick"])
+        self.assertGreater(next_run.run_at, timezone.now() + timedelta(minutes=4))
+
+    def test_stale_running_jobs_are_requeued(self):
+        queued = jobs.enqueue("test.ok")
+        jobs.claim_next()
+        Job.objects.filter(pk=queued.pk).update(locked_at=timezone.now() - timedelta(hours=1))
+
+        self.assertEqual(jobs.requeue_stale(), 1)
+        self.assertIsNotNone(jobs.claim_next())
+
+    def test_stale_jobs_out_of_attempts_fail(self):
+        queued = jobs.enqueue("test.ok")
+        Job.objects.filter(pk=queued.pk).update(max_attempts=1)
+        jobs.claim_next()
+        Job.objects.filter(pk=queued.pk).update(locked_at=timezone.now() - timedelta(hours=1))
+
+        self.assertEqual(jobs.requeue_stale(), 0)
+        queued.refresh_from_db()
+        self.assertEqual(queued.status, "failed")
+        self.assertIsNotNone(queued.finished_at)
+        self.assertIsNone(jobs.claim_next())
+
+
+class CachedTokenAuthenticationTests(TestCase):
+    def setUp(self):
+        token_cache.clear()
+        self.user = User.objects.create_user(username="gate", password="pass12345")
+        self.token = Token.objects.create(user=self.user)
+        self.auth = CachedTokenAuthentication()
+
+    def test_repeat_lookups_skip_the_database(self):
+        self.auth.authenticate_credentials(self.token.key)
+        with self.assertNumQueries(0):
+            user, token = self.auth.authenticate_credentials(self.token.key)
+        self.assertEqual(user, self.user)
+        self.assertEqual(token.key, self.token.key)
+
+    def test_logout_invalidates_cached_token(self):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f"Token {self.token.key}")
+        self.assertEqual(client.post("/api/auth/logout/").status_code, 204)
+
+        with self.assertRaises(AuthenticationFailed):
+            self.auth.authenticate_credentials(self.token.key)
+
+    def test_deactivated_user_is_rejected_immediately(self):
+        self.auth.authenticate_credentials(self.token.key)
+        self.user.is_active = False
+        self.user.save()
+
+        with self.assertRaises(AuthenticationFailed):
+            self.auth.authenticate_credentials(self.token.key)
+
+    @override_settings(TOKEN_EXPIRY_DAYS=30)
+    def test_expired_tokens_are_rejected_and_purged(self):
+        Token.objects.filter(pk=self.token.pk).update(
+            created=timezone.now() - timedelta(days=31)
+        )
+        with self.assertRaises(AuthenticationFailed):
+            self.auth.authenticate_credentials(self.token.key)
+        self.assertFalse(Token.objects.filter(user=self.user).exists())
+
+
+class CompactWireFormatTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="device", password="pass12345")
+        Ranch.objects.create(name="Gate Ranch", owner=self.user)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.payload = {
+            "device_id": "gate-phone-1",
+            "operations": [
+                {
+                    "operation": "create",
+                    "table_name": "rfid_scan_logs",
+                    "record_data": {
+                        "rfid_code": f"RF-{i}",
+                        "gate_id": "G1",
+                        "scan_timestamp": "2025-02-05T06:30:00Z",
+                    },
+                    "timestamp": "2025-02-05T06:30:00Z",
+                }
+                for i in range(20)
+            ],
+        }
+
+    def test_gzipped_msgpack_sync_upload(self):
+        response = self.client.generic(
+            "POST",
+            "/api/sync/",
+            gzip.compress(packb(self.payload)),
+            content_type="application/msgpack",
+            HTTP_CONTENT_ENCODING="gzip",
+            HTTP_ACCEPT="application/msgpack",
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "application/msgpack")
+        self.assertEqual(unpackb(response.content), {"synced": 20, "failed": 0, "errors": []})
+        self.assertEqual(RFIDScanLog.objects.count(), 20)
+
+    def test_brotli_request_bodies_are_refused(self):
+        body = brotli.compress(json.dumps(self.payload).encode())
+        response = self.client.generic(
+            "POST", "/api/sync/", body, content_type="application/json", HTTP_CONTENT_ENCODING="br"
+        )
+        self.assertEqual(response.status_code, 415)
+        self.assertEqual(response["Accept-Encoding"], "gzip")
+        self.assertFalse(RFIDScanLog.objects.exists())
+
+    def _peak_memory_of_upload(self, body, encoding):
+        # Middleware reads its settings once, so this needs a fresh client.
+        client = APIClient()
+        client.force_authenticate(self.user)
+        tracemalloc.start()
+        try:
+            response = client.generic(
+                "POST", "/api/sync/", body, content_type="application/json",
+                HTTP_CONTENT_ENCODING=encoding,
+            )
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+        return response, peak
+
+    @override_settings(MAX_DECOMPRESSED_REQUEST_SIZE=1024 * 1024)
+    def test_compression_bombs_stay_within_the_limit(self):
+        limit = 1024 * 1024
+        inflated = 64 * 1024 * 1024
+        compressor = zlib.compressobj(9, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        gzip_bomb = b"".join(compressor.compress(bytes(limit)) for _ in range(64)) + compressor.flush()
+        brotli_bomb = brotli.compress(bytes(inflated), quality=5)
+        self.assertLess(len(brotli_bomb), 1024)
+
+        response, peak = self._peak_memory_of_upload(gzip_bomb, "gzip")
+        self.assertEqual(response.status_code, 413)
+        self.assertLess(peak, 3 * limit)
+        response, peak = self._peak_memory_of_upload(brotli_bomb, "br")
+        self.assertEqual(response.status_code, 415)
+        self.assertLess(peak, 3 * limit)
+
+    def test_truncated_gzip_body_is_rejected(self):
+        response = self.client.generic(
+            "POST", "/api/sync/", gzip.compress(json.dumps(self.payload).encode())[:-12],
+            content_type="application/json", HTTP_CONTENT_ENCODING="gzip",
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def test_compressed_bodies_rejected_outside_device_endpoints(self):
+        response = self.client.generic(
+            "POST",
+            "/api/animals/",
+            gzip.compress(b"{}"),
+            content_type="application/json",
+            HTTP_CONTENT_ENCODING="gzip",
+        )
+        self.assertEqual(response.status_code, 415)
+
+    def test_responses_are_compressed_when_accepted(self):
+        self.client.post("/api/sync/", self.payload, format="json")
+
+        plain = self.client.get("/api/rfid/scans/")
+        brotli = self.client.get("/api/rfid/scans/", HTTP_ACCEPT_ENCODING="gzip, br")
+        gzipped = self.client.get("/api/rfid/scans/", HTTP_ACCEPT_ENCODING="gzip")
+
+        self.assertFalse(plain.has_header("Content-Encoding"))
+        self.assertEqual(brotli["Content-Encoding"], "br")
+        self.assertEqual(gzipped["Content-Encoding"], "gzip")
+        self.assertEqual(gzip.decompress(gzipped.content), plain.content)
+        self.assertLess(len(brotli.content), len(plain.content))
+
+    def test_html_pages_are_not_compressed(self):
+        response = self.client.get("/admin/login/", HTTP_ACCEPT_ENCODING="gzip, br")
+        self.assertEqual(response.status_code, 200)
+        self.assertGreater(len(response.content), MIN_COMPRESS_LENGTH)
+        self.assertFalse(response.has_header("Content-Encoding"))
+
+
+def _sample_value(model_field, lookup):
+    if lookup == "window":
+        return "7d"
+    if model_field.is_relation:
+        model_field = model_field.target_field
+    if isinstance(model_field, models.DateTimeField):
+        value = "2024-01-01T00:00:00Z"
+    elif isinstance(model_field, models.DateField):
+        value = "2024-01-01"
+    elif isinstance(model_field, models.BooleanField):
+        value = "true"
+    elif isinstance(model_field, models.UUIDField):
+        value = str(uuid.uuid4())
+    else:
+        value = "X1"
+    return f"{value},{value}" if lookup == "in" else value
+
+
+class QueryParamFilterTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="manager", password="pass12345")
+        ranch = Ranch.objects.create(name="Kisombwa Ranch", owner=cls.user)
+        today = timezone.localdate()
+        for tag, status, given in [
+            ("COW1", "active", today - timedelta(days=2)),
+            ("COW2", "sold", today - timedelta(days=20)),
+            ("COW3", "dead", date(2023, 6, 1)),
+        ]:
+            animal = Animal.objects.create(
+                tag_number=tag, ranch=ranch, species="cattle", sex="female", source="born",
+                status=status,
+            )
+            Vaccination.objects.create(
+                animal_tag=animal, vaccine_type="FMD", date_administered=given
+            )
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def _tags(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200, response.content)
+        return sorted(row.get("tag_number") or row["animal_tag"] for row in response.json())
+
+    def test_range_set_and_window_filters(self):
+        self.assertEqual(self._tags("/api/animals/?status__in=sold,dead"), ["COW2", "COW3"])
+        self.assertEqual(
+            self._tags("/api/vaccinations/?date_administered__gte=2023-01-01"
+                       "&date_administered__lte=2023-12-31"),
+            ["COW3"],
+        )
+        self.assertEqual(self._tags("/api/vaccinations/?date_administered__window=1w"), ["COW1"])
+        self.assertEqual(self._tags("/api/animals/?status=active"), ["COW1"])
+
+    def test_range_filters_keep_the_list_ordering(self):
+        today = timezone.localdate()
+        for tag, due in [("COW1", 10), ("COW2", 20), ("COW3", 30)]:
+            Vaccination.objects.filter(animal_tag=tag).update(
+                next_due_date=today + timedelta(days=due)
+            )
+        response = self.client.get(f"/api/vaccinations/?next_due_date__gte={today}")
+        # Newest administered first, as without the filter; not by due date.
+        self.assertEqual([row["animal_tag"] for row in response.json()], ["COW1", "COW2", "COW3"])
+
+    def test_invalid_filters_are_rejected(self):
+        for url in [
+            "/api/vaccinations/?date_administered__gte=yesterday",
+            "/api/vaccinations/?date_administered__window=7y",
+            "/api/animals/?status__gte=a",
+            "/api/movements/?movement_date__range=2024-01-01",
+        ]:
+            with self.subTest(url):
+                self.assertEqual(self.client.get(url).status_code, 400)
+
+    def test_every_declared_filter_is_served_by_an_index(self):
+        for prefix, viewset, _ in router.registry:
+            queryset = viewset.queryset
+            table = queryset.model._meta.db_table
+            for field, lookups in declared_filters(viewset.filter_fields).items():
+                model_field = queryset.model._meta.get_field(field)
+                for lookup in lookups:
+                    param = field if lookup == "exact" else f"{field}__{lookup}"
+                    params = QueryDict(mutable=True)
+                    params[param] = _sample_value(model_field, lookup)
+                    # As the viewsets run it: scoped to a ranch, in list order.
+                    filtered = apply_filters(queryset, viewset.filter_fields, params)
+                    plan = scope_to_ranches(filtered, {uuid.uuid4()}).explain()
+                    with self.subTest(f"{prefix}?{param}"):
+                        self.assertRegex(plan, rf"SEARCH {table} USING (COVERING )?INDEX", plan)
+
+
+class BootstrapSnapshotTests(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        user = User.objects.create_user(username="device", password="pass12345")
+        self.ranch = Ranch.objects.create(name="Kisombwa Ranch", owner=user)
+        other = Ranch.objects.create(name="Other Ranch", owner=user)
+        self.cow = Animal.objects.create(
+            tag_number="COW001", ranch=self.ranch, species="cattle", sex="female", source="born"
+        )
+        Animal.objects.create(
+            tag_number="OTHER1", ranch=other, species="cattle", sex="female", source="born"
+        )
+        today = timezone.localdate()
+        Vaccination.objects.create(
+            animal_tag=self.cow, vaccine_type="FMD", date_administered=today, cost=Decimal("12.50")
+        )
+        Vaccination.objects.create(
+            animal_tag=self.cow, vaccine_type="CBPP", date_administered=today - timedelta(days=900)
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user)
+
+    def _open(self, content):
+        path = os.path.join(self.media_root, "downloaded.sqlite3")
+        with open(path, "wb") as handle:
+            handle.write(gzip.decompress(content))
+        database = sqlite3.connect(path)
+        self.addCleanup(database.close)
+        return database
+
+    def test_snapshot_holds_ranch_rows_and_revalidates_by_etag(self):
+        response = self.client.get(f"/api/sync/snapshot/?ranch={self.ranch.pk}")
+        self.assertEqual(response.status_code, 200)
+        database = self._open(b"".join(response.streaming_content))
+
+        self.assertEqual(database.execute("SELECT tag_number FROM animals").fetchall(), [("COW001",)])
+        self.assertEqual(
+            database.execute("SELECT vaccine_type, cost FROM vaccinations").fetchall(),
+            [("FMD", "12.50")],
+        )
+        meta = dict(database.execute("SELECT key, value FROM meta"))
+        self.assertEqual(meta["cursor"], response["X-Snapshot-Cursor"])
+
+        cached = self.client.get(
+            f"/api/sync/snapshot/?ranch={self.ranch.pk}", HTTP_IF_NONE_MATCH=response["ETag"]
+        )
+        self.assertEqual(cached.status_code, 304)
+        self.assertEqual(self.client.get("/api/sync/snapshot/?ranch=nope").status_code, 400)
+
+    def test_refresh_job_rebuilds_only_changed_ranches_and_deltas_follow(self):
+        self.assertEqual(snapshots.refresh_snapshots(), 2)
+        self.assertEqual(snapshots.refresh_snapshots(), 0)
+        cursor = snapshots.latest_snapshot(self.ranch).cursor
+
+        Treatment.objects.create(animal_tag=self.cow, treatment_date=timezone.localdate())
+        self.assertEqual(snapshots.refresh_snapshots(), 1)
+        self.assertEqual(RanchSnapshot.objects.filter(ranch=self.ranch).count(), 2)
+
+        response = self.client.get(
+            "/api/sync/changes/", {"ranch": str(self.ranch.pk), "cursor": cursor.isoformat()}
+        )
+        self.assertEqual(response.status_code, 200)
+        treatments = response.json()["changes"]["treatments"]
+        self.assertEqual([row["animal_tag_id"] for row in treatments], ["COW001"])
+
+        with mock.patch.object(snapshots, "MAX_CHANGES", 0):
+            response = self.client.get(
+                "/api/sync/changes/", {"ranch": str(self.ranch.pk), "cursor": cursor.isoformat()}
+            )
+        self.assertEqual(response.status_code, 409)
+        self.assertTrue(response.json()["reset"])
+
+    def _changes(self, ranch, cursor):
+        response = self.client.get(
+            "/api/sync/changes/", {"ranch": str(ranch.pk), "cursor": cursor.isoformat()}
+        )
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_edits_and_deletes_of_event_rows_reach_devices(self):
+        snapshots.refresh_snapshots()
+        cursor = snapshots.latest_snapshot(self.ranch).cursor
+        vaccination = Vaccination.objects.get(vaccine_type="FMD")
+        vaccination.cost = Decimal("15.00")
+        vaccination.save()
+
+        self.assertTrue(snapshots.has_changes(self.ranch.pk, cursor))
+        rows = self._changes(self.ranch, cursor)["changes"]["vaccinations"]
+        self.assertEqual([row["cost"] for row in rows], ["15.00"])
+
+        deleted_id = str(vaccination.pk)
+        vaccination.delete()
+        body = self._changes(self.ranch, cursor)
+        self.assertNotIn("vaccinations", body["changes"])
+        self.assertEqual(body["deleted"], {"vaccinations": [deleted_id]})
+
+    def test_animals_moving_ranch_leave_the_old_ranchs_devices(self):
+        snapshots.refresh_snapshots()
+        cursor = snapshots.latest_snapshot(self.ranch).cursor
+        other = Ranch.objects.get(name="Other Ranch")
+        self.cow.ranch = other
+        self.cow.save()
+
+        self.assertTrue(snapshots.has_changes(self.ranch.pk, cursor))
+        old = self._changes(self.ranch, cursor)
+        self.assertEqual(old["changes"], {})
+        self.assertEqual(old["deleted"]["animals"], ["COW001"])
+        self.assertEqual(
+            sorted(old["deleted"]["vaccinations"]),
+            sorted(str(pk) for pk in Vaccination.objects.values_list("pk", flat=True)),
+        )
+        new = self._changes(other, cursor)
+        # OTHER1 was created within the cursor overlap, so it is resent too.
+        self.assertIn("COW001", [row["tag_number"] for row in new["changes"]["animals"]])
+        self.assertEqual([row["vaccine_type"] for row in new["changes"]["vaccinations"]], ["FMD"])
+        self.assertEqual(new["deleted"], {})
+
+
+class RanchTenancyTests(TestCase):
+    def setUp(self):
+        self.owner = User.objects.create_user(username="owner", password="pass12345")
+        neighbour = User.objects.create_user(username="neighbour", password="pass12345")
+        self.ranch = Ranch.objects.create(name="Kisombwa Ranch", owner=self.owner)
+        self.other = Ranch.objects.create(name="Kapiri Ranch", owner=neighbour)
+        self.cow = Animal.objects.create(
+            tag_number="COW001", ranch=self.ranch, species="cattle", sex="female", source="born"
+        )
+        self.stray = Animal.objects.create(
+            tag_number="KAP001", ranch=self.other, species="cattle", sex="female", source="born"
+        )
+        for animal in (self.cow, self.stray):
+            Vaccination.objects.create(
+                animal_tag=animal, vaccine_type="FMD", date_administered=date(2024, 3, 1)
+            )
+        self.client = APIClient()
+        self.client.force_authenticate(self.owner)
+
+    def test_event_rows_carry_their_animals_ranch(self):
+        self.assertEqual(
+            set(Vaccination.objects.values_list("animal_tag", "ranch")),
+            {("COW001", self.ranch.pk), ("KAP001", self.other.pk)},
+        )
+
+    def test_lists_and_details_are_limited_to_own_ranches(self):
+        rows = self.client.get("/api/vaccinations/").json()
+        self.assertEqual([row["animal_tag"] for row in rows], ["COW001"])
+        self.assertEqual(self.client.get("/api/animals/KAP001/").status_code, 404)
+        staff_user = User.objects.create_user(username="vet", password="pass12345")
+        Staff.objects.create(ranch=self.other, user=staff_user, name="Vet", role="vet")
+        self.client.force_authenticate(staff_user)
+        rows = self.client.get("/api/vaccinations/").json()
+        self.assertEqual([row["animal_tag"] for row in rows], ["KAP001"])
+
+    def test_writes_to_another_ranch_are_rejected(self):
+        response = self.client.post(
+            "/api/treatments/",
+            {"animal_tag": "KAP001", "treatment_date": "2024-03-02", "diagnosis": "Bloat"},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 403)
+        self.assertFalse(Treatment.objects.exists())
+
+    def test_rows_without_a_ranch_are_hidden_from_tenants(self):
+        RFIDScanLog.objects.create(rfid_code="RF-LOST", scan_timestamp=timezone.now())
+        self.assertEqual(self.client.get("/api/rfid/scans/").json(), [])
+        admin = User.objects.create_user(username="boss", password="pass12345", role="admin")
+        self.client.force_authenticate(admin)
+        rows = self.client.get("/api/rfid/scans/").json()
+        self.assertEqual([row["rfid_code"] for row in rows], ["RF-LOST"])
+
+    def test_unknown_tags_are_recorded_for_the_devices_ranch(self):
+        scan = {"rfid_code": "RF-NEW", "gate_id": "G1", "scan_timestamp": "2025-02-05T06:30:00Z"}
+        operation = {"operation": "create", "table_name": "rfid_scan_logs",
+                     "record_data": scan, "timestamp": "2025-02-05T06:30:00Z"}
+        upload = {"device_id": "gate-phone-1", "operations": [operation]}
+        self.assertEqual(self.client.post("/api/sync/", upload, format="json").json()["synced"], 1)
+        self.assertEqual(RFIDScanLog.objects.get().ranch_id, self.ranch.pk)
+
+        # With two ranches the device has to say which one it is on.
+        Staff.objects.create(ranch=self.other, user=self.owner, name="Owner", role="manager")
+        result = self.client.post("/api/sync/", upload, format="json").json()
+        self.assertEqual((result["synced"], result["failed"]), (0, 1))
+        upload["ranch"] = str(self.other.pk)
+        self.assertEqual(self.client.post("/api/sync/", upload, format="json").json()["synced"], 1)
+        self.assertEqual(
+            sorted(RFIDScanLog.objects.values_list("ranch__name", flat=True)),
+            ["Kapiri Ranch", "Kisombwa Ranch"],
+        )
+
+    def test_events_follow_an_animal_to_its_new_ranch(self):
+        cow = Animal.objects.get(pk="COW001")
+        cow.ranch = self.other
+        cow.save()
+        self.assertEqual(Vaccination.objects.get(animal_tag="COW001").ranch_id, self.other.pk)
+        self.assertEqual(self.client.get("/api/vaccinations/").json(), [])
+
+
+@override_settings(READ_REPLICA="replica")
+class ReadReplicaRoutingTests(TestCase):
+    # "replica" is a separate, migrated SQLite file registered for this class
+    # only (the runner sets up declared databases before it exists, so it is
+    # added to ``databases`` here). Rows are written to each database
+    # directly with different breeds, so every response shows where it read.
+    @classmethod
+    def setUpClass(cls):
+        cls.databases = {"default", "replica"}
+        directory = tempfile.mkdtemp()
+        cls.addClassCleanup(shutil.rmtree, directory, ignore_errors=True)
+        name = os.path.join(directory, "replica.sqlite3")
+        default = connections.settings["default"]
+        connections.settings["replica"] = {
+            **default, "NAME": name, "TEST": {**default["TEST"], "NAME": name, "MIRROR": None}
+        }
+        cls.addClassCleanup(connections.settings.pop, "replica")
+        cls.addClassCleanup(connections.__delitem__, "replica")
+        cls.addClassCleanup(connections["replica"].close)
+        call_command("migrate", database="replica", verbosity=0)
+        super().setUpClass()
+
+    def setUp(self):
+        self.user = User.objects.create_user(username="manager", password="pass12345")
+        ranch = Ranch.objects.create(name="Kisombwa Ranch", owner=self.user)
+        Animal.objects.create(
+            tag_number="COW001", ranch=ranch, species="cattle", sex="female", source="born",
+            breed="Boran",
+        )
+        User.objects.using("replica").bulk_create([User(pk=self.user.pk, username="manager")])
+        Ranch.objects.using("replica").bulk_create(
+            [Ranch(pk=ranch.pk, name=ranch.name, owner_id=self.user.pk)]
+        )
+        Animal.objects.using("replica").bulk_create(
+            [
+                Animal(
+                    tag_number="COW001", ranch_id=ranch.pk, species="cattle", sex="female",
+                    source="born", breed="Ankole",
+                )
+            ]
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_safe_viewset_reads_use_the_replica_and_writes_the_primary(self):
+        self.assertEqual(self.client.get("/api/animals/COW001/").json()["breed"], "Ankole")
+        self.assertEqual([row["breed"] for row in self.client.get("/api/animals/").json()], ["Ankole"])
+
+        response = self.client.patch("/api/animals/COW001/", {"notes": "Lame"}, format="json")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["breed"], "Boran")
+        self.assertEqual(Animal.objects.get(pk="COW001").notes, "Lame")
+        self.assertEqual(Animal.objects.using("replica").get(pk="COW001").notes, "")
+
+    def test_reads_after_a_write_stay_on_the_primary(self):
+        self.assertEqual(db_router.db_for_read(Animal), "default")
+        with read_from_replica():
+            self.assertEqual(db_router.db_for_read(Animal), "replica")
+            Vaccination.objects.create(
+                animal_tag_id="COW001", vaccine_type="FMD", date_administered=date(2024, 1, 1)
+            )
+            self.assertEqual(db_router.db_for_read(Animal), "default")
+            self.assertEqual(Vaccination.objects.count(), 1)
+        with read_from_replica():
+            self.assertEqual(db_router.db_for_read(Animal), "replica")
+        with override_settings(READ_REPLICA=None), read_from_replica():
+            self.assertEqual(db_router.db_for_read(Animal), "default")
+
+    def test_cache_entries_stay_on_the_primary_without_pinning(self):
+        with read_from_replica():
+            cache.set("routing-test", 1)
+            self.assertEqual(cache.get("routing-test"), 1)
+            self.assertEqual(db_router.db_for_read(Animal), "replica")
+
+
+@override_settings(SQLITE_EDGE={"ENABLED": True, "WRITE_LOCK_TIMEOUT": 0.05})
+class SQLiteEdgeProfileTests(TestCase):
+    def test_new_connections_get_wal_and_pragmas(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+        database = DatabaseWrapper(
+            {**connection.settings_dict, "NAME": os.path.join(directory, "edge.sqlite3")},
+            alias="edge",
+        )
+        self.addCleanup(database.close)
+        with database.cursor() as cursor:
+            pragmas = {
+                name: cursor.execute(f"PRAGMA {name}").fetchone()[0]
+                for name in ("journal_mode", "synchronous", "busy_timeout", "temp_store")
+            }
+        self.assertEqual(
+            pragmas, {"journal_mode": "wal", "synchronous": 1, "busy_timeout": 10000, "temp_store": 2}
+        )
+
+    def test_writers_queue_behind_the_current_one(self):
+        outcome = []
+
+        def contender():
+            try:
+                with edge.single_writer():
+                    outcome.append("entered")
+            except OperationalError:
+                outcome.append("timed out")
+
+        with edge.single_writer():
+            with edge.single_writer():  # re-entrant within a thread
+                thread = threading.Thread(target=contender)
+                thread.start()
+                thread.join()
+        self.assertEqual(outcome, ["timed out"])
+
+    def test_sync_upload_commits_once_and_isolates_failures(self):
+        user = User.objects.create_user(username="device", password="pass12345")
+        Ranch.objects.create(name="Gate Ranch", owner=user)
+        client = APIClient()
+        client.force_authenticate(user)
+        scan = {"rfid_code": "RF-1", "gate_id": "G1", "scan_timestamp": "2025-02-05T06:30:00Z"}
+        response = client.post(
+            "/api/sync/",
+            {
+                "device_id": "gate-phone-1",
+                "operations": [
+                    {"operation": "create", "table_name": "rfid_scan_logs",
+                     "record_data": scan, "timestamp": "2025-02-05T06:30:00Z"},
+                    {"operation": "delete", "table_name": "rfid_scan_logs",
+                     "record_data": {"id": str(uuid.uuid4())}, "timestamp": "2025-02-05T06:31:00Z"},
+                ],
+            },
+            format="json",
+        )
+        self.assertEqual(response.json()["synced"], 1)
+        self.assertEqual(response.json()["failed"], 1)
+        self.assertEqual(RFIDScanLog.objects.count(), 1)
+        self.assertEqual(
+            sorted(SyncQueue.objects.values_list("synced", flat=True)), [False, True]
+        )
+
+
+class PostgresProfileTests(TestCase):
+    def test_copy_insert_round_trips_awkward_values(self):
+        gates = ["G1", "tab\there", "line\nbreak", "back\\slash", ""]
+        scans = [
+            RFIDScanLog(
+                rfid_code=f"RF-{i}", gate_id=gate, scan_timestamp=timezone.now(),
+                signal_strength=None if i % 2 else -40,
+            )
+            for i, gate in enumerate(gates)
+        ]
+        copy_insert(RFIDScanLog, scans)
+        stored = dict(RFIDScanLog.objects.values_list("rfid_code", "gate_id"))
+        self.assertEqual(stored, {f"RF-{i}": gate for i, gate in enumerate(gates)})
+        self.assertEqual(RFIDScanLog.objects.filter(signal_strength__isnull=True).count(), 2)
+        self.assertTrue(all(scan.created_at for scan in RFIDScanLog.objects.all()))
+
+    def test_partial_indexes_on_active_animals_and_unsynced_rows(self):
+        with connection.cursor() as cursor:
+            self.assertIn(
+                "sync_queue_unsynced_idx",
+                connection.introspection.get_constraints(cursor, "sync_queue"),
+            )
+            self.assertIn(
+                "animals_active_ranch_idx",
+                connection.introspection.get_constraints(cursor, "animals"),
+            )
+
+    @skipUnless(connection.vendor == "postgresql", "BRIN indexes are PostgreSQL only")
+    def test_brin_indexes_on_append_only_logs(self):
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT indexname FROM pg_indexes WHERE indexdef LIKE '%USING brin%'")
+            names = {row[0] for row in cursor.fetchall()}
+        self.assertEqual(
+            names,
+            {
+                "rfid_scan_logs_created_brin",
+                "movement_logs_created_brin",
+                "sync_queue_created_brin",
+            },
+        )
+
+
+class TimeOrderedKeyTests(TestCase):
+    def test_uuid7_keys_are_version_7_and_strictly_increasing(self):
+        keys = [uuid7() for _ in range(5000)]
+        self.assertEqual(keys, sorted(keys))
+        self.assertEqual(len(set(keys)), len(keys))
+        self.assertEqual({key.version for key in keys}, {7})
+        self.assertEqual({key.variant for key in keys}, {uuid.RFC_4122})
+        now_ms = int(timezone.now().timestamp() * 1000)
+        self.assertLess(abs(uuid7_ms(keys[-1]) - now_ms), 5000)
+
+    def test_event_rows_get_time_ordered_keys(self):
+        first = RFIDScanLog.objects.create(rfid_code="RF-1", scan_timestamp=timezone.now())
+        second = RFIDScanLog.objects.create(rfid_code="RF-2", scan_timestamp=timezone.now())
+        self.assertEqual(first.pk.version, 7)
+        self.assertLess(first.pk, second.pk)
+
+    def test_rekey_replaces_random_keys_from_created_at(self):
+        old = RFIDScanLog.objects.create(id=uuid.uuid4(), rfid_code="RF-OLD", scan_timestamp=timezone.now())
+        call_command("rekey_event_ids", "--table", "rfid_scan_logs", stdout=StringIO())
+        rekeyed = RFIDScanLog.objects.get(rfid_code="RF-OLD")
+        self.assertEqual(rekeyed.pk.version, 7)
+        self.assertEqual(uuid7_ms(rekeyed.pk), int(old.created_at.timestamp() * 1000))
+        self.assertFalse(RFIDScanLog.objects.filter(pk=old.pk).exists())
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.9 on 2026-10-19 15:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('health', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='vaccination',
+            index=models.Index(fields=['vaccine_type', '-date_administered'], name='vaccination_vaccine_87a695_idx'),
+        ),
+    ]
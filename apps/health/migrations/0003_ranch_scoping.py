@@ -0,0 +1,53 @@
+# Generated by Django 4.2.9 on 2026-10-19 17:10
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def copy_ranch(apps, schema_editor):
+    Animal = apps.get_model('animals', 'Animal')
+    ranch = models.Subquery(
+        Animal.objects.filter(pk=models.OuterRef('animal_tag')).values('ranch')[:1]
+    )
+    for name in ('Vaccination', 'Treatment', 'Mortality'):
+        apps.get_model('health', name).objects.update(ranch=ranch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_ranchsnapshot'),
+        ('animals', '0006_animal_animals_ranch_i_b5fddf_idx'),
+        ('health', '0002_vaccination_vaccination_vaccine_87a695_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='mortality',
+            name='ranch',
+            field=models.ForeignKey(editable=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='mortalities', to='core.ranch'),
+        ),
+        migrations.AddField(
+            model_name='treatment',
+            name='ranch',
+            field=models.ForeignKey(editable=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='treatments', to='core.ranch'),
+        ),
+        migrations.AddField(
+            model_name='vaccination',
+            name='ranch',
+            field=models.ForeignKey(editable=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='vaccinations', to='core.ranch'),
+        ),
+        migrations.RunPython(copy_ranch, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='mortality',
+            index=models.Index(fields=['ranch', '-death_date'], name='mortality_ranch_i_4f4686_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='treatment',
+            index=models.Index(fields=['ranch', '-treatment_date'], name='treatments_ranch_i_8264b3_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='vaccination',
+            index=models.Index(fields=['ranch', '-date_administered'], name='vaccination_ranch_i_f65824_idx'),
+        ),
+    ]
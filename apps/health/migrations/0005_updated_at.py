@@ -0,0 +1,39 @@
+# Generated by Django 4.2.9 on 2026-10-19 23:20
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+def copy_created_at(apps, schema_editor):
+    # Existing rows have not changed since they were recorded.
+    for name in ('Vaccination', 'Treatment', 'Mortality'):
+        apps.get_model('health', name).objects.update(updated_at=models.F('created_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('health', '0004_uuid7_keys'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='mortality',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='treatment',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='vaccination',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.RunPython(copy_created_at, migrations.RunPython.noop),
+    ]
@@ -1,11 +1,12 @@
-import uuid
 from django.db import models
 from apps.animals.models import Animal
-from apps.core.models import User, Staff
+from apps.core.ids import uuid7
+from apps.core.models import Ranch, User, Staff
 
 class Vaccination(models.Model):
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
     animal_tag = models.ForeignKey(Animal, on_delete=models.CASCADE, to_field='tag_number', related_name='vaccinations')
+    ranch = models.ForeignKey(Ranch, on_delete=models.CASCADE, null=True, editable=False, related_name='vaccinations')  # copied from animal_tag
     vaccine_type = models.CharField(max_length=100)
     disease_targeted = models.CharField(max_length=100, blank=True)
     date_administered = models.DateField(db_index=True)
@@ -17,17 +18,25 @@ class Vaccination(models.Model):
     notes = models.TextField(blank=True)
     recorded_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, related_name='vaccination_records')
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
         db_table = 'vaccinations'
         ordering = ['-date_administered']
         indexes = [
             models.Index(fields=['animal_tag', '-date_administered']),
+            models.Index(fields=['vaccine_type', '-date_administered']),
+            models.Index(fields=['ranch', '-date_administered']),
         ]
+    
+    def save(self, *args, **kwargs):
+        self.ranch_id = self.animal_tag.ranch_id
+        super().save(*args, **kwargs)
 
 class Treatment(models.Model):
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
     animal_tag = models.ForeignKey(Animal, on_delete=models.CASCADE, to_field='tag_number', related_name='treatments')
+    ranch = models.ForeignKey(Ranch, on_delete=models.CASCADE, null=True, editable=False, related_name='treatments')  # copied from animal_tag
     diagnosis = models.CharField(max_length=200, blank=True)
     symptoms = models.TextField(blank=True)
     medication_given = models.CharField(max_length=200, blank=True)
@@ -40,17 +49,24 @@ class Treatment(models.Model):
     notes = models.TextField(blank=True)
     recorded_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, related_name='treatment_records')
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
         db_table = 'treatments'
         ordering = ['-treatment_date']
         indexes = [
             models.Index(fields=['animal_tag', '-treatment_date']),
+            models.Index(fields=['ranch', '-treatment_date']),
         ]
+    
+    def save(self, *args, **kwargs):
+        self.ranch_id = self.animal_tag.ranch_id
+        super().save(*args, **kwargs)
 
 class Mortality(models.Model):
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
     animal_tag = models.ForeignKey(Animal, on_delete=models.CASCADE, to_field='tag_number', related_name='mortality_record')
+    ranch = models.ForeignKey(Ranch, on_delete=models.CASCADE, null=True, editable=False, related_name='mortalities')  # copied from animal_tag
     death_date = models.DateField(db_index=True)
     age_at_death_months = models.IntegerField(null=True, blank=True)
     cause = models.CharField(max_length=200, blank=True)
@@ -60,10 +76,14 @@ class Mortality(models.Model):
     notes = models.TextField(blank=True)
     recorded_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, related_name='mortality_records')
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
         db_table = 'mortality'
         ordering = ['-death_date']
+        indexes = [
+            models.Index(fields=['ranch', '-death_date']),
+        ]
     
     def save(self, *args, **kwargs):
         # Auto-calculate age at death
@@ -76,4 +96,5 @@ class Mortality(models.Model):
         self.animal_tag.status = 'dead'
         self.animal_tag.save()
         
+        self.ranch_id = self.animal_tag.ranch_id
         super().save(*args, **kwargs)
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.9 on 2026-10-19 15:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('operations', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='herdcount',
+            index=models.Index(fields=['species', '-count_date'], name='herd_counts_species_cdbf14_idx'),
+        ),
+    ]
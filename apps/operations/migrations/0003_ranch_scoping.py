@@ -0,0 +1,46 @@
+# Generated by Django 4.2.9 on 2026-10-19 17:10
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def copy_ranch(apps, schema_editor):
+    Animal = apps.get_model('animals', 'Animal')
+    ranch = models.Subquery(
+        Animal.objects.filter(pk=models.OuterRef('animal_tag')).values('ranch')[:1]
+    )
+    for name in ('MovementLog', 'RFIDScanLog'):
+        apps.get_model('operations', name).objects.filter(animal_tag__isnull=False).update(
+            ranch=ranch
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_ranchsnapshot'),
+        ('animals', '0006_animal_animals_ranch_i_b5fddf_idx'),
+        ('operations', '0002_herdcount_herd_counts_species_cdbf14_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='movementlog',
+            name='ranch',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='movements', to='core.ranch'),
+        ),
+        migrations.AddField(
+            model_name='rfidscanlog',
+            name='ranch',
+            field=models.ForeignKey(editable=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='rfid_scans', to='core.ranch'),
+        ),
+        migrations.RunPython(copy_ranch, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='movementlog',
+            index=models.Index(fields=['ranch', '-movement_date'], name='movement_lo_ranch_i_35cb75_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='rfidscanlog',
+            index=models.Index(fields=['ranch', '-scan_timestamp'], name='rfid_scan_l_ranch_i_76d95c_idx'),
+        ),
+    ]
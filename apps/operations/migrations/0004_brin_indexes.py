@@ -0,0 +1,20 @@
+# Generated by Django 4.2.9 on 2026-10-19 20:05
+
+from django.db import migrations
+
+from apps.core.postgres import brin_indexes
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('operations', '0003_ranch_scoping'),
+    ]
+
+    operations = [
+        brin_indexes({
+            'rfid_scan_logs_scan_ts_brin': ('rfid_scan_logs', 'scan_timestamp'),
+            'rfid_scan_logs_created_brin': ('rfid_scan_logs', 'created_at'),
+            'movement_logs_created_brin': ('movement_logs', 'created_at'),
+        }),
+    ]
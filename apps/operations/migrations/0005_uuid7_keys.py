@@ -0,0 +1,29 @@
+# Generated by Django 4.2.9 on 2026-10-19 21:15
+
+import apps.core.ids
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('operations', '0004_brin_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='herdcount',
+            name='id',
+            field=models.UUIDField(default=apps.core.ids.uuid7, editable=False, primary_key=True, serialize=False),
+        ),
+        migrations.AlterField(
+            model_name='movementlog',
+            name='id',
+            field=models.UUIDField(default=apps.core.ids.uuid7, editable=False, primary_key=True, serialize=False),
+        ),
+        migrations.AlterField(
+            model_name='rfidscanlog',
+            name='id',
+            field=models.UUIDField(default=apps.core.ids.uuid7, editable=False, primary_key=True, serialize=False),
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 4.2.9 on 2026-10-19 22:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('animals', '0007_animals_active_ranch_idx'),
+        ('operations', '0005_uuid7_keys'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='rfidscanlog',
+            index=models.Index(fields=['animal_tag', '-scan_timestamp'], name='rfid_scan_l_animal__969c27_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='movementlog',
+            index=models.Index(fields=['animal_tag', '-movement_date'], name='movement_lo_animal__8fda0a_idx'),
+        ),
+    ]
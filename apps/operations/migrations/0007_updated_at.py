@@ -0,0 +1,33 @@
+# Generated by Django 4.2.9 on 2026-10-19 23:20
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+def copy_created_at(apps, schema_editor):
+    # Existing rows have not changed since they were recorded.
+    for name in ('HerdCount', 'MovementLog'):
+        apps.get_model('operations', name).objects.update(updated_at=models.F('created_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('operations', '0006_animal_timeline_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='herdcount',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='movementlog',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.RunPython(copy_created_at, migrations.RunPython.noop),
+    ]
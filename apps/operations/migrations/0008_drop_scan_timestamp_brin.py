@@ -0,0 +1,28 @@
+# Generated by Django 4.2.9 on 2026-10-19 23:20
+
+from django.db import migrations
+
+from apps.core.postgres import create_brin_indexes, drop_brin_indexes
+
+# scan_timestamp already has a B-tree (db_index=True); offline gates upload
+# late, so the column is not physically ordered enough for BRIN either.
+SCAN_TIMESTAMP_BRIN = {'rfid_scan_logs_scan_ts_brin': ('rfid_scan_logs', 'scan_timestamp')}
+
+
+def drop_scan_timestamp_brin(apps, schema_editor):
+    drop_brin_indexes(schema_editor, SCAN_TIMESTAMP_BRIN)
+
+
+def create_scan_timestamp_brin(apps, schema_editor):
+    create_brin_indexes(schema_editor, SCAN_TIMESTAMP_BRIN)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('operations', '0007_updated_at'),
+    ]
+
+    operations = [
+        migrations.RunPython(drop_scan_timestamp_brin, create_scan_timestamp_brin),
+    ]
@@ -1,10 +1,10 @@
-import uuid
 from django.db import models
+from apps.core.ids import uuid7
 from apps.core.models import Ranch, User, Staff
 from apps.animals.models import Animal
 
 class HerdCount(models.Model):
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
     ranch = models.ForeignKey(Ranch, on_delete=models.CASCADE, related_name='herd_counts')
     count_date = models.DateField(db_index=True)
     species = models.CharField(max_length=20)
@@ -16,12 +16,14 @@ class HerdCount(models.Model):
     counted_by = models.ForeignKey(Staff, on_delete=models.SET_NULL, null=True, blank=True, related_name='counts_performed')
     recorded_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, related_name='count_records')
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
         db_table = 'herd_counts'
         ordering = ['-count_date']
         indexes = [
             models.Index(fields=['ranch', '-count_date']),
+            models.Index(fields=['species', '-count_date']),
         ]
     
     def save(self, *args, **kwargs):
@@ -29,9 +31,10 @@ class HerdCount(models.Model):
         super().save(*args, **kwargs)
 
 class RFIDScanLog(models.Model):
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
     rfid_code = models.CharField(max_length=100, db_index=True)
     animal_tag = models.ForeignKey(Animal, on_delete=models.SET_NULL, to_field='tag_number', null=True, blank=True, related_name='rfid_scans')
+    ranch = models.ForeignKey(Ranch, on_delete=models.CASCADE, null=True, editable=False, related_name='rfid_scans')  # copied from animal_tag; null for unknown tags
     gate_id = models.CharField(max_length=50, blank=True)
     scan_timestamp = models.DateTimeField(db_index=True)
     direction = models.CharField(max_length=10, blank=True)  # in/out
@@ -43,11 +46,19 @@ class RFIDScanLog(models.Model):
         ordering = ['-scan_timestamp']
         indexes = [
             models.Index(fields=['gate_id', '-scan_timestamp']),
+            models.Index(fields=['ranch', '-scan_timestamp']),
+            models.Index(fields=['animal_tag', '-scan_timestamp']),
         ]
+    
+    def save(self, *args, **kwargs):
+        if self.animal_tag_id:
+            self.ranch_id = self.animal_tag.ranch_id
+        super().save(*args, **kwargs)
 
 class MovementLog(models.Model):
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
     animal_tag = models.ForeignKey(Animal, on_delete=models.CASCADE, to_field='tag_number', null=True, blank=True, related_name='movements')
+    ranch = models.ForeignKey(Ranch, on_delete=models.CASCADE, null=True, blank=True, related_name='movements')  # copied from animal_tag; set directly for group moves
     group_name = models.CharField(max_length=100, blank=True)
     from_zone = models.CharField(max_length=100, blank=True)
     to_zone = models.CharField(max_length=100)
@@ -56,7 +67,17 @@ class MovementLog(models.Model):
     moved_by = models.ForeignKey(Staff, on_delete=models.SET_NULL, null=True, blank=True, related_name='movements_performed')
     recorded_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, related_name='movement_records')
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
         db_table = 'movement_logs'
         ordering = ['-movement_date']
+        indexes = [
+            models.Index(fields=['ranch', '-movement_date']),
+            models.Index(fields=['animal_tag', '-movement_date']),
+        ]
+    
+    def save(self, *args, **kwargs):
+        if self.animal_tag_id:
+            self.ranch_id = self.animal_tag.ranch_id
+        super().save(*args, **kwargs)
@@ -1,3 +1,151 @@
-from django.test import TestCase
+import asyncio
+import gzip
+import json
+import time
+from datetime import date
+from unittest import mock
 
-# Create your tests here.
+from django.test import AsyncClient, TransactionTestCase
+from rest_framework.authtoken.models import Token
+
+from apps.animals.models import Animal
+from apps.core.models import Ranch, SyncQueue, User
+from kris import ingestion
+
+from .models import RFIDScanLog
+
+
+class AsyncIngestionTests(TransactionTestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="gate", password="pass12345")
+        self.ranch = Ranch.objects.create(name="Kisombwa Ranch", owner=self.user)
+        Animal.objects.create(
+            tag_number="BORAN001",
+            ranch=self.ranch,
+            species="cattle",
+            sex="female",
+            source="born",
+            date_of_birth=date(2022, 1, 1),
+            rfid_code="982000000000001",
+        )
+        token = Token.objects.create(user=self.user)
+        self.client = AsyncClient()
+        self.auth = {"Authorization": f"Token {token.key}"}
+
+    def _scans(self, count, offset=0):
+        return [
+            {
+                "rfid_code": "982000000000001" if i % 2 else f"UNKNOWN{i}",
+                "gate_id": "GATE-NORTH",
+                "scan_timestamp": "2025-02-05T06:30:00Z",
+                "direction": "in",
+            }
+            for i in range(offset, offset + count)
+        ]
+
+    async def _post(self, path, payload):
+        return await self.client.post(
+            path, json.dumps(payload), content_type="application/json", headers=self.auth
+        )
+
+    def test_concurrent_gate_uploads_are_batched(self):
+        async def run():
+            responses = await asyncio.gather(
+                *[
+                    self._post("/api/rfid/ingest/", {"scans": self._scans(5, i * 5)})
+                    for i in range(8)
+                ]
+            )
+            return [response.status_code for response in responses]
+
+        with mock.patch.object(
+            ingestion, "write_scan_batch", wraps=ingestion.write_scan_batch
+        ) as writer:
+            self.assertEqual(asyncio.run(run()), [201] * 8)
+
+        self.assertEqual(RFIDScanLog.objects.count(), 40)
+        self.assertEqual(RFIDScanLog.objects.filter(animal_tag="BORAN001").count(), 20)
+        self.assertEqual(RFIDScanLog.objects.filter(ranch=self.ranch).count(), 40)
+        self.assertLess(writer.call_count, 8)
+
+    def test_gzipped_scan_upload(self):
+        async def run():
+            return await self.client.post(
+                "/api/rfid/ingest/",
+                gzip.compress(json.dumps(self._scans(3)).encode()),
+                content_type="application/json",
+                headers={**self.auth, "Content-Encoding": "gzip"},
+            )
+
+        response = asyncio.run(run())
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json(), {"accepted": 3})
+
+    def test_invalid_and_unauthenticated_uploads_are_rejected(self):
+        async def run():
+            bad = await self._post("/api/rfid/ingest/", {"scans": [{"gate_id": "G1"}]})
+            anonymous = await AsyncClient().post(
+                "/api/rfid/ingest/", json.dumps(self._scans(1)), content_type="application/json"
+            )
+            return bad.status_code, anonymous.status_code
+
+        self.assertEqual(asyncio.run(run()), (400, 401))
+        self.assertFalse(RFIDScanLog.objects.exists())
+
+    def test_gates_of_several_ranches_name_their_ranch(self):
+        neighbour = User.objects.create_user(username="neighbour", password="pass12345")
+        other = Ranch.objects.create(name="Kapiri Ranch", owner=neighbour)
+        second = Ranch.objects.create(name="Mpongwe Ranch", owner=self.user)
+
+        async def run(payload):
+            return (await self._post("/api/rfid/ingest/", payload)).status_code
+
+        scans = self._scans(1)
+        self.assertEqual(asyncio.run(run({"scans": scans})), 400)
+        self.assertEqual(asyncio.run(run({"ranch": str(other.pk), "scans": scans})), 403)
+        self.assertEqual(asyncio.run(run({"ranch": str(second.pk), "scans": scans})), 201)
+        self.assertEqual(RFIDScanLog.objects.get().ranch_id, second.pk)
+
+    def test_full_queue_applies_backpressure(self):
+        def slow_write(rows):
+            time.sleep(0.2)
+            return len(rows)
+
+        async def run():
+            responses = await asyncio.gather(
+                *[self._post("/api/rfid/ingest/", {"scans": self._scans(1)}) for _ in range(6)]
+            )
+            return [response.status_code for response in responses]
+
+        config = {"QUEUE_SIZE": 1, "BATCH_SIZE": 1, "BATCH_WINDOW": 0, "ENQUEUE_TIMEOUT": 0.01}
+        with self.settings(ASYNC_INGESTION=config), mock.patch.object(
+            ingestion, "write_scan_batch", side_effect=slow_write
+        ):
+            statuses = asyncio.run(run())
+        self.assertIn(503, statuses)
+        self.assertIn(201, statuses)
+
+    def test_async_sync_matches_sync_endpoint(self):
+        payload = {
+            "device_id": "phone-1",
+            "operations": [
+                {
+                    "operation": "create",
+                    "table_name": "rfid_scan_logs",
+                    "record_data": self._scans(1)[0],
+                    "timestamp": "2025-02-05T06:30:00Z",
+                },
+                {
+                    "operation": "create",
+                    "table_name": "unknown_table",
+                    "record_data": {},
+                    "timestamp": "2025-02-05T06:30:00Z",
+                },
+            ],
+        }
+        response = asyncio.run(self._post("/api/sync/async/", payload))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["synced"], 1)
+        self.assertEqual(response.json()["failed"], 1)
+        self.assertEqual(SyncQueue.objects.filter(device_id="phone-1").count(), 2)
@@ -0,0 +1,79 @@
+"""Shared bootstrap for the scripts in ``benchmarks/``.
+
+Each script runs against a throwaway test database, never ``db.sqlite3``:
+
+    python -m benchmarks.bench_list_serialization
+"""
+
+import os
+import time
+from contextlib import contextmanager
+
+import django
+
+
+def setup_django(settings_module="kris.settings"):
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", settings_module)
+    django.setup()
+
+
+@contextmanager
+def test_database(verbosity=0, name=None):
+    """Create (and afterwards destroy) the test database.
+
+    Pass ``name`` to use an on-disk SQLite file instead of the shared
+    in-memory database, e.g. for multi-threaded write benchmarks.
+    """
+    from django.db import connection
+    from django.test.utils import setup_test_environment, teardown_test_environment
+
+    setup_test_environment()
+    if name is not None:
+        connection.settings_dict["TEST"]["NAME"] = name
+    old_name = connection.settings_dict["NAME"]
+    connection.creation.create_test_db(verbosity=verbosity, keepdb=False)
+    try:
+        yield connection
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=verbosity)
+        teardown_test_environment()
+
+
+def best_of(func, repeat=5):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def seed_ranch(name="Bench Ranch", animals=1000, owner=None):
+    """Create a ranch with ``animals`` head of cattle and return it."""
+    from datetime import date
+    from decimal import Decimal
+
+    from apps.animals.models import Animal
+    from apps.core.models import Ranch, User
+
+    owner = owner or User.objects.create_user(username=f"owner-{name}", password="bench12345")
+    ranch = Ranch.objects.create(name=name, owner=owner)
+    prefix = name.replace(" ", "")[:6].upper()
+    Animal.objects.bulk_create(
+        [
+            Animal(
+                tag_number=f"{prefix}{i:06d}",
+                ranch=ranch,
+                species="cattle",
+                breed="Boran" if i % 3 else "Ankole",
+                sex="female" if i % 2 else "male",
+                date_of_birth=date(2018 + i % 6, 1 + i % 12, 1),
+                source=("born", "imported", "purchased")[i % 3],
+                purchase_price=Decimal("950.00") if i % 3 == 2 else None,
+                notes="Bench animal",
+            )
+            for i in range(animals)
+        ],
+        batch_size=1000,
+    )
+    return ranch
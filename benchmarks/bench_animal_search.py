@@ -0,0 +1,35 @@
+"""Time typeahead queries against the search index and an icontains scan."""
+
+import argparse
+
+from benchmarks._setup import best_of, seed_ranch, setup_django, test_database
+
+QUERIES = ["BENCHR0421", "0421", "R04213", "ankole", "bench anmal", "BE"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--animals", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    setup_django()
+    from unittest import mock
+
+    from apps.animals import search
+
+    with test_database():
+        seed_ranch(animals=args.animals)
+        search.rebuild_index()  # bulk_create skips the signals
+
+        print(f"rows={args.animals}")
+        print(f"{'query':<14}{'index':>10}{'scan':>10}")
+        for query in QUERIES:
+            indexed = best_of(lambda: search.search_animals(query), args.repeat)
+            with mock.patch.object(search, "search_index_enabled", return_value=False):
+                scanned = best_of(lambda: search.search_animals(query), args.repeat)
+            print(f"{query:<14}{indexed * 1000:8.2f}ms{scanned * 1000:8.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
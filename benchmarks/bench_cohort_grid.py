@@ -0,0 +1,75 @@
+"""Compare a source x breed x birth-year grid via per-cell ORM queries and the columnar engine."""
+
+import argparse
+import itertools
+
+from benchmarks._setup import best_of, seed_ranch, setup_django, test_database
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--animals", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    setup_django()
+    from datetime import date
+
+    from apps.analytics import columnar
+    from apps.animals.models import Animal
+    from apps.breeding.models import BreedingEvent
+
+    with test_database():
+        ranch = seed_ranch(animals=args.animals)
+        BreedingEvent.objects.bulk_create(
+            [
+                BreedingEvent(
+                    female_tag_id=tag,
+                    ranch=ranch,
+                    service_date=date(2024, 1 + i % 12, 1),
+                    method="natural",
+                    pregnancy_confirmed="yes" if i % 3 else "no",
+                )
+                for i, tag in enumerate(
+                    Animal.objects.filter(sex="female").values_list("tag_number", flat=True)
+                )
+            ],
+            batch_size=1000,
+        )
+        dimensions = ["source", "breed", "birth_year"]
+
+        def orm():
+            cells = {}
+            sources = Animal.objects.values_list("source", flat=True).distinct()
+            breeds = Animal.objects.values_list("breed", flat=True).distinct()
+            years = {d.year for d in Animal.objects.dates("date_of_birth", "year")}
+            for source, breed, year in itertools.product(sources, breeds, years):
+                events = BreedingEvent.objects.filter(
+                    female_tag__source=source,
+                    female_tag__breed=breed,
+                    female_tag__date_of_birth__year=year,
+                )
+                cells[source, breed, year] = (
+                    events.count(),
+                    events.filter(pregnancy_confirmed="yes").count(),
+                )
+            return cells
+
+        frame = columnar.get_frame(ranch.pk)
+        load_s = best_of(lambda: columnar.get_frame(ranch.pk).refresh(force=True), args.repeat)
+        refresh_s = best_of(lambda: columnar.get_frame(ranch.pk), args.repeat)
+
+        def engine():
+            return columnar.cohort_grid([frame], dimensions, ["breeding_events", "conception_rate"])
+
+        orm_s = best_of(orm, args.repeat)
+        engine_s = best_of(engine, args.repeat)
+        print(f"animals={args.animals} cells={len(engine())}")
+        print(f"orm per cell      {orm_s * 1000:9.1f} ms")
+        print(f"columnar grid     {engine_s * 1000:9.1f} ms")
+        print(f"full frame load   {load_s * 1000:9.1f} ms")
+        print(f"incremental check {refresh_s * 1000:9.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
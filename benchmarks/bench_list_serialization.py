@@ -0,0 +1,47 @@
+"""Compare DRF ModelSerializer list output with the values_list fast path."""
+
+import argparse
+
+from benchmarks._setup import best_of, seed_ranch, setup_django, test_database
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--animals", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    setup_django()
+    from rest_framework.renderers import JSONRenderer
+    from rest_framework.test import APIRequestFactory
+
+    from apps.animals.models import Animal
+    from kris.list_fastpath import get_list_plan
+    from kris.serializers import AnimalSerializer
+
+    with test_database():
+        seed_ranch(animals=args.animals)
+        request = APIRequestFactory().get("/api/animals/")
+        queryset = Animal.objects.all().select_related("ranch", "dam_tag", "sire_tag")
+        renderer = JSONRenderer()
+        plan = get_list_plan(AnimalSerializer)
+
+        def slow():
+            data = AnimalSerializer(queryset.all(), many=True, context={"request": request}).data
+            return renderer.render(data)
+
+        def fast():
+            return renderer.render(plan.rows(queryset.all(), request))
+
+        assert slow() == fast(), "fast path output differs from the serializer"
+
+        slow_s = best_of(slow, args.repeat)
+        fast_s = best_of(fast, args.repeat)
+        print(f"rows={args.animals}")
+        print(f"serializer  {slow_s * 1000:9.1f} ms")
+        print(f"fast path   {fast_s * 1000:9.1f} ms")
+        print(f"speedup     {slow_s / fast_s:9.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""Per-ranch query cost as the number of ranches grows.
+
+Each ranch gets the same herd and event history; only the number of other
+ranches in the database changes. Queries on the denormalised ``ranch``
+column should stay flat, the old join through ``animals`` should not.
+"""
+
+import argparse
+from datetime import date, timedelta
+
+from benchmarks._setup import best_of, seed_ranch, setup_django, test_database
+
+
+def seed_events(ranch, per_animal):
+    from apps.animals.models import Animal
+    from apps.breeding.models import BreedingEvent
+    from apps.health.models import Vaccination
+
+    vaccinations, events = [], []
+    females = Animal.objects.filter(ranch=ranch, sex="female").values_list("tag_number", flat=True)
+    for i, tag in enumerate(Animal.objects.filter(ranch=ranch).values_list("tag_number", flat=True)):
+        for n in range(per_animal):
+            vaccinations.append(
+                Vaccination(
+                    animal_tag_id=tag,
+                    ranch=ranch,
+                    vaccine_type=("FMD", "CBPP", "LSD")[n % 3],
+                    date_administered=date(2024, 1, 1) + timedelta(days=(i + n * 37) % 365),
+                    next_due_date=date(2025, 1, 1) + timedelta(days=(i + n) % 365),
+                )
+            )
+    for i, tag in enumerate(females):
+        events.append(
+            BreedingEvent(
+                female_tag_id=tag,
+                ranch=ranch,
+                service_date=date(2024, 1 + i % 12, 1),
+                method="natural",
+                pregnancy_confirmed="yes" if i % 3 else "no",
+            )
+        )
+    Vaccination.objects.bulk_create(vaccinations, batch_size=1000)
+    BreedingEvent.objects.bulk_create(events, batch_size=1000)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--animals", type=int, default=1000, help="animals per ranch")
+    parser.add_argument("--vaccinations", type=int, default=3, help="vaccinations per animal")
+    parser.add_argument("--ranches", default="1,4,16")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    setup_django()
+    from apps.analytics.services import build_dashboard_data
+    from apps.health.models import Vaccination
+
+    print(f"{'ranches':>8} {'scoped list':>12} {'joined list':>12} {'dashboard':>12}")
+    for count in [int(value) for value in args.ranches.split(",")]:
+        with test_database():
+            ranches = []
+            for i in range(count):
+                ranch = seed_ranch(name=f"R{i:04d}", animals=args.animals)
+                seed_events(ranch, args.vaccinations)
+                ranches.append(ranch)
+            target = ranches[0]
+
+            def scoped():
+                return list(
+                    Vaccination.objects.filter(ranch=target, date_administered__gte=date(2024, 6, 1))
+                    .order_by("-date_administered")
+                    .values_list("id", flat=True)[:200]
+                )
+
+            def joined():
+                return list(
+                    Vaccination.objects.filter(
+                        animal_tag__ranch=target, date_administered__gte=date(2024, 6, 1)
+                    )
+                    .order_by("-date_administered")
+                    .values_list("id", flat=True)[:200]
+                )
+
+            assert sorted(scoped()) == sorted(joined())
+            scoped_s = best_of(scoped, args.repeat)
+            joined_s = best_of(joined, args.repeat)
+            dashboard_s = best_of(lambda: build_dashboard_data({target.pk}), args.repeat)
+            print(
+                f"{count:>8} {scoped_s * 1000:>9.2f} ms {joined_s * 1000:>9.2f} ms "
+                f"{dashboard_s * 1000:>9.1f} ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+"""Concurrent slow gate uploads: async ASGI ingestion vs the threaded WSGI path.
+
+Every simulated client trickles its body over ``--upload-seconds``. A
+threaded WSGI server holds one worker thread per in-flight upload, so it
+finishes roughly ``threads`` uploads per upload period. Under ASGI the body is
+buffered on the event loop and the whole batch finishes in about one period.
+"""
+
+import argparse
+import asyncio
+import io
+import json
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks._setup import setup_django, test_database
+
+
+def _scans(client_id, scans):
+    return [
+        {
+            "rfid_code": f"982{client_id:06d}{i:06d}",
+            "gate_id": f"GATE-{client_id % 4}",
+            "scan_timestamp": "2025-02-05T06:30:00Z",
+            "direction": "in",
+        }
+        for i in range(scans)
+    ]
+
+
+def _payload(client_id, scans):
+    return json.dumps({"scans": _scans(client_id, scans)}).encode()
+
+
+def _sync_payload(client_id, scans):
+    # The same scans as device sync operations, the WSGI way in today.
+    operations = [
+        {
+            "operation": "create",
+            "table_name": "rfid_scan_logs",
+            "record_data": scan,
+            "timestamp": scan["scan_timestamp"],
+        }
+        for scan in _scans(client_id, scans)
+    ]
+    return json.dumps({"device_id": f"gate-{client_id}", "operations": operations}).encode()
+
+
+def _chunks(body, count):
+    size = max(len(body) // count, 1)
+    return [body[i : i + size] for i in range(0, len(body), size)]
+
+
+class SlowInput(io.RawIOBase):
+    def __init__(self, body, chunks, delay):
+        self.parts = _chunks(body, chunks)
+        self.delay = delay
+        self.buffer = b""
+
+    def readable(self):
+        return True
+
+    def read(self, size=-1):
+        while self.parts and (size < 0 or len(self.buffer) < size):
+            time.sleep(self.delay)
+            self.buffer += self.parts.pop(0)
+        if size < 0:
+            size = len(self.buffer)
+        data, self.buffer = self.buffer[:size], self.buffer[size:]
+        return data
+
+
+def run_wsgi(clients, threads, scans, chunks, delay, token):
+    from django.core.wsgi import get_wsgi_application
+
+    application = get_wsgi_application()
+
+    def one(client_id):
+        body = _sync_payload(client_id, scans)
+        status = []
+        environ = {
+            "REQUEST_METHOD": "POST",
+            "PATH_INFO": "/api/sync/",
+            "SERVER_NAME": "testserver",
+            "SERVER_PORT": "80",
+            "wsgi.url_scheme": "http",
+            "wsgi.input": SlowInput(body, chunks, delay),
+            "CONTENT_TYPE": "application/json",
+            "CONTENT_LENGTH": str(len(body)),
+            "HTTP_AUTHORIZATION": f"Token {token}",
+            "HTTP_HOST": "testserver",
+        }
+        b"".join(application(environ, lambda s, h: status.append(s)))
+        return status[0]
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        results = list(pool.map(one, range(clients)))
+    return time.perf_counter() - started, results
+
+
+async def run_asgi(clients, scans, chunks, delay, token):
+    from django.core.asgi import get_asgi_application
+
+    application = get_asgi_application()
+
+    async def one(client_id):
+        parts = _chunks(_payload(client_id, scans), chunks)
+        sent = []
+
+        async def receive():
+            await asyncio.sleep(delay)
+            part = parts.pop(0)
+            return {"type": "http.request", "body": part, "more_body": bool(parts)}
+
+        async def send(message):
+            sent.append(message)
+
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": "POST",
+            "scheme": "http",
+            "path": "/api/rfid/ingest/",
+            "query_string": b"",
+            "server": ("testserver", 80),
+            "client": ("127.0.0.1", 0),
+            "headers": [
+                (b"host", b"testserver"),
+                (b"content-type", b"application/json"),
+                (b"authorization", f"Token {token}".encode()),
+            ],
+        }
+        await application(scope, receive, send)
+        return next(m["status"] for m in sent if m["type"] == "http.response.start")
+
+    started = time.perf_counter()
+    results = await asyncio.gather(*[one(i) for i in range(clients)])
+    return time.perf_counter() - started, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--clients", type=int, default=200)
+    parser.add_argument("--wsgi-threads", type=int, default=8)
+    parser.add_argument("--scans", type=int, default=20)
+    parser.add_argument("--upload-seconds", type=float, default=1.0)
+    parser.add_argument("--chunks", type=int, default=10)
+    args = parser.parse_args()
+    delay = args.upload_seconds / args.chunks
+
+    setup_django()
+    from rest_framework.authtoken.models import Token
+
+    from apps.core.models import User
+    from apps.operations.models import RFIDScanLog
+
+    path = os.path.join(tempfile.mkdtemp(), "bench.sqlite3")
+    with test_database(name=path):
+        user = User.objects.create_user(username="gate", password="bench12345")
+        token = Token.objects.create(user=user).key
+
+        wsgi_s, wsgi_status = run_wsgi(
+            args.clients, args.wsgi_threads, args.scans, args.chunks, delay, token
+        )
+        wsgi_stored = RFIDScanLog.objects.count()
+        asgi_s, asgi_status = asyncio.run(
+            run_asgi(args.clients, args.scans, args.chunks, delay, token)
+        )
+        asgi_stored = RFIDScanLog.objects.count() - wsgi_stored
+
+    print(f"{args.clients} clients, each uploading over {args.upload_seconds:.1f}s")
+    print(
+        f"WSGI ({args.wsgi_threads} threads)  {wsgi_s:7.2f}s  "
+        f"{args.clients / wsgi_s:7.1f} clients/s  ok={wsgi_status.count('200 OK')}  "
+        f"scans stored={wsgi_stored}"
+    )
+    print(
+        f"ASGI (1 event loop)  {asgi_s:7.2f}s  {args.clients / asgi_s:7.1f} clients/s  "
+        f"ok={asgi_status.count(201)}  scans stored={asgi_stored}"
+    )
+    print(
+        "sustained concurrent slow clients: "
+        f"WSGI ~{args.wsgi_threads}, ASGI ~{args.clients * args.upload_seconds / asgi_s:.0f}"
+    )
+
+
+if __name__ == "__main__":
+    main()
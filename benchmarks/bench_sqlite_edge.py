@@ -0,0 +1,96 @@
+"""Concurrent device sync writes on SQLite, default vs the edge profile.
+
+Each simulated device posts ``--uploads`` sync batches of ``--operations``
+RFID scans from its own thread against an on-disk database. Without the
+profile, writers contend for SQLite's lock (rollback journal, full fsync
+per commit) and some uploads fail with "database is locked"; with it,
+WAL + synchronous=normal cut the fsync cost and the single-writer queue
+turns contention into waiting.
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks._setup import setup_django, test_database
+
+
+def _upload(device, upload, operations):
+    return {
+        "device_id": f"gate-{device}",
+        "operations": [
+            {
+                "operation": "create",
+                "table_name": "rfid_scan_logs",
+                "record_data": {
+                    "rfid_code": f"982{device:04d}{upload:04d}{i:04d}",
+                    "gate_id": f"GATE-{device % 4}",
+                    "scan_timestamp": "2025-02-05T06:30:00Z",
+                },
+                "timestamp": "2025-02-05T06:30:00Z",
+            }
+            for i in range(operations)
+        ],
+    }
+
+
+def run(enabled, devices, uploads, operations):
+    from django.db import connections
+    from django.test import override_settings
+    from rest_framework.test import APIClient
+
+    from apps.core.models import User
+    from apps.operations.models import RFIDScanLog
+
+    path = os.path.join(tempfile.mkdtemp(), "edge.sqlite3")
+    with override_settings(SQLITE_EDGE={"ENABLED": enabled}), test_database(name=path):
+        user = User.objects.create_user(username="gate", password="bench12345")
+
+        def device(number):
+            client = APIClient()
+            client.force_authenticate(user)
+            failures = 0
+            try:
+                for upload in range(uploads):
+                    try:
+                        response = client.post(
+                            "/api/sync/", _upload(number, upload, operations), format="json"
+                        )
+                        failures += response.status_code != 200 or response.json()["failed"] > 0
+                    except Exception:
+                        failures += 1
+            finally:
+                connections.close_all()
+            return failures
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=devices) as pool:
+            failures = sum(pool.map(device, range(devices)))
+        elapsed = time.perf_counter() - started
+        stored = RFIDScanLog.objects.count()
+    return elapsed, failures, stored
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--devices", type=int, default=8)
+    parser.add_argument("--uploads", type=int, default=25)
+    parser.add_argument("--operations", type=int, default=20)
+    args = parser.parse_args()
+
+    setup_django()
+    total = args.devices * args.uploads
+    print(f"{args.devices} devices x {args.uploads} uploads x {args.operations} scans")
+    print(f"{'profile':>8} {'seconds':>8} {'uploads/s':>10} {'scans/s':>9} {'failed':>7} {'stored':>7}")
+    for enabled in (False, True):
+        elapsed, failures, stored = run(enabled, args.devices, args.uploads, args.operations)
+        print(
+            f"{'edge' if enabled else 'default':>8} {elapsed:>8.2f} {total / elapsed:>10.1f} "
+            f"{stored / elapsed:>9.0f} {failures:>7} {stored:>7}"
+        )
+
+
+if __name__ == "__main__":
+    main()
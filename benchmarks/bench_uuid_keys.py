@@ -0,0 +1,99 @@
+"""RFID log inserts with random (v4) vs time-ordered (v7) primary keys.
+
+Loads ``--rows`` scans in ``--batch``-sized batches into a fresh database
+per key type and reports overall and tail insert throughput plus the size
+of the primary-key index. Random keys touch a random index page per row, so
+throughput drops once the index outgrows the cache and page splits leave it
+half full; v7 keys always append to the rightmost page.
+
+Runs on SQLite by default (on disk, so the page cache matters); set
+``KRIS_DB_ENGINE=postgresql`` to measure the production profile.
+"""
+
+import argparse
+import os
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from benchmarks._setup import setup_django, test_database
+
+
+def _index_bytes(connection, table):
+    with connection.cursor() as cursor:
+        if connection.vendor == "postgresql":
+            cursor.execute(
+                "SELECT pg_relation_size(indexrelid) FROM pg_index "
+                "WHERE indrelid = %s::regclass AND indisprimary",
+                [table],
+            )
+            return cursor.fetchone()[0]
+        try:
+            cursor.execute(
+                "SELECT SUM(pgsize) FROM dbstat WHERE name = %s", [f"sqlite_autoindex_{table}_1"]
+            )
+            return cursor.fetchone()[0]
+        except Exception:  # SQLite built without dbstat: whole file instead.
+            cursor.execute("PRAGMA page_count")
+            pages = cursor.fetchone()[0]
+            cursor.execute("PRAGMA page_size")
+            return pages * cursor.fetchone()[0]
+
+
+def run(make_id, rows, batch):
+    from django.db import transaction
+
+    from apps.core.postgres import copy_insert
+    from apps.operations.models import RFIDScanLog
+
+    name = None
+    if os.environ.get("KRIS_DB_ENGINE") != "postgresql":
+        name = os.path.join(tempfile.mkdtemp(), "uuid-keys.sqlite3")
+    with test_database(name=name) as connection:
+        start = datetime(2025, 1, 1, tzinfo=timezone.utc)
+        tail_from = rows - rows // 10
+        tail_offset, tail_started = 0, None
+        started = time.perf_counter()
+        for offset in range(0, rows, batch):
+            if tail_started is None and offset >= tail_from:
+                tail_offset, tail_started = offset, time.perf_counter()
+            with transaction.atomic():
+                copy_insert(
+                    RFIDScanLog,
+                    [
+                        RFIDScanLog(
+                            id=make_id(),
+                            rfid_code=f"982{i % 50000:012d}",
+                            gate_id=f"GATE-{i % 8}",
+                            scan_timestamp=start + timedelta(seconds=i),
+                            direction="in" if i % 2 else "out",
+                            signal_strength=-40 - i % 30,
+                        )
+                        for i in range(offset, min(offset + batch, rows))
+                    ],
+                )
+        finished = time.perf_counter()
+        tail_seconds = finished - (tail_started or started)
+        size = _index_bytes(connection, RFIDScanLog._meta.db_table)
+    return rows / (finished - started), (rows - tail_offset) / tail_seconds, size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    parser.add_argument("--batch", type=int, default=5000)
+    args = parser.parse_args()
+
+    setup_django()
+    from apps.core.ids import uuid7
+
+    print(f"{args.rows} RFID scans in batches of {args.batch}")
+    print(f"{'key':>5} {'rows/s':>9} {'last 10% rows/s':>16} {'pk index MB':>12}")
+    for label, make_id in (("uuid4", uuid.uuid4), ("uuid7", uuid7)):
+        overall, tail, size = run(make_id, args.rows, args.batch)
+        print(f"{label:>5} {overall:>9.0f} {tail:>16.0f} {size / 1024 / 1024:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""Bytes on the wire and encode/decode CPU time: JSON vs MessagePack, raw/gzip/brotli."""
+
+import argparse
+import gzip
+import time
+
+import brotli
+
+from benchmarks._setup import seed_ranch, setup_django, test_database
+
+
+def _time(func, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+
+def _report(label, payload, repeat):
+    import json
+
+    from rest_framework.renderers import JSONRenderer
+
+    from kris.renderers import packb, unpackb
+
+    renderer = JSONRenderer()
+    codecs = {
+        "json": (lambda: renderer.render(payload), json.loads),
+        "msgpack": (lambda: packb(payload), unpackb),
+    }
+    compressors = {
+        "raw": (lambda body: body, lambda body: body),
+        "gzip": (lambda body: gzip.compress(body, 6), gzip.decompress),
+        "br": (lambda body: brotli.compress(body, quality=5), brotli.decompress),
+    }
+
+    print(f"\n{label}")
+    print(f"{'format':<16}{'bytes':>10}{'encode ms':>12}{'decode ms':>12}")
+    for codec_name, (encode, decode) in codecs.items():
+        body = encode()
+        for comp_name, (compress, decompress) in compressors.items():
+            wire = compress(body)
+            encode_ms = _time(lambda: compress(encode()), repeat)
+            decode_ms = _time(lambda: decode(decompress(wire)), repeat)
+            print(f"{codec_name + '+' + comp_name:<16}{len(wire):>10}{encode_ms:>12.2f}{decode_ms:>12.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--animals", type=int, default=1000)
+    parser.add_argument("--operations", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    setup_django()
+    from apps.animals.models import Animal
+    from kris.list_fastpath import get_list_plan
+    from kris.serializers import AnimalSerializer
+
+    with test_database():
+        seed_ranch(animals=args.animals)
+        animals = get_list_plan(AnimalSerializer).rows(Animal.objects.all())
+
+    sync_upload = {
+        "device_id": "herdsman-phone-07",
+        "operations": [
+            {
+                "operation": "create",
+                "table_name": "rfid_scan_logs",
+                "record_data": {
+                    "rfid_code": f"982000{i:09d}",
+                    "gate_id": "GATE-NORTH",
+                    "scan_timestamp": "2025-02-05T06:30:00Z",
+                    "direction": "in",
+                    "signal_strength": -60 + i % 20,
+                },
+                "timestamp": "2025-02-05T06:30:00Z",
+            }
+            for i in range(args.operations)
+        ],
+    }
+
+    _report(f"GET /api/animals/ ({args.animals} rows)", animals, args.repeat)
+    _report(f"POST /api/sync/ ({args.operations} RFID operations)", sync_upload, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
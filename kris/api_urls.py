@@ -4,17 +4,25 @@ from rest_framework.routers import DefaultRouter
 from .api_views import (
     AnimalViewSet,
     BreedingEventViewSet,
+    CohortAPIView,
     DashboardAPIView,
+    DashboardEventsAPIView,
     HerdCountViewSet,
     LoginAPIView,
     LogoutAPIView,
     MortalityViewSet,
     MovementLogViewSet,
+    PortfolioAPIView,
+    ProfitAndLossAPIView,
     RFIDScanLogViewSet,
     SyncAPIView,
+    SyncChangesAPIView,
+    SyncSnapshotAPIView,
     TreatmentViewSet,
+    TrendsAPIView,
     VaccinationViewSet,
 )
+from .async_views import dashboard_event_stream, rfid_ingest_view, sync_ingest_view
 
 router = DefaultRouter()
 router.register("animals", AnimalViewSet, basename="animals")
@@ -30,6 +38,17 @@ urlpatterns = [
     path("auth/login/", LoginAPIView.as_view(), name="api-login"),
     path("auth/logout/", LogoutAPIView.as_view(), name="api-logout"),
     path("sync/", SyncAPIView.as_view(), name="api-sync"),
+    path("sync/snapshot/", SyncSnapshotAPIView.as_view(), name="api-sync-snapshot"),
+    path("sync/changes/", SyncChangesAPIView.as_view(), name="api-sync-changes"),
+    # Async (ASGI) ingestion for gate readers and devices on slow links.
+    path("sync/async/", sync_ingest_view, name="api-sync-async"),
+    path("rfid/ingest/", rfid_ingest_view, name="api-rfid-ingest"),
     path("analytics/dashboard/", DashboardAPIView.as_view(), name="api-dashboard"),
+    path("analytics/cohorts/", CohortAPIView.as_view(), name="api-cohorts"),
+    path("analytics/pnl/", ProfitAndLossAPIView.as_view(), name="api-pnl"),
+    path("analytics/portfolio/", PortfolioAPIView.as_view(), name="api-portfolio"),
+    path("analytics/trends/", TrendsAPIView.as_view(), name="api-trends"),
+    path("analytics/events/", DashboardEventsAPIView.as_view(), name="api-dashboard-events"),
+    path("analytics/events/stream/", dashboard_event_stream, name="api-dashboard-stream"),
     path("", include(router.urls)),
 ]
@@ -1,18 +1,49 @@
+import uuid
+from datetime import timedelta
+
 from django.contrib.auth import authenticate
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import transaction
+from django.db.models import F
 from django.utils import timezone
+from django.http import FileResponse, Http404
+from django.shortcuts import get_object_or_404
+from django.utils.dateparse import parse_date, parse_datetime
 from rest_framework import status, viewsets
+from rest_framework.decorators import action
 from rest_framework.authtoken.models import Token
-from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework.exceptions import PermissionDenied, ValidationError
+from rest_framework.permissions import SAFE_METHODS, AllowAny, IsAuthenticated
 from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
 from rest_framework.views import APIView
 
+from apps.animals.images import PHOTO_VARIANTS, ensure_photo_variants
 from apps.animals.models import Animal
-from apps.breeding.models import BreedingEvent
-from apps.core.models import SyncQueue
+from apps.animals.search import MAX_RESULTS, search_animals
+from apps.core.authentication import is_token_expired
+from apps.breeding.lineage import PARENTS, birth_event, productivity
+from apps.breeding.models import BreedingEvent, ReproductiveTask
+from apps.core.edge import single_writer
+from apps.core.models import Ranch, SyncQueue
+from apps.core.routers import read_from_replica
+from apps.core.snapshots import build_snapshot, changes_since, latest_snapshot
+from apps.core.tenancy import DEVICE_RANCH_TABLES, device_ranch_id, scope_to_ranches, user_ranch_ids
 from apps.health.models import Mortality, Treatment, Vaccination
 from apps.operations.models import HerdCount, MovementLog, RFIDScanLog
-from apps.analytics.services import build_dashboard_data
-
+from apps.analytics.columnar import DIMENSIONS, METRICS, cohort_grid, get_frame
+from apps.analytics.events import broker
+from apps.analytics.ledger import GROUPS as LEDGER_GROUPS, profit_and_loss
+from apps.analytics.live import scope_events
+from apps.analytics.portfolio import get_portfolio
+from apps.analytics.services import get_dashboard_data, parse_sections
+from apps.analytics.signals import batched_kpis
+from apps.analytics.trends import COHORTS, MAX_MONTHS, build_trends
+
+from .filters import DATE_LOOKUPS, EXACT, RANGE_LOOKUPS, SET_LOOKUPS, apply_filters
+from .list_fastpath import get_list_plan, model_column
+from .timeline import DEFAULT_LIMIT as TIMELINE_LIMIT, MAX_LIMIT as TIMELINE_MAX_LIMIT
+from .timeline import decode_cursor, serialize_item, timeline_page
 from .serializers import (
     AnimalSerializer,
     BreedingEventSerializer,
@@ -26,66 +57,302 @@ from .serializers import (
 )
 
 
+CALENDAR_DAYS = timedelta(days=7)
+
+
+def _check_ranch(instance, ranch_ids):
+    if ranch_ids is None:
+        return
+    if instance.ranch_id is None:
+        raise PermissionDenied("Say which ranch this record belongs to.")
+    if instance.ranch_id not in ranch_ids:
+        raise PermissionDenied("You cannot record data for that ranch.")
+
+
+def _create(serializer, ranch_ids, device_ranch):
+    # Scans of unknown tags and group moves have no animal to take the
+    # ranch from, so they are recorded for the device's ranch.
+    extra = {}
+    model = serializer.Meta.model
+    if model._meta.label_lower in DEVICE_RANCH_TABLES and not serializer.validated_data.get("ranch"):
+        extra["ranch_id"] = device_ranch
+    _check_ranch(serializer.save(**extra), ranch_ids)
+
+
 class BaseQueryParamFilterViewSet(viewsets.ModelViewSet):
     permission_classes = [IsAuthenticated]
     filter_fields = []
+    fast_list = True
 
     def get_queryset(self):
-        queryset = super().get_queryset()
-        for field in self.filter_fields:
-            value = self.request.query_params.get(field)
-            if value:
-                queryset = queryset.filter(**{field: value})
-        return queryset
+        queryset = apply_filters(
+            super().get_queryset(), self.filter_fields, self.request.query_params
+        )
+        queryset = scope_to_ranches(queryset, self.get_ranch_ids())
+        return self.prune_queryset(queryset)
+
+    def get_ranch_ids(self):
+        if not hasattr(self, "_ranch_ids"):
+            self._ranch_ids = user_ranch_ids(self.request.user)
+        return self._ranch_ids
+
+    def perform_create(self, serializer):
+        ranch_ids = self.get_ranch_ids()
+        with transaction.atomic():
+            _create(serializer, ranch_ids, device_ranch_id(ranch_ids))
+
+    def perform_update(self, serializer):
+        with transaction.atomic():
+            _check_ranch(serializer.save(), self.get_ranch_ids())
+
+    def get_selected_fields(self):
+        """Parse ``?fields=`` / ``?exclude=`` into a tuple of field names.
+
+        Returns ``None`` when the full representation was requested. Sparse
+        fieldsets only apply to reads; writes always use every field.
+        """
+        if not hasattr(self, "_selected_fields"):
+            self._selected_fields = None
+            params = self.request.query_params
+            requested = [name for name in params.get("fields", "").split(",") if name]
+            excluded = [name for name in params.get("exclude", "").split(",") if name]
+            if self.request.method in SAFE_METHODS and (requested or excluded):
+                serializer = self.get_serializer_class()()
+                available = [field.field_name for field in serializer._readable_fields]
+                unknown = sorted(set(requested + excluded) - set(available))
+                if unknown:
+                    raise ValidationError({"fields": [f"Unknown field(s): {', '.join(unknown)}."]})
+                self._selected_fields = tuple(
+                    name
+                    for name in available
+                    if (not requested or name in requested) and name not in excluded
+                )
+        return self._selected_fields
+
+    def prune_queryset(self, queryset):
+        selected = self.get_selected_fields()
+        if selected is None:
+            return queryset
+
+        serializer_fields = self.get_serializer_class()().fields
+        model = queryset.model
+        columns = {model._meta.pk.name}
+        for name in selected:
+            column = model_column(model, serializer_fields[name].source)
+            if column is None:
+                return queryset
+            columns.add(column)
+
+        related = queryset.query.select_related
+        if isinstance(related, dict):
+            queryset = queryset.select_related(None)
+            keep = [name for name in related if name in columns]
+            if keep:
+                queryset = queryset.select_related(*keep)
+        return queryset.only(*columns)
+
+    def get_serializer(self, *args, **kwargs):
+        serializer = super().get_serializer(*args, **kwargs)
+        selected = self.get_selected_fields()
+        if selected is not None:
+            target = getattr(serializer, "child", serializer)
+            for field in list(target._readable_fields):
+                if field.field_name not in selected:
+                    target.fields.pop(field.field_name)
+        return serializer
+
+    def list(self, request, *args, **kwargs):
+        plan = None
+        if self.fast_list:
+            plan = get_list_plan(self.get_serializer_class(), self.get_selected_fields())
+        with read_from_replica():
+            if plan is None or self.paginator is not None:
+                return super().list(request, *args, **kwargs)
+            queryset = self.filter_queryset(self.get_queryset())
+            return Response(plan.rows(queryset, request))
+
+    def retrieve(self, request, *args, **kwargs):
+        with read_from_replica():
+            return super().retrieve(request, *args, **kwargs)
 
 
 class AnimalViewSet(BaseQueryParamFilterViewSet):
     queryset = Animal.objects.all().select_related("ranch", "dam_tag", "sire_tag")
     serializer_class = AnimalSerializer
     lookup_field = "tag_number"
-    filter_fields = ["species", "status", "ranch"]
+    filter_fields = {"species": SET_LOOKUPS, "status": SET_LOOKUPS, "ranch": EXACT}
+
+    @action(detail=False, methods=["get"])
+    def search(self, request):
+        """Typeahead lookup: ``?q=`` plus optional ``ranch`` and ``limit``."""
+        query = request.query_params.get("q", "")
+        ranch = request.query_params.get("ranch") or None
+        try:
+            limit = int(request.query_params.get("limit", 20))
+            ranch = uuid.UUID(ranch) if ranch else None
+        except ValueError:
+            raise ValidationError({"detail": "limit must be an integer and ranch a UUID."})
+        if len(query) > 100:
+            raise ValidationError({"q": "At most 100 characters."})
+        ranch_ids = self.get_ranch_ids()
+        if ranch is not None:
+            ranch_ids = {ranch} if ranch_ids is None or ranch in ranch_ids else set()
+        with read_from_replica():
+            results = search_animals(query, ranch_ids=ranch_ids, limit=min(limit, MAX_RESULTS))
+        return Response(results)
+
+    @action(detail=True, methods=["get"])
+    def origin(self, request, tag_number=None):
+        """The breeding event that produced this animal."""
+        animal = self.get_object()
+        with read_from_replica():
+            event = birth_event(animal.pk)
+        if event is None:
+            raise Http404
+        return Response(BreedingEventSerializer(event, context=self.get_serializer_context()).data)
+
+    @action(detail=True, methods=["get"])
+    def timeline(self, request, tag_number=None):
+        """Every event for this animal, newest first: ``?limit=`` and ``?cursor=``."""
+        animal = self.get_object()
+        try:
+            limit = int(request.query_params.get("limit", TIMELINE_LIMIT))
+        except ValueError:
+            raise ValidationError({"limit": "Must be an integer."})
+        if not 1 <= limit <= TIMELINE_MAX_LIMIT:
+            raise ValidationError({"limit": f"Must be between 1 and {TIMELINE_MAX_LIMIT}."})
+        try:
+            positions = decode_cursor(request.query_params.get("cursor"))
+        except ValueError as exc:
+            raise ValidationError({"cursor": str(exc)})
+        with read_from_replica():
+            items, cursor = timeline_page(animal, positions, limit)
+        context = self.get_serializer_context()
+        return Response(
+            {
+                "results": [serialize_item(kind, obj, context) for kind, obj in items],
+                "next": replace_query_param(request.build_absolute_uri(), "cursor", cursor)
+                if cursor
+                else None,
+            }
+        )
+
+    @action(detail=True, methods=["get"], url_path=r"photo/(?P<variant>[a-z]+)")
+    def photo(self, request, variant=None, tag_number=None):
+        # Lazy path for variants the background job has not produced yet.
+        if variant not in PHOTO_VARIANTS:
+            raise Http404
+        animal = self.get_object()
+        variants = ensure_photo_variants(animal)
+        if not variants:
+            raise Http404
+        url = animal.photo.storage.url(variants[variant])
+        return Response(
+            status=status.HTTP_302_FOUND,
+            headers={"Location": request.build_absolute_uri(url)},
+        )
 
 
 class BreedingEventViewSet(BaseQueryParamFilterViewSet):
     queryset = BreedingEvent.objects.all().select_related("female_tag", "male_tag")
     serializer_class = BreedingEventSerializer
-    filter_fields = ["female_tag", "pregnancy_confirmed"]
+    filter_fields = {
+        "ranch": EXACT,
+        "female_tag": EXACT,
+        "pregnancy_confirmed": EXACT,
+        "service_date": DATE_LOOKUPS,
+        "expected_delivery_date": RANGE_LOOKUPS,
+    }
+
+    @action(detail=False, methods=["get"])
+    def productivity(self, request):
+        """Services, live births and live offspring per ``?parent=sire`` (or ``dam``)."""
+        parent = request.query_params.get("parent", "sire")
+        if parent not in PARENTS:
+            raise ValidationError({"parent": f"Must be one of: {', '.join(PARENTS)}."})
+        with read_from_replica():
+            return Response(productivity(parent, self.get_ranch_ids()))
+
+    @action(detail=False, methods=["get"])
+    def calendar(self, request):
+        """Upcoming heats, pregnancy checks and calvings due by ``?end=`` (default a week).
+
+        ``?start=`` drops older (overdue) tasks; ``?kind=`` and ``?ranch=`` filter.
+        """
+        params = request.query_params
+        today = timezone.localdate()
+        try:
+            start = parse_date(params["start"]) if params.get("start") else None
+            end = parse_date(params["end"]) if params.get("end") else today + CALENDAR_DAYS
+            ranch = uuid.UUID(params["ranch"]) if params.get("ranch") else None
+            if end is None or (params.get("start") and start is None):
+                raise ValueError
+        except ValueError:
+            raise ValidationError({"detail": "start and end must be YYYY-MM-DD dates and ranch a UUID."})
+        tasks = scope_to_ranches(ReproductiveTask.objects.all(), self.get_ranch_ids())
+        tasks = tasks.filter(due_date__lte=end)
+        if start is not None:
+            tasks = tasks.filter(due_date__gte=start)
+        if params.get("kind"):
+            tasks = tasks.filter(kind__in=params["kind"].split(","))
+        if ranch is not None:
+            tasks = tasks.filter(ranch=ranch)
+        with read_from_replica():
+            rows = list(
+                tasks.order_by("due_date", "animal_id").values(
+                    "kind", "due_date", "ranch", "breeding_event", animal_tag=F("animal_id")
+                )
+            )
+        for row in rows:
+            row["overdue"] = row["due_date"] < today
+        return Response(rows)
 
 
 class VaccinationViewSet(BaseQueryParamFilterViewSet):
     queryset = Vaccination.objects.all().select_related("animal_tag", "administered_by")
     serializer_class = VaccinationSerializer
-    filter_fields = ["animal_tag", "vaccine_type"]
+    filter_fields = {
+        "ranch": EXACT,
+        "animal_tag": EXACT,
+        "vaccine_type": SET_LOOKUPS,
+        "date_administered": DATE_LOOKUPS,
+        "next_due_date": RANGE_LOOKUPS,
+    }
 
 
 class TreatmentViewSet(BaseQueryParamFilterViewSet):
     queryset = Treatment.objects.all().select_related("animal_tag", "treated_by")
     serializer_class = TreatmentSerializer
-    filter_fields = ["animal_tag"]
+    filter_fields = {"ranch": EXACT, "animal_tag": EXACT, "treatment_date": DATE_LOOKUPS}
 
 
 class MortalityViewSet(BaseQueryParamFilterViewSet):
     queryset = Mortality.objects.all().select_related("animal_tag")
     serializer_class = MortalitySerializer
-    filter_fields = ["animal_tag"]
+    filter_fields = {"ranch": EXACT, "animal_tag": EXACT, "death_date": DATE_LOOKUPS}
 
 
 class HerdCountViewSet(BaseQueryParamFilterViewSet):
     queryset = HerdCount.objects.all().select_related("ranch")
     serializer_class = HerdCountSerializer
-    filter_fields = ["ranch", "species", "count_date"]
+    filter_fields = {"ranch": EXACT, "species": EXACT, "count_date": DATE_LOOKUPS}
 
 
 class MovementLogViewSet(BaseQueryParamFilterViewSet):
     queryset = MovementLog.objects.all().select_related("animal_tag")
     serializer_class = MovementLogSerializer
-    filter_fields = ["animal_tag", "movement_date"]
+    filter_fields = {"ranch": EXACT, "animal_tag": EXACT, "movement_date": DATE_LOOKUPS}
 
 
 class RFIDScanLogViewSet(BaseQueryParamFilterViewSet):
     queryset = RFIDScanLog.objects.all().select_related("animal_tag")
     serializer_class = RFIDScanLogSerializer
-    filter_fields = ["rfid_code", "gate_id"]
+    filter_fields = {
+        "ranch": EXACT,
+        "rfid_code": SET_LOOKUPS,
+        "gate_id": SET_LOOKUPS,
+        "scan_timestamp": RANGE_LOOKUPS,
+    }
 
 
 class LoginAPIView(APIView):
@@ -101,7 +368,10 @@ class LoginAPIView(APIView):
                 {"detail": "Invalid credentials."}, status=status.HTTP_400_BAD_REQUEST
             )
 
-        token, _ = Token.objects.get_or_create(user=user)
+        token, created = Token.objects.get_or_create(user=user)
+        if not created and is_token_expired(token):
+            token.delete()
+            token = Token.objects.create(user=user)
         return Response(
             {
                 "token": token.key,
@@ -123,11 +393,142 @@ class LogoutAPIView(APIView):
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 
+def _ranch_param(request):
+    try:
+        ranch_id = uuid.UUID(request.query_params.get("ranch", ""))
+    except ValueError:
+        raise ValidationError({"ranch": "Must be a ranch UUID."})
+    ranch_ids = user_ranch_ids(request.user)
+    if ranch_ids is not None and ranch_id not in ranch_ids:
+        raise Http404
+    return get_object_or_404(Ranch, pk=ranch_id)
+
+
+def _visible_ranch_ids(request):
+    """``?ranch=`` narrowed to what the user may see; ``None`` means every ranch."""
+    if request.query_params.get("ranch"):
+        return {_ranch_param(request).pk}
+    return user_ranch_ids(request.user)
+
+
 class DashboardAPIView(APIView):
+    """Dashboard for the user's ranches, or one of them with ``?ranch=<id>``.
+
+    ``?sections=kpis,alerts`` computes and returns only those sections.
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        try:
+            sections = parse_sections(request.query_params.get("sections"))
+        except ValueError as exc:
+            raise ValidationError({"sections": str(exc)})
+        ranch_ids = _visible_ranch_ids(request)
+        with read_from_replica():
+            return Response(get_dashboard_data(ranch_ids, sections))
+
+
+class TrendsAPIView(APIView):
+    """Monthly series per cohort: ``?months=12&cohort=imported,born``."""
+
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        return Response(build_dashboard_data())
+        try:
+            months = int(request.query_params.get("months", 12))
+        except ValueError:
+            raise ValidationError({"months": "Must be an integer."})
+        if not 1 <= months <= MAX_MONTHS:
+            raise ValidationError({"months": f"Must be between 1 and {MAX_MONTHS}."})
+        cohorts = [name for name in request.query_params.get("cohort", "").split(",") if name]
+        unknown = sorted(set(cohorts) - set(COHORTS))
+        if unknown:
+            raise ValidationError({"cohort": f"Unknown cohort(s): {', '.join(unknown)}."})
+        ranch_ids = user_ranch_ids(request.user)
+        with read_from_replica():
+            return Response(build_trends(months, cohorts or None, ranch_ids=ranch_ids))
+
+
+class CohortAPIView(APIView):
+    """Cohort x metric grid: ``?by=source,breed&metrics=conception_rate&ranch=<id>``."""
+
+    permission_classes = [IsAuthenticated]
+
+    def _names(self, param, allowed, default=None):
+        names = [name for name in self.request.query_params.get(param, "").split(",") if name]
+        unknown = sorted(set(names) - set(allowed))
+        if unknown:
+            raise ValidationError({param: f"Unknown value(s): {', '.join(unknown)}."})
+        return names or default
+
+    def get(self, request):
+        dimensions = self._names("by", DIMENSIONS, ["source"])
+        metrics = self._names("metrics", METRICS)
+        visible = user_ranch_ids(request.user)
+        ranches = Ranch.objects.all() if visible is None else Ranch.objects.filter(pk__in=visible)
+        ranch_ids = {str(pk): pk for pk in ranches.values_list("id", flat=True)}
+        ranches = self._names("ranch", ranch_ids, list(ranch_ids))
+        with read_from_replica():
+            frames = [get_frame(ranch_ids[ranch]) for ranch in ranches]
+        return Response(
+            {"dimensions": dimensions, "rows": cohort_grid(frames, dimensions, metrics)}
+        )
+
+
+class ProfitAndLossAPIView(APIView):
+    """Ledger P&L per ranch, cohort or animal: ``?by=source&ranch=<id>&animal=<tag>``."""
+
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        group = request.query_params.get("by", "ranch")
+        if group not in LEDGER_GROUPS:
+            raise ValidationError({"by": f"Must be one of: {', '.join(LEDGER_GROUPS)}."})
+        filters = {
+            LEDGER_GROUPS[param]: request.query_params[param]
+            for param in LEDGER_GROUPS
+            if request.query_params.get(param)
+        }
+        visible = user_ranch_ids(request.user)
+        if visible is not None:
+            filters["ranch_id__in"] = visible
+        try:
+            with read_from_replica():
+                rows = profit_and_loss(group, **filters)
+        except DjangoValidationError:
+            raise ValidationError({"ranch": "Must be a valid ranch id."})
+        return Response({"by": group, "rows": rows})
+
+
+class PortfolioAPIView(APIView):
+    """Per-ranch dashboard summaries and portfolio totals for the user's ranches."""
+
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        ranch_ids = user_ranch_ids(request.user)
+        with read_from_replica():
+            return Response(get_portfolio(ranch_ids))
+
+
+class DashboardEventsAPIView(APIView):
+    """Long-poll fallback for clients that cannot hold an SSE stream open."""
+
+    permission_classes = [IsAuthenticated]
+    max_timeout = 25
+
+    def get(self, request):
+        try:
+            since = int(request.query_params.get("since", broker.last_id))
+            timeout = float(request.query_params.get("timeout", self.max_timeout))
+        except ValueError:
+            raise ValidationError({"detail": "since and timeout must be numbers."})
+        ranch_ids = user_ranch_ids(request.user)
+        events, last_id = broker.wait(
+            max(since, 0), min(max(timeout, 0), self.max_timeout), ranch_ids
+        )
+        return Response({"last_id": last_id, "events": scope_events(events, ranch_ids)})
 
 
 SYNC_TABLES = {
@@ -142,20 +543,22 @@ SYNC_TABLES = {
 }
 
 
-class SyncAPIView(APIView):
-    permission_classes = [IsAuthenticated]
+def process_sync_operations(request, device_id, operations, ranch_id=None):
+    """Apply validated sync operations, recording each in the SyncQueue.
 
-    def post(self, request):
-        payload = SyncRequestSerializer(data=request.data)
-        payload.is_valid(raise_exception=True)
-
-        device_id = payload.validated_data["device_id"]
-        operations = payload.validated_data["operations"]
-
-        synced = 0
-        failed = 0
-        errors = []
+    The whole upload is one write transaction (one commit, queued behind
+    other writers on SQLite edge servers); each operation runs in its own
+    savepoint so a failed one does not undo the others. Live dashboard KPIs
+    are recomputed once for the whole upload. ``ranch_id`` is the ranch the
+    device is on, for rows that have no animal to take it from.
+    """
+    ranch_ids = user_ranch_ids(request.user)
+    device_ranch = device_ranch_id(ranch_ids, ranch_id)
+    synced = 0
+    failed = 0
+    errors = []
 
+    with batched_kpis(), single_writer():
         for entry in operations:
             operation = entry["operation"]
             table_name = entry["table_name"]
@@ -173,39 +576,8 @@ class SyncAPIView(APIView):
             )
 
             try:
-                if table_name not in SYNC_TABLES:
-                    raise ValueError(f"Unsupported table_name '{table_name}'.")
-
-                model_class, serializer_class, pk_field = SYNC_TABLES[table_name]
-
-                if operation == "create":
-                    serializer = serializer_class(
-                        data=record_data,
-                        context={"request": request},
-                    )
-                    serializer.is_valid(raise_exception=True)
-                    serializer.save()
-                else:
-                    pk_value = record_data.get(pk_field)
-                    if pk_value is None:
-                        raise ValueError(
-                            f"Missing primary key field '{pk_field}' for {operation}."
-                        )
-
-                    instance = model_class.objects.get(pk=pk_value)
-
-                    if operation == "update":
-                        serializer = serializer_class(
-                            instance,
-                            data=record_data,
-                            partial=True,
-                            context={"request": request},
-                        )
-                        serializer.is_valid(raise_exception=True)
-                        serializer.save()
-                    elif operation == "delete":
-                        instance.delete()
-
+                with transaction.atomic():
+                    _apply_sync_operation(request, ranch_ids, device_ranch, entry)
                 queue_row.synced = True
                 queue_row.synced_at = timezone.now()
                 queue_row.error_message = ""
@@ -223,4 +595,106 @@ class SyncAPIView(APIView):
                     }
                 )
 
-        return Response({"synced": synced, "failed": failed, "errors": errors})
+    return {"synced": synced, "failed": failed, "errors": errors}
+
+
+def _apply_sync_operation(request, ranch_ids, device_ranch, entry):
+    operation = entry["operation"]
+    table_name = entry["table_name"]
+    record_data = entry["record_data"]
+    if table_name not in SYNC_TABLES:
+        raise ValueError(f"Unsupported table_name '{table_name}'.")
+
+    model_class, serializer_class, pk_field = SYNC_TABLES[table_name]
+
+    if operation == "create":
+        serializer = serializer_class(
+            data=record_data,
+            context={"request": request},
+        )
+        serializer.is_valid(raise_exception=True)
+        _create(serializer, ranch_ids, device_ranch)
+        return
+
+    pk_value = record_data.get(pk_field)
+    if pk_value is None:
+        raise ValueError(
+            f"Missing primary key field '{pk_field}' for {operation}."
+        )
+
+    instance = scope_to_ranches(model_class.objects.all(), ranch_ids).get(pk=pk_value)
+
+    if operation == "update":
+        serializer = serializer_class(
+            instance,
+            data=record_data,
+            partial=True,
+            context={"request": request},
+        )
+        serializer.is_valid(raise_exception=True)
+        _check_ranch(serializer.save(), ranch_ids)
+    elif operation == "delete":
+        instance.delete()
+
+
+class SyncAPIView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        payload = SyncRequestSerializer(data=request.data)
+        payload.is_valid(raise_exception=True)
+
+        return Response(
+            process_sync_operations(
+                request,
+                payload.validated_data["device_id"],
+                payload.validated_data["operations"],
+                payload.validated_data.get("ranch"),
+            )
+        )
+
+
+class SyncSnapshotAPIView(APIView):
+    """Download the ranch's prebuilt offline database: ``?ranch=<id>``.
+
+    The ETag is the snapshot version; after loading it, devices poll
+    ``sync/changes/`` from the ``X-Snapshot-Cursor`` header.
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        ranch = _ranch_param(request)
+        snapshot = latest_snapshot(ranch) or build_snapshot(ranch)
+        etag = f'"{snapshot.version}"'
+        headers = {"ETag": etag, "X-Snapshot-Cursor": snapshot.cursor.isoformat()}
+        if etag in request.headers.get("If-None-Match", ""):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        response = FileResponse(
+            snapshot.file.open("rb"),
+            as_attachment=True,
+            filename=f"ranch-{ranch.pk}.sqlite3.gz",
+            content_type="application/gzip",
+        )
+        for header, value in headers.items():
+            response.headers[header] = value
+        return response
+
+
+class SyncChangesAPIView(APIView):
+    """Rows changed since a snapshot or previous delta: ``?ranch=<id>&cursor=<iso>``."""
+
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        ranch = _ranch_param(request)
+        cursor = parse_datetime(request.query_params.get("cursor", ""))
+        if cursor is None or timezone.is_naive(cursor):
+            raise ValidationError({"cursor": "Must be an ISO 8601 timestamp with a UTC offset."})
+        changes = changes_since(ranch.pk, cursor)
+        if changes is None:
+            # Too far behind: cheaper to download the snapshot again.
+            return Response(
+                {"reset": True, "changes": {}, "deleted": {}}, status=status.HTTP_409_CONFLICT
+            )
+        return Response({"reset": False, **changes})
@@ -2,6 +2,8 @@
 ASGI config for kris project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+Serve it with an ASGI server (e.g. ``uvicorn kris.asgi:application``) to get
+the non-blocking ingestion endpoints in ``kris.async_views``.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/4.2/howto/deployment/asgi/
@@ -0,0 +1,244 @@
+"""Async endpoints for RFID gates, device sync and live dashboards (run under ASGI).
+
+The ASGI server buffers each request body on the event loop, so a gate on a
+slow link holds a coroutine rather than a worker thread. Database work goes
+through the bounded pool in ``kris.ingestion``. Open dashboard event streams
+likewise cost one idle coroutine each.
+"""
+
+import functools
+import json
+import uuid
+
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import HttpResponse, HttpResponseNotAllowed, JsonResponse, StreamingHttpResponse
+from django.utils.dateparse import parse_datetime
+from rest_framework import exceptions
+
+from apps.analytics.events import broker
+from apps.analytics.live import scope_events
+from apps.core.authentication import CachedTokenAuthentication, token_cache
+from apps.core.tenancy import device_ranch_id, user_ranch_ids
+
+from .api_views import process_sync_operations
+from .ingestion import Overloaded, get_scan_batcher, run_bounded
+from .renderers import packb, unpackb
+from .serializers import SyncRequestSerializer
+
+MAX_SCANS_PER_REQUEST = 5000
+EVENT_STREAM_HEARTBEAT = 15
+
+
+class BadPayload(Exception):
+    pass
+
+
+def async_endpoint(*methods):
+    # Django 4.2's csrf_exempt/require_http_methods wrap views synchronously,
+    # which would hide the coroutine from the handler.
+    def decorator(view):
+        @functools.wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            if request.method not in methods:
+                return HttpResponseNotAllowed(methods)
+            return await view(request, *args, **kwargs)
+
+        wrapper.csrf_exempt = True
+        return wrapper
+
+    return decorator
+
+
+async_post_endpoint = async_endpoint("POST")
+
+
+def _response(request, data, status=200, headers=None):
+    if "application/msgpack" in request.META.get("HTTP_ACCEPT", ""):
+        return HttpResponse(
+            packb(data), status=status, content_type="application/msgpack", headers=headers
+        )
+    return JsonResponse(data, status=status, headers=headers, safe=False)
+
+
+def _overloaded(request, exc):
+    return _response(request, {"detail": str(exc)}, status=503, headers={"Retry-After": "2"})
+
+
+async def _authenticate(request):
+    auth = CachedTokenAuthentication()
+    header = request.META.get("HTTP_AUTHORIZATION", "").split()
+    if len(header) != 2 or header[0].lower() != auth.keyword.lower():
+        raise exceptions.NotAuthenticated()
+    key = header[1]
+    cached = token_cache.get(key)
+    if cached is None:
+        cached = await sync_to_async(auth.authenticate_credentials, thread_sensitive=False)(key)
+    request.user = cached[0]
+    return request.user
+
+
+async def _authenticate_token_or_session(request):
+    # Browsers' EventSource cannot send an Authorization header, so the
+    # dashboard page falls back to its session cookie.
+    if "HTTP_AUTHORIZATION" in request.META:
+        return await _authenticate(request)
+    user = await sync_to_async(lambda: request.user if request.user.is_authenticated else None)()
+    if user is None:
+        raise exceptions.NotAuthenticated()
+    return user
+
+
+def _parse_body(request):
+    try:
+        if request.content_type == "application/msgpack":
+            return unpackb(request.body)
+        return json.loads(request.body or b"null")
+    except Exception as exc:
+        raise BadPayload(f"Malformed request body: {exc}")
+
+
+def _clean_scan(raw):
+    if not isinstance(raw, dict):
+        raise BadPayload("Each scan must be an object.")
+    rfid_code = str(raw.get("rfid_code") or "").strip()
+    scan_timestamp = parse_datetime(str(raw.get("scan_timestamp") or ""))
+    if not rfid_code or len(rfid_code) > 100:
+        raise BadPayload("Each scan needs an rfid_code of at most 100 characters.")
+    if scan_timestamp is None:
+        raise BadPayload("Each scan needs an ISO 8601 scan_timestamp.")
+    signal_strength = raw.get("signal_strength")
+    return {
+        "rfid_code": rfid_code,
+        "gate_id": str(raw.get("gate_id") or "")[:50],
+        "scan_timestamp": scan_timestamp,
+        "direction": str(raw.get("direction") or "")[:10],
+        "signal_strength": int(signal_strength) if signal_strength is not None else None,
+    }
+
+
+async def _gate_ranch(user, requested):
+    # Scans of tags no animal carries yet are recorded for the gate's ranch.
+    ranch_ids = await sync_to_async(user_ranch_ids)(user)
+    if requested is not None:
+        requested = uuid.UUID(str(requested))
+        if ranch_ids is not None and requested not in ranch_ids:
+            raise exceptions.PermissionDenied("You cannot record data for that ranch.")
+    ranch_id = device_ranch_id(ranch_ids, requested)
+    if ranch_id is None and ranch_ids is not None:
+        raise BadPayload("Send the gate's ranch with its scans.")
+    return ranch_id
+
+
+@async_post_endpoint
+async def rfid_ingest_view(request):
+    """Accept ``{"scans": [...]}`` (or a bare list) from a gate reader.
+
+    ``{"ranch": ..., "scans": [...]}`` names the gate's ranch; users of a
+    single ranch may leave it out.
+    """
+    try:
+        user = await _authenticate(request)
+        payload = _parse_body(request)
+        scans = payload.get("scans") if isinstance(payload, dict) else payload
+        if not isinstance(scans, list) or not scans:
+            raise BadPayload("Expected a non-empty list of scans.")
+        if len(scans) > MAX_SCANS_PER_REQUEST:
+            raise BadPayload(f"At most {MAX_SCANS_PER_REQUEST} scans per request.")
+        rows = [_clean_scan(raw) for raw in scans]
+        ranch_id = await _gate_ranch(user, payload.get("ranch") if isinstance(payload, dict) else None)
+        for row in rows:
+            row["ranch_id"] = ranch_id
+    except exceptions.APIException as exc:
+        return _response(request, {"detail": str(exc.detail)}, status=exc.status_code)
+    except (BadPayload, TypeError, ValueError) as exc:
+        return _response(request, {"detail": str(exc)}, status=400)
+
+    try:
+        accepted = await get_scan_batcher().submit(rows)
+    except Overloaded as exc:
+        return _overloaded(request, exc)
+    return _response(request, {"accepted": accepted}, status=201)
+
+
+@async_post_endpoint
+async def sync_ingest_view(request):
+    """Async twin of ``SyncAPIView``: same payload, same response."""
+    try:
+        await _authenticate(request)
+        payload = SyncRequestSerializer(data=_parse_body(request))
+        payload.is_valid(raise_exception=True)
+    except exceptions.APIException as exc:
+        return _response(request, {"detail": exc.detail}, status=exc.status_code)
+    except BadPayload as exc:
+        return _response(request, {"detail": str(exc)}, status=400)
+
+    try:
+        result = await run_bounded(
+            process_sync_operations,
+            request,
+            payload.validated_data["device_id"],
+            payload.validated_data["operations"],
+            payload.validated_data.get("ranch"),
+        )
+    except Overloaded as exc:
+        return _overloaded(request, exc)
+    return _response(request, result)
+
+
+def _last_event_id(request):
+    value = request.META.get("HTTP_LAST_EVENT_ID") or request.GET.get("since")
+    try:
+        return max(int(value), 0)
+    except (TypeError, ValueError):
+        return broker.last_id
+
+
+def format_sse(event):
+    data = json.dumps(event["data"], cls=DjangoJSONEncoder, separators=(",", ":"))
+    return f"id: {event['id']}\nevent: {event['type']}\ndata: {data}\n\n"
+
+
+async def _event_stream(last_id, ranch_ids):
+    yield f"retry: 5000\n: connected {last_id}\n\n"
+    async for events in broker.stream(last_id, EVENT_STREAM_HEARTBEAT, ranch_ids):
+        if not events:
+            yield ": keepalive\n\n"
+            continue
+        events = await sync_to_async(scope_events)(events, ranch_ids)
+        yield "".join(format_sse(event) for event in events)
+
+
+def _wsgi_event_stream(last_id, ranch_ids):
+    # Django would drain an async iterator before sending anything under
+    # WSGI, and a worker thread cannot be held per open dashboard. Each
+    # response waits for one batch (or a heartbeat) and ends; EventSource
+    # reconnects with Last-Event-ID and carries on from there.
+    yield f"retry: 1000\n: connected {last_id}\n\n"
+    events, last_id = broker.wait(last_id, EVENT_STREAM_HEARTBEAT, ranch_ids)
+    if events:
+        yield "".join(format_sse(event) for event in scope_events(events, ranch_ids))
+
+
+@async_endpoint("GET")
+async def dashboard_event_stream(request):
+    """Server-sent events for the live dashboard.
+
+    Reconnecting clients send ``Last-Event-ID`` and receive whatever they
+    missed that is still in the broker's buffer. Only events of the user's
+    ranches are sent. Under WSGI each response carries a single batch.
+    """
+    try:
+        user = await _authenticate_token_or_session(request)
+    except exceptions.APIException as exc:
+        return _response(request, {"detail": str(exc.detail)}, status=exc.status_code)
+
+    ranch_ids = await sync_to_async(user_ranch_ids)(user)
+    stream = _event_stream if isinstance(request, ASGIRequest) else _wsgi_event_stream
+    response = StreamingHttpResponse(
+        stream(_last_event_id(request), ranch_ids), content_type="text/event-stream"
+    )
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
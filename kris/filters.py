@@ -0,0 +1,97 @@
+"""Declarative query-parameter filters for the API viewsets.
+
+Viewsets declare ``filter_fields`` as a mapping of model field to the
+lookups it accepts (a plain list still means equality only)::
+
+    filter_fields = {
+        "status": SET_LOOKUPS,                # ?status=sold  ?status__in=sold,dead
+        "date_administered": DATE_LOOKUPS,    # ?date_administered__gte=2024-01-01
+    }                                         # ?date_administered__window=7d
+
+Only indexed columns should be declared; ``apps.core.tests`` checks every
+declared lookup, ranch-scoped and in the viewset's ordering, against the
+SQLite query plan. Filters never change a list's ordering.
+"""
+
+import re
+from datetime import timedelta
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import models
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+
+EXACT = ("exact",)
+SET_LOOKUPS = ("exact", "in")
+RANGE_LOOKUPS = ("gte", "lte", "window")
+DATE_LOOKUPS = ("exact",) + RANGE_LOOKUPS
+
+MAX_IN_VALUES = 100
+_WINDOW = re.compile(r"^(\d{1,4})([hdw])$")
+_WINDOW_UNITS = {"h": "hours", "d": "days", "w": "weeks"}
+
+
+def declared_filters(filter_fields):
+    """Normalise a ``filter_fields`` declaration to ``{field: lookups}``."""
+    if isinstance(filter_fields, dict):
+        return {field: tuple(lookups) for field, lookups in filter_fields.items()}
+    return {field: EXACT for field in filter_fields}
+
+
+def _to_python(model_field, value):
+    target = model_field.target_field if model_field.is_relation else model_field
+    try:
+        return target.to_python(value)
+    except DjangoValidationError as exc:
+        raise ValidationError({model_field.name: exc.messages})
+
+
+def _window_start(model_field, value):
+    match = _WINDOW.match(value)
+    if not match:
+        raise ValidationError(
+            {f"{model_field.name}__window": ["Use <number><h|d|w>, e.g. 7d or 24h."]}
+        )
+    start = timezone.now() - timedelta(**{_WINDOW_UNITS[match[2]]: int(match[1])})
+    if not isinstance(model_field, models.DateTimeField):
+        start = timezone.localdate(start)
+    return start
+
+
+def filter_kwargs(model, filter_fields, params):
+    """Translate query params into ORM filter kwargs, validating every value."""
+    kwargs = {}
+    for field, lookups in declared_filters(filter_fields).items():
+        model_field = model._meta.get_field(field)
+        for lookup in lookups:
+            param = field if lookup == "exact" else f"{field}__{lookup}"
+            value = params.get(param)
+            if not value:
+                continue
+            if lookup == "in":
+                values = [item for item in value.split(",") if item]
+                if len(values) > MAX_IN_VALUES:
+                    raise ValidationError({param: [f"At most {MAX_IN_VALUES} values."]})
+                kwargs[f"{field}__in"] = [_to_python(model_field, item) for item in values]
+            elif lookup == "window":
+                kwargs[f"{field}__gte"] = _window_start(model_field, value)
+            elif lookup == "exact":
+                kwargs[field] = _to_python(model_field, value)
+            else:
+                kwargs[param] = _to_python(model_field, value)
+
+        # A lookup the viewset does not offer would otherwise be silently
+        # ignored and return the unfiltered list.
+        for param in params:
+            name, _, lookup = param.partition("__")
+            if name == field and lookup and lookup not in lookups:
+                raise ValidationError({param: [f"Supported lookups: {', '.join(lookups)}."]})
+    return kwargs
+
+
+def apply_filters(queryset, filter_fields, params):
+    """Filter ``queryset`` by ``params``; its ordering is left as it is."""
+    kwargs = filter_kwargs(queryset.model, filter_fields, params)
+    if not kwargs:
+        return queryset
+    return queryset.filter(**kwargs)
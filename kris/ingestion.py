@@ -0,0 +1,157 @@
+"""Batched, bounded database writes for the async ingestion endpoints.
+
+Requests park their rows on a per-event-loop queue and await a future. A
+single consumer drains the queue into batches and hands each batch to a
+small thread pool, so N slow gate readers cost N coroutines instead of N
+worker threads, and the database sees a few bulk inserts instead of many
+single-row transactions.
+"""
+
+import asyncio
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections
+
+from apps.animals.models import Animal
+from apps.core.edge import single_writer
+from apps.core.postgres import copy_insert
+from apps.operations.models import RFIDScanLog
+
+DEFAULT_INGESTION = {
+    "DB_WORKERS": 4,
+    "QUEUE_SIZE": 10000,
+    "BATCH_SIZE": 500,
+    "BATCH_WINDOW": 0.05,
+    "ENQUEUE_TIMEOUT": 2.0,
+    "MAX_PENDING_SYNCS": 32,
+}
+
+
+def ingestion_settings():
+    return {**DEFAULT_INGESTION, **getattr(settings, "ASYNC_INGESTION", {})}
+
+
+class Overloaded(Exception):
+    """Raised when the ingestion queue stays full; the caller should retry."""
+
+
+_executor = None
+
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=ingestion_settings()["DB_WORKERS"], thread_name_prefix="kris-ingest"
+        )
+    return _executor
+
+
+async def run_in_db_thread(func, *args):
+    def call():
+        close_old_connections()
+        try:
+            return func(*args)
+        finally:
+            close_old_connections()
+
+    return await asyncio.get_running_loop().run_in_executor(get_executor(), call)
+
+
+def write_scan_batch(rows):
+    codes = {row["rfid_code"] for row in rows}
+    # Bulk inserts skip RFIDScanLog.save(), so the ranch is copied here.
+    animals = {
+        code: (tag, ranch_id)
+        for code, tag, ranch_id in Animal.objects.filter(rfid_code__in=codes).values_list(
+            "rfid_code", "tag_number", "ranch_id"
+        )
+    }
+    scans = []
+    for row in rows:
+        # Unknown tags are recorded for the gate's ranch.
+        tag, ranch_id = animals.get(row["rfid_code"], (None, row.get("ranch_id")))
+        scans.append(RFIDScanLog(**dict(row, animal_tag_id=tag, ranch_id=ranch_id)))
+    with single_writer():
+        copy_insert(RFIDScanLog, scans)
+    return len(scans)
+
+
+class ScanBatcher:
+    def __init__(self, config):
+        self.config = config
+        self.queue = asyncio.Queue(maxsize=config["QUEUE_SIZE"])
+        self.consumer = None
+
+    async def submit(self, rows):
+        if self.consumer is None or self.consumer.done():
+            self.consumer = asyncio.create_task(self._consume())
+        future = asyncio.get_running_loop().create_future()
+        try:
+            await asyncio.wait_for(
+                self.queue.put((rows, future)), timeout=self.config["ENQUEUE_TIMEOUT"]
+            )
+        except asyncio.TimeoutError:
+            raise Overloaded("RFID ingestion queue is full.")
+        return await future
+
+    async def _consume(self):
+        while True:
+            batch = [await self.queue.get()]
+            size = len(batch[0][0])
+            deadline = asyncio.get_running_loop().time() + self.config["BATCH_WINDOW"]
+            while size < self.config["BATCH_SIZE"]:
+                timeout = deadline - asyncio.get_running_loop().time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self.queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                batch.append(item)
+                size += len(item[0])
+
+            rows = [row for item_rows, _ in batch for row in item_rows]
+            try:
+                await run_in_db_thread(write_scan_batch, rows)
+            except Exception as exc:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(exc)
+            else:
+                for item_rows, future in batch:
+                    if not future.done():
+                        future.set_result(len(item_rows))
+
+
+_batchers = weakref.WeakKeyDictionary()
+_sync_slots = weakref.WeakKeyDictionary()
+
+
+def get_scan_batcher():
+    loop = asyncio.get_running_loop()
+    if loop not in _batchers:
+        _batchers[loop] = ScanBatcher(ingestion_settings())
+    return _batchers[loop]
+
+
+def get_sync_slots():
+    loop = asyncio.get_running_loop()
+    if loop not in _sync_slots:
+        _sync_slots[loop] = asyncio.Semaphore(ingestion_settings()["MAX_PENDING_SYNCS"])
+    return _sync_slots[loop]
+
+
+async def run_bounded(func, *args):
+    """Run ``func`` on the DB pool, refusing work once too much is pending."""
+    slots = get_sync_slots()
+    try:
+        await asyncio.wait_for(slots.acquire(), timeout=ingestion_settings()["ENQUEUE_TIMEOUT"])
+    except asyncio.TimeoutError:
+        raise Overloaded("Too many sync uploads in progress.")
+    try:
+        return await run_in_db_thread(func, *args)
+    finally:
+        slots.release()
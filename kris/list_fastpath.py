@@ -0,0 +1,203 @@
+"""Read fast path for list endpoints.
+
+Builds list responses straight from ``values_list()`` tuples with one
+precompiled converter per serializer field, producing the same primitives
+DRF's field machinery would. Serializers with fields we cannot reproduce
+exactly get no plan and keep using the regular serializer.
+
+Custom serializer fields opt in by defining ``fast_converter(model_field)``.
+Converters that need the request expose ``bind(request)``.
+"""
+
+import decimal
+import functools
+
+from django.core.exceptions import FieldDoesNotExist
+from django.utils import timezone
+from rest_framework import ISO_8601, relations, serializers
+from rest_framework.settings import api_settings
+
+from apps.animals.models import Animal, age_in_months
+
+# Serializer fields backed by a model property: source -> (column, function).
+COMPUTED_FIELDS = {
+    (Animal, "age_months"): ("date_of_birth", age_in_months),
+}
+
+_IDENTITY_FIELDS = (
+    serializers.CharField,
+    serializers.ChoiceField,
+    serializers.IntegerField,
+    serializers.BooleanField,
+    serializers.JSONField,
+)
+
+
+def _identity(value):
+    return value
+
+
+def _datetime_converter(field):
+    output_format = getattr(field, "format", api_settings.DATETIME_FORMAT)
+    field_timezone = field.timezone if hasattr(field, "timezone") else field.default_timezone()
+    if output_format is None or output_format.lower() != ISO_8601 or field_timezone is None:
+        return None
+
+    def convert(value):
+        if timezone.is_aware(value):
+            value = value.astimezone(field_timezone)
+        else:
+            value = timezone.make_aware(value, field_timezone)
+        value = value.isoformat()
+        if value.endswith("+00:00"):
+            value = value[:-6] + "Z"
+        return value
+
+    return convert
+
+
+def _date_converter(field):
+    output_format = getattr(field, "format", api_settings.DATE_FORMAT)
+    if output_format is None or output_format.lower() != ISO_8601:
+        return None
+    return lambda value: value.isoformat()
+
+
+def _decimal_converter(field):
+    coerce_to_string = getattr(field, "coerce_to_string", api_settings.COERCE_DECIMAL_TO_STRING)
+    if not coerce_to_string or field.localize:
+        return None
+    if field.decimal_places is None:
+        return lambda value: "{:f}".format(value)
+
+    quantum = decimal.Decimal(".1") ** field.decimal_places
+    context = decimal.getcontext().copy()
+    if field.max_digits is not None:
+        context.prec = field.max_digits
+    rounding = field.rounding
+
+    def convert(value):
+        if not isinstance(value, decimal.Decimal):
+            value = decimal.Decimal(str(value).strip())
+        return "{:f}".format(value.quantize(quantum, rounding=rounding, context=context))
+
+    return convert
+
+
+def _converter_for(field, model_field):
+    if hasattr(field, "fast_converter"):
+        return field.fast_converter(model_field)
+    if isinstance(field, relations.PrimaryKeyRelatedField):
+        if field.pk_field is not None:
+            return field.pk_field.to_representation
+        return _identity
+    if isinstance(field, relations.RelatedField):
+        return None
+    if isinstance(field, serializers.FileField):
+        # Needs the request to build absolute URLs; bound per response.
+        return FileURLConverter(model_field.storage)
+    if isinstance(field, serializers.DateTimeField):
+        return _datetime_converter(field)
+    if isinstance(field, serializers.DateField):
+        return _date_converter(field)
+    if isinstance(field, serializers.DecimalField):
+        return _decimal_converter(field)
+    if isinstance(field, serializers.UUIDField):
+        return str if field.uuid_format == "hex_verbose" else None
+    if isinstance(field, _IDENTITY_FIELDS):
+        return _identity
+    return None
+
+
+class FileURLConverter:
+    def __init__(self, storage):
+        self.storage = storage
+
+    def bind(self, request):
+        storage = self.storage
+
+        def convert(name):
+            if not name:
+                return None
+            url = storage.url(name)
+            if request is not None:
+                return request.build_absolute_uri(url)
+            return url
+
+        return convert
+
+
+class ListPlan:
+    def __init__(self, names, columns, converters):
+        self.names = names
+        self.columns = columns
+        self.converters = converters
+
+    def rows(self, queryset, request=None):
+        names = self.names
+        converters = [
+            conv.bind(request) if hasattr(conv, "bind") else conv
+            for conv in self.converters
+        ]
+        fields = list(zip(names, converters))
+        rows = []
+        for values in queryset.values_list(*self.columns).iterator(chunk_size=2000):
+            rows.append(
+                {
+                    name: None if value is None else convert(value)
+                    for (name, convert), value in zip(fields, values)
+                }
+            )
+        return rows
+
+
+def model_column(model, source):
+    """Return the concrete column name backing serializer ``source``, if any."""
+    computed = COMPUTED_FIELDS.get((model, source))
+    if computed is not None:
+        return computed[0]
+    try:
+        model_field = model._meta.get_field(source)
+    except FieldDoesNotExist:
+        return None
+    if not model_field.concrete or model_field.many_to_many:
+        return None
+    return model_field.name
+
+
+def build_list_plan(serializer, field_names=None):
+    model = serializer.Meta.model
+    names, columns, converters = [], [], []
+
+    for field in serializer._readable_fields:
+        if field_names is not None and field.field_name not in field_names:
+            continue
+        source = field.source
+        computed = COMPUTED_FIELDS.get((model, source))
+        if computed is not None:
+            column, convert = computed
+        else:
+            try:
+                model_field = model._meta.get_field(source)
+            except FieldDoesNotExist:
+                return None
+            if not model_field.concrete or model_field.many_to_many:
+                return None
+            column = model_field.attname
+            convert = _converter_for(field, model_field)
+            if convert is None:
+                return None
+        names.append(field.field_name)
+        columns.append(column)
+        converters.append(convert)
+
+    return ListPlan(names, columns, converters)
+
+
+# Sparse fieldsets come from the query string, so the plans are bounded.
+MAX_CACHED_PLANS = 256
+
+
+@functools.lru_cache(maxsize=MAX_CACHED_PLANS)
+def get_list_plan(serializer_class, field_names=None):
+    return build_list_plan(serializer_class(), field_names)
@@ -0,0 +1,143 @@
+import io
+import re
+import zlib
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.http import HttpResponse
+from django.utils.cache import patch_vary_headers
+from django.utils.text import compress_string
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli is optional, gzip always works
+    brotli = None
+
+MIN_COMPRESS_LENGTH = 200
+re_accepts_br = re.compile(r"\bbr\b")
+re_accepts_gzip = re.compile(r"\bgzip\b")
+
+
+def _gunzip(body, limit):
+    # Only gzip: Brotli 1.1 cannot cap a decoder's output, so a few hundred
+    # bytes of br could inflate to gigabytes before any limit check.
+    decoder = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    data = decoder.decompress(body, limit + 1)
+    if len(data) > limit:
+        raise OverflowError("Decompressed request body is too large.")
+    if not decoder.eof:
+        raise ValueError("Truncated gzip stream.")
+    return data
+
+
+class _SyncAndAsyncMiddleware:
+    # Both middlewares must stay async-capable: a sync-only middleware would
+    # push every async ingestion view back onto a worker thread.
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        response = self.process_request(request)
+        if response is None:
+            response = self.get_response(request)
+        return self.process_response(request, response)
+
+    async def __acall__(self, request):
+        response = self.process_request(request)
+        if response is None:
+            response = await self.get_response(request)
+        return self.process_response(request, response)
+
+    def process_request(self, request):
+        return None
+
+    def process_response(self, request, response):
+        return response
+
+
+class RequestDecompressionMiddleware(_SyncAndAsyncMiddleware):
+    """Inflate gzip request bodies on device upload endpoints."""
+
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        self.paths = tuple(getattr(settings, "COMPRESSED_REQUEST_PATHS", ()))
+        self.limit = getattr(settings, "MAX_DECOMPRESSED_REQUEST_SIZE", 20 * 1024 * 1024)
+
+    def process_request(self, request):
+        encoding = request.META.get("HTTP_CONTENT_ENCODING", "").strip().lower()
+        if encoding and encoding != "identity":
+            if not request.path.startswith(self.paths):
+                return HttpResponse(
+                    "Compressed request bodies are not accepted here.", status=415
+                )
+            if encoding != "gzip":
+                response = HttpResponse(
+                    f"Unsupported Content-Encoding '{encoding}'; send gzip.", status=415
+                )
+                response["Accept-Encoding"] = "gzip"
+                return response
+            try:
+                body = _gunzip(request.body, self.limit)
+            except OverflowError as exc:
+                return HttpResponse(str(exc), status=413)
+            except Exception as exc:  # zlib.error, truncated stream
+                return HttpResponse(f"Invalid compressed body: {exc}", status=400)
+            request._body = body
+            request._stream = io.BytesIO(body)
+            request.META["CONTENT_LENGTH"] = str(len(body))
+            del request.META["HTTP_CONTENT_ENCODING"]
+        return None
+
+
+class CompressionMiddleware(_SyncAndAsyncMiddleware):
+    """Brotli or gzip response compression, whichever the client prefers.
+
+    Only API and device responses are compressed. HTML pages carry CSRF
+    tokens next to reflected input, which compression would expose to
+    BREACH. Streaming responses (event streams, file downloads) pass through
+    untouched so they keep flushing promptly.
+    """
+
+    max_random_bytes = 100
+
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        self.paths = tuple(getattr(settings, "COMPRESSED_RESPONSE_PATHS", ()))
+
+    def process_response(self, request, response):
+        if not request.path.startswith(self.paths):
+            return response
+        if response.get("Content-Type", "").startswith("text/html"):
+            return response
+        if response.streaming or len(response.content) < MIN_COMPRESS_LENGTH:
+            return response
+        if response.has_header("Content-Encoding"):
+            return response
+
+        patch_vary_headers(response, ("Accept-Encoding",))
+        accept = request.META.get("HTTP_ACCEPT_ENCODING", "")
+        if brotli is not None and re_accepts_br.search(accept):
+            encoding = "br"
+            compressed = brotli.compress(response.content, quality=5)
+        elif re_accepts_gzip.search(accept):
+            encoding = "gzip"
+            compressed = compress_string(response.content, max_random_bytes=self.max_random_bytes)
+        else:
+            return response
+
+        if len(compressed) >= len(response.content):
+            return response
+        response.content = compressed
+        response.headers["Content-Length"] = str(len(compressed))
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            response.headers["ETag"] = "W/" + etag
+        response.headers["Content-Encoding"] = encoding
+        return response
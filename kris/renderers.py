@@ -0,0 +1,42 @@
+import msgpack
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser
+from rest_framework.renderers import BaseRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+_json_encoder = JSONEncoder()
+
+
+def _encode_default(obj):
+    # Dates, decimals, UUIDs etc. become the same values JSONRenderer emits.
+    return _json_encoder.default(obj)
+
+
+def packb(data):
+    return msgpack.packb(data, default=_encode_default, use_bin_type=True)
+
+
+def unpackb(content):
+    return msgpack.unpackb(content, raw=False)
+
+
+class MessagePackRenderer(BaseRenderer):
+    media_type = "application/msgpack"
+    format = "msgpack"
+    charset = None
+    render_style = "binary"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        return packb(data)
+
+
+class MessagePackParser(BaseParser):
+    media_type = "application/msgpack"
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        try:
+            return unpackb(stream.read())
+        except Exception as exc:
+            raise ParseError(f"MessagePack parse error - {exc}")
@@ -1,13 +1,39 @@
 from rest_framework import serializers
 
+from apps.animals.images import variant_urls
 from apps.animals.models import Animal
 from apps.breeding.models import BreedingEvent
 from apps.health.models import Mortality, Treatment, Vaccination
 from apps.operations.models import HerdCount, MovementLog, RFIDScanLog
 
 
+class PhotoVariantsField(serializers.Field):
+    """Absolute URLs of the resized photo variants (null until generated)."""
+
+    def __init__(self, **kwargs):
+        kwargs["read_only"] = True
+        super().__init__(**kwargs)
+
+    def to_representation(self, value):
+        storage = Animal._meta.get_field("photo").storage
+        return variant_urls(value, storage, self.context.get("request"))
+
+    def fast_converter(self, model_field):
+        return PhotoVariantsConverter(Animal._meta.get_field("photo").storage)
+
+
+class PhotoVariantsConverter:
+    def __init__(self, storage):
+        self.storage = storage
+
+    def bind(self, request):
+        storage = self.storage
+        return lambda value: variant_urls(value, storage, request)
+
+
 class AnimalSerializer(serializers.ModelSerializer):
     age_months = serializers.IntegerField(read_only=True)
+    photo_variants = PhotoVariantsField()
 
     class Meta:
         model = Animal
@@ -25,6 +51,7 @@ class AnimalSerializer(serializers.ModelSerializer):
             "sire_tag",
             "status",
             "photo",
+            "photo_variants",
             "purchase_price",
             "purchase_date",
             "notes",
@@ -105,4 +132,6 @@ class SyncOperationSerializer(serializers.Serializer):
 
 class SyncRequestSerializer(serializers.Serializer):
     device_id = serializers.CharField(max_length=100)
+    # The ranch the device is on; defaults to the user's only ranch.
+    ranch = serializers.UUIDField(required=False)
     operations = SyncOperationSerializer(many=True)
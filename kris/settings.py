@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/4.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -53,6 +54,8 @@ INSTALLED_APPS = [
 ]
 
 AUTH_USER_MODEL = 'core.User'
+# The HTML dashboard has no login page of its own.
+LOGIN_URL = 'admin:login'
 
 # CORS (for Flutter app)
 CORS_ALLOWED_ORIGINS = [
@@ -64,15 +67,40 @@ CORS_ALLOWED_ORIGINS = [
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
         'rest_framework.authentication.SessionAuthentication',
-        'rest_framework.authentication.TokenAuthentication',  # For Flutter
+        'apps.core.authentication.CachedTokenAuthentication',  # For Flutter
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticatedOrReadOnly',
     ],
+    'DEFAULT_RENDERER_CLASSES': [
+        'rest_framework.renderers.JSONRenderer',
+        'kris.renderers.MessagePackRenderer',  # Accept: application/msgpack
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'rest_framework.parsers.JSONParser',
+        'kris.renderers.MessagePackParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
+}
+
+# Device tokens older than this are rejected and purged.
+TOKEN_EXPIRY_DAYS = 30
+
+# Cached token lookups (apps.core.authentication). Point SHARED_CACHE at a
+# shared cache alias so workers reuse each other's lookups.
+TOKEN_AUTH_CACHE = {
+    'MAX_ENTRIES': 10000,
+    'LOCAL_TTL': 60,
+    'SHARED_CACHE': None,
+    'SHARED_TTL': 300,
 }
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'kris.middleware.CompressionMiddleware',
+    'kris.middleware.RequestDecompressionMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -82,6 +110,28 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+# Device uploads that may arrive gzip compressed (Content-Encoding).
+COMPRESSED_REQUEST_PATHS = ['/api/sync/', '/api/rfid/']
+MAX_DECOMPRESSED_REQUEST_SIZE = 20 * 1024 * 1024
+# Responses are only compressed here, never on HTML pages (BREACH).
+COMPRESSED_RESPONSE_PATHS = ['/api/']
+
+# Async ingestion endpoints (kris.async_views): DB thread pool, batch sizing
+# and the queue bounds beyond which clients get 503 + Retry-After.
+ASYNC_INGESTION = {
+    'DB_WORKERS': 4,
+    'QUEUE_SIZE': 10000,
+    'BATCH_SIZE': 500,
+    'BATCH_WINDOW': 0.05,
+    'ENQUEUE_TIMEOUT': 2.0,
+    'MAX_PENDING_SYNCS': 32,
+}
+
+# Worker processes for per-ranch dashboard precomputation
+# (apps.analytics.portfolio); each opens its own database connection.
+# None uses one per CPU.
+PORTFOLIO_WORKERS = None
+
 ROOT_URLCONF = 'kris.urls'
 
 TEMPLATES = [
@@ -110,7 +160,67 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+    },
+}
+
+# On-ranch edge server profile for SQLite (apps.core.edge). When enabled,
+# each connection gets these pragmas and device sync/RFID writes queue on a
+# single writer. synchronous=normal under WAL may lose the last commits on
+# power loss, but never corrupts the database; devices resend unsynced rows.
+SQLITE_EDGE = {
+    'ENABLED': False,
+    'PRAGMAS': {
+        'journal_mode': 'wal',
+        'synchronous': 'normal',
+        'cache_size': -64000,  # KiB
+        'mmap_size': 256 * 1024 * 1024,
+        'temp_store': 'memory',
+        'busy_timeout': 10000,  # ms
+    },
+    'WRITE_LOCK_TIMEOUT': 30.0,
+}
+
+# PostgreSQL production profile: set KRIS_DB_ENGINE=postgresql plus
+# KRIS_DB_NAME/USER/PASSWORD/HOST/PORT. Connections persist across requests
+# and are health-checked before reuse. The test suite runs against the same
+# server (Django creates test_<name>), which also exercises the BRIN indexes
+# and COPY ingestion that only exist there.
+if os.environ.get('KRIS_DB_ENGINE') == 'postgresql':
+    DATABASES['default'] = {
+        'ENGINE': 'django.db.backends.postgresql',
+        'NAME': os.environ.get('KRIS_DB_NAME', 'kris'),
+        'USER': os.environ.get('KRIS_DB_USER', 'kris'),
+        'PASSWORD': os.environ.get('KRIS_DB_PASSWORD', ''),
+        'HOST': os.environ.get('KRIS_DB_HOST', 'localhost'),
+        'PORT': os.environ.get('KRIS_DB_PORT', '5432'),
+        'CONN_MAX_AGE': 600,
+        'CONN_HEALTH_CHECKS': True,
+    }
+
+# Alias that apps.core.routers sends analytics and safe list reads to; None
+# keeps every query on 'default'. Setting KRIS_DB_REPLICA_HOST (and, if it
+# differs, KRIS_DB_REPLICA_PORT) adds a 'replica' alias for a streaming
+# replica of the PostgreSQL database. Test runs mirror it onto 'default'
+# rather than creating a test database on the read-only replica.
+READ_REPLICA = None
+if os.environ.get('KRIS_DB_REPLICA_HOST'):
+    DATABASES['replica'] = {
+        **DATABASES['default'],
+        'HOST': os.environ['KRIS_DB_REPLICA_HOST'],
+        'PORT': os.environ.get('KRIS_DB_REPLICA_PORT', DATABASES['default'].get('PORT', '')),
+        'TEST': {'MIRROR': 'default'},
     }
+    READ_REPLICA = 'replica'
+DATABASE_ROUTERS = ['apps.core.routers.PrimaryReplicaRouter']
+
+# Shared by every web and job-worker process, so the dashboard refresh job
+# warms the cache the web processes read. The table is created by the
+# core.0002_job migration.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+        'LOCATION': 'kris_cache',
+    },
 }
 
 
@@ -150,6 +260,10 @@ USE_TZ = True
 
 STATIC_URL = 'static/'
 
+# Uploaded files (animal photos and their resized variants)
+MEDIA_URL = 'media/'
+MEDIA_ROOT = BASE_DIR / 'media'
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/4.2/ref/settings/#default-auto-field
 
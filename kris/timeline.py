@@ -0,0 +1,136 @@
+"""One merged, newest-first event stream per animal (``animals/<tag>/timeline/``).
+
+Every event table has an ``(animal_tag, -date)`` index, so each stream is a
+keyset query walked in index order. ``heapq.merge`` k-way merges the
+streams and stops as soon as the page is full; a stream fetches a small
+first chunk and only goes back for more if the merge keeps drawing from
+it, never more than the page needs.
+
+The cursor stores the last ``(date, pk)`` returned from each stream. A
+stream that has not contributed yet holds only rows older than everything
+already returned, so it simply starts from the top on the next page.
+"""
+
+import base64
+import heapq
+import json
+import uuid
+from datetime import datetime, time
+from itertools import islice
+
+from django.conf import settings
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db.models import Q
+from django.utils import timezone
+
+from apps.breeding.models import BreedingEvent
+from apps.health.models import Mortality, Treatment, Vaccination
+from apps.operations.models import MovementLog, RFIDScanLog
+
+from .serializers import (
+    BreedingEventSerializer,
+    MortalitySerializer,
+    MovementLogSerializer,
+    RFIDScanLogSerializer,
+    TreatmentSerializer,
+    VaccinationSerializer,
+)
+
+# type: (model, animal field, date field, serializer)
+STREAMS = {
+    "breeding": (BreedingEvent, "female_tag", "service_date", BreedingEventSerializer),
+    "vaccination": (Vaccination, "animal_tag", "date_administered", VaccinationSerializer),
+    "treatment": (Treatment, "animal_tag", "treatment_date", TreatmentSerializer),
+    "movement": (MovementLog, "animal_tag", "movement_date", MovementLogSerializer),
+    "rfid_scan": (RFIDScanLog, "animal_tag", "scan_timestamp", RFIDScanLogSerializer),
+    "mortality": (Mortality, "animal_tag", "death_date", MortalitySerializer),
+}
+# Other tag-keyed relations the serializers render (``to_field`` FKs are
+# serialized as slugs, which would otherwise cost a query per row).
+SELECT_RELATED = {"breeding": ["male_tag"]}
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 200
+
+
+def _moment(value):
+    # Date-only events count as midnight, so they follow that day's scans.
+    if isinstance(value, datetime):
+        return value
+    moment = datetime.combine(value, time.min)
+    return timezone.make_aware(moment) if settings.USE_TZ else moment
+
+
+def _after(rows, date_field, value, pk):
+    return rows.filter(Q(**{f"{date_field}__lt": value}) | Q(**{date_field: value, "pk__lt": pk}))
+
+
+def _stream(kind, animal, position, needed, first_chunk):
+    """Yield ``(moment, kind, pk, obj)`` newest first, at most ``needed`` rows."""
+    model, animal_field, date_field, _ = STREAMS[kind]
+    base = (
+        model.objects.filter(**{animal_field: animal.pk})
+        .select_related(*SELECT_RELATED.get(kind, []))
+        .order_by(f"-{date_field}", "-pk")
+    )
+    rows = base if position is None else _after(base, date_field, *position)
+    chunk = min(first_chunk, needed)
+    while needed:
+        batch = list(rows[:chunk])
+        for obj in batch:
+            setattr(obj, animal_field, animal)
+            yield _moment(getattr(obj, date_field)), kind, obj.pk, obj
+        needed -= len(batch)
+        if len(batch) < chunk:
+            return
+        last = batch[-1]
+        rows = _after(base, date_field, getattr(last, date_field), last.pk)
+        chunk = needed
+
+
+def encode_cursor(positions):
+    payload = {kind: [value.isoformat(), str(pk)] for kind, (value, pk) in positions.items()}
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+
+
+def decode_cursor(cursor):
+    """``{type: (date, pk)}`` from a cursor string; raises ``ValueError`` if malformed."""
+    if not cursor:
+        return {}
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        positions = {}
+        for kind, (value, pk) in payload.items():
+            model, _, date_field, _ = STREAMS[kind]
+            value = model._meta.get_field(date_field).to_python(value)
+            if value is None:
+                raise ValueError(value)
+            positions[kind] = (value, uuid.UUID(pk))
+    except (AttributeError, TypeError, KeyError, ValueError, DjangoValidationError) as exc:
+        raise ValueError("Invalid timeline cursor.") from exc
+    return positions
+
+
+def timeline_page(animal, positions=None, limit=DEFAULT_LIMIT):
+    """``(items, next_cursor)`` with ``items`` as ``(type, obj)``, newest first.
+
+    ``positions`` is a decoded cursor (see ``decode_cursor``).
+    """
+    positions = dict(positions or {})
+    # One extra row tells us whether another page exists.
+    needed = limit + 1
+    first_chunk = needed // len(STREAMS) + 1
+    streams = [
+        _stream(kind, animal, positions.get(kind), needed, first_chunk) for kind in STREAMS
+    ]
+    merged = list(islice(heapq.merge(*streams, reverse=True), needed))
+    page = merged[:limit]
+    for _, kind, pk, obj in page:
+        positions[kind] = (getattr(obj, STREAMS[kind][2]), pk)
+    next_cursor = encode_cursor(positions) if len(merged) > limit else None
+    return [(kind, obj) for _, kind, _, obj in page], next_cursor
+
+
+def serialize_item(kind, obj, context=None):
+    _, _, date_field, serializer_class = STREAMS[kind]
+    data = serializer_class(obj, context=context).data
+    return {"type": kind, "date": data[date_field], "id": data["id"], "data": data}